@@ -0,0 +1,107 @@
+"""
+Benchmark: expense category classification
+==========================================
+Compares the original per-key substring loop against the compiled, memoized
+CategoryClassifier on the built-in mapping and on a large custom mapping table.
+
+Run from the backend folder:
+    python benchmarks/bench_category_classifier.py --keys 5000 --lookups 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from category_classifier import CategoryClassifier  # noqa: E402
+
+BASE_MAPPING = {
+    "Rent": "living_expenses", "Groceries": "living_expenses", "Utilities": "living_expenses",
+    "Transport": "living_expenses", "Subscription": "living_expenses", "Entertainment": "living_expenses",
+    "Emergency": "emergency_fund", "Medical": "emergency_fund", "Health": "emergency_fund",
+    "Investment": "investments", "Stock": "investments", "Asset": "investments",
+    "Savings": "savings", "Goal": "savings"
+}
+BUCKETS = ["living_expenses", "emergency_fund", "investments", "savings"]
+
+
+def legacy_categorize(mapping, expense_category):
+    """The original linear scan from budget_system.categorize_expense"""
+    for key, bucket in mapping.items():
+        if key.lower() in expense_category.lower():
+            return bucket
+    return "living_expenses"
+
+
+def build_custom_mapping(size, rng):
+    """Generate a large table of merchant-style keywords"""
+    mapping = dict(BASE_MAPPING)
+    while len(mapping) < size:
+        word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 10)))
+        mapping[f"merchant_{word}"] = rng.choice(BUCKETS)
+    return mapping
+
+
+def build_workload(mapping, lookups, distinct, rng):
+    """Repeating expense labels: mostly known keys with prefixes, some unknown labels"""
+    keys = list(mapping)
+    labels = []
+    for _ in range(distinct):
+        if rng.random() < 0.85:
+            labels.append(f"{rng.choice(['Monthly', 'UPI', 'Card'])} {rng.choice(keys)} payment")
+        else:
+            labels.append(f"Misc {rng.randint(0, 10**6)}")
+    return [rng.choice(labels) for _ in range(lookups)]
+
+
+def time_it(fn, workload):
+    start = time.perf_counter()
+    for label in workload:
+        fn(label)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(workload) / elapsed if elapsed > 0 else float("inf")
+
+
+def run(keys, lookups, distinct, seed):
+    rng = random.Random(seed)
+    results = []
+    for name, mapping in (("builtin", BASE_MAPPING), ("custom", build_custom_mapping(keys, rng))):
+        workload = build_workload(mapping, lookups, distinct, rng)
+        classifier = CategoryClassifier(mapping, BUCKETS)
+
+        # Same answers before timing anything
+        for label in set(workload):
+            assert classifier.classify(label) == legacy_categorize(mapping, label), label
+
+        classifier = CategoryClassifier(mapping, BUCKETS)
+        legacy_s, legacy_rate = time_it(lambda c: legacy_categorize(mapping, c), workload)
+        compiled_s, compiled_rate = time_it(classifier.classify, workload)
+        stats = classifier.stats()
+        results.append({
+            "table": name,
+            "mapping_size": len(mapping),
+            "lookups": len(workload),
+            "legacy_lookups_per_sec": round(legacy_rate),
+            "compiled_lookups_per_sec": round(compiled_rate),
+            "speedup": round(legacy_s / compiled_s, 2) if compiled_s > 0 else None,
+            "cache_hit_rate": stats["cache_hit_rate"]
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=5000, help="size of the custom mapping table")
+    parser.add_argument("--lookups", type=int, default=20000, help="classifications per run")
+    parser.add_argument("--distinct", type=int, default=2000, help="distinct expense labels in the workload")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for row in run(args.keys, args.lookups, args.distinct, args.seed):
+        print(f"[{row['table']:>7}] keys={row['mapping_size']:>6}  "
+              f"legacy={row['legacy_lookups_per_sec']:>10,}/s  "
+              f"compiled={row['compiled_lookups_per_sec']:>10,}/s  "
+              f"speedup={row['speedup']}x  hit_rate={row['cache_hit_rate']:.2%}")
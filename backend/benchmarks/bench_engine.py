@@ -0,0 +1,461 @@
+"""
+Benchmark Suite: streaming engine and budget service
+=====================================================
+End-to-end benchmarks for pathway_streaming_enhanced and budget_system, each
+parameterised over data size (history length / file size):
+
+  ingest.fallback      POST /ingest and /ingest/batch throughput, in-memory fallback
+  ingest.pathway       same through the Pathway pipeline (skipped if not installed)
+  metrics.read         /metrics* read latency while another thread ingests at a fixed rate
+  external.poll        poll_external_stream cost vs. external_events.jsonl size
+  fallback.update      update_fallback_state() cost vs. transaction history length
+  budget.write         budget_system expense throughput (single ops and /budget/batch)
+
+Requests go through the ASGI app in-process (FastAPI TestClient), so results measure the
+engine rather than the network. Results are written as JSON and compared against a
+stored baseline; a metric that is worse than the baseline by more than --tolerance is a
+regression (exit code 1); tail latencies are reported but do not gate. Each case runs
+--repeat times and keeps its best value. Baselines are machine-specific: regenerate
+baseline.json with --save-baseline on the host you compare on.
+
+Usage (from the backend folder):
+    python benchmarks/bench_engine.py                           # run, compare to baseline.json
+    python benchmarks/bench_engine.py --sizes 1000 --only ingest
+    python benchmarks/bench_engine.py --out results.json --save-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+# Keep budget writes off the engine pipeline so each benchmark measures one service
+os.environ.setdefault("BUDGET_FEED_PIPELINE", "false")
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Baselines are machine-specific; single-core or shared hosts need this much headroom
+DEFAULT_TOLERANCE = 0.50
+# Latency changes smaller than this are treated as noise whatever their relative size
+MIN_REGRESSION_MS = 1.5
+# Each case runs this many times and keeps its best value, which is far less noisy than one run
+DEFAULT_REPEAT = 3
+
+# Work per measurement (independent of the data size being varied)
+INGEST_EVENTS = 200
+INGEST_BATCHES = 20
+BATCH_SIZE = 100
+METRICS_READS = 200
+# Background ingest rate while /metrics* is read (events/s); an unthrottled writer would turn
+# read latency into GIL scheduling noise
+METRICS_INGEST_RATE = 200.0
+FALLBACK_REPEATS = 20
+POLL_REPEATS = 10
+POLL_APPENDED = 10
+BUDGET_OPS = 500
+
+METRICS_ENDPOINTS = ["/metrics", "/metrics/advanced", "/metrics/categories", "/metrics/windowed", "/metrics/predictions"]
+BUDGET_USER = "bench-user"
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _result(name, params, metric, value, unit, higher_is_better, gate=True):
+    """gate=False reports a metric without failing the run on it (e.g. tail latencies)"""
+    return {
+        "name": name,
+        "params": params,
+        "metric": metric,
+        "value": round(value, 3),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "gate": gate,
+    }
+
+
+def _skipped(name, reason):
+    return {"name": name, "params": {}, "metric": None, "value": None, "skipped": reason}
+
+
+# ---------- engine fixtures ----------
+
+def _load_engine():
+    import pathway_streaming_enhanced as engine
+    from fastapi.testclient import TestClient
+
+    # No context manager: the startup hook (live external stream, alert loop) is not run
+    return engine, TestClient(engine.app)
+
+
+def _synthetic_transaction(i, base_ms):
+    is_income = i % 3 == 0
+    amount = 1000.0 + (i % 50) if is_income else -(50.0 + (i % 200))
+    return {
+        "event_id": f"bench_{i}",
+        "type": "income" if is_income else "expense",
+        "amount": amount,
+        "category": ["Salary", "Groceries", "Rent", "Transport", "Utilities"][i % 5],
+        "timestamp": base_ms + i * 1000,
+        "description": "benchmark",
+    }
+
+
+def _reset_history(engine, size):
+    base_ms = int((datetime.now() - timedelta(seconds=size)).timestamp() * 1000)
+    with engine.state_lock:
+        engine.transaction_history.clear()
+        engine.transaction_history.extend(_synthetic_transaction(i, base_ms) for i in range(size))
+    engine.update_fallback_state()
+
+
+def _ingest_body(i):
+    return {
+        "type": "expense" if i % 2 else "income",
+        "amount": -75.0 if i % 2 else 1200.0,
+        "category": "Groceries" if i % 2 else "Salary",
+        "timestamp": datetime.now().isoformat(),
+        "description": "benchmark ingest",
+        "id": f"bench_ingest_{i}",
+    }
+
+
+# ---------- benchmarks ----------
+
+def bench_ingest(engine, client, size, mode):
+    """POST /ingest and /ingest/batch throughput with `size` transactions already in history"""
+    results = []
+    _reset_history(engine, size)
+    started = time.perf_counter()
+    for i in range(INGEST_EVENTS):
+        response = client.post("/ingest", json=_ingest_body(i))
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - started
+    results.append(_result(f"ingest.{mode}.single", {"history": size}, "events_per_sec",
+                           INGEST_EVENTS / elapsed, "events/s", True))
+
+    _reset_history(engine, size)
+    started = time.perf_counter()
+    for b in range(INGEST_BATCHES):
+        batch = [_ingest_body(b * BATCH_SIZE + i) for i in range(BATCH_SIZE)]
+        response = client.post("/ingest/batch", json=batch)
+        assert response.status_code == 200, response.text
+    elapsed = time.perf_counter() - started
+    results.append(_result(f"ingest.{mode}.batch", {"history": size, "batch_size": BATCH_SIZE}, "events_per_sec",
+                           INGEST_BATCHES * BATCH_SIZE / elapsed, "events/s", True))
+    return results
+
+
+def bench_metrics_under_ingest(engine, client, size):
+    """/metrics* read latency while a writer thread ingests at METRICS_INGEST_RATE"""
+    _reset_history(engine, size)
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        next_at = time.perf_counter()
+        while not stop.is_set():
+            next_at += 1.0 / METRICS_INGEST_RATE
+            stop.wait(max(0.0, next_at - time.perf_counter()))
+            body = _ingest_body(i)
+            engine.ingest_transaction_record(body["type"], body["amount"], body["category"],
+                                             timestamp=body["timestamp"], event_id=body["id"])
+            i += 1
+            if i % 100 == 0:
+                # Keep history at the benchmarked size rather than growing for the whole run
+                with engine.state_lock:
+                    del engine.transaction_history[size:]
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    latencies = {path: [] for path in METRICS_ENDPOINTS}
+    try:
+        for _ in range(METRICS_READS // len(METRICS_ENDPOINTS)):
+            for path in METRICS_ENDPOINTS:
+                started = time.perf_counter()
+                response = client.get(path)
+                latencies[path].append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+    finally:
+        stop.set()
+        thread.join()
+
+    results = []
+    for path, samples in latencies.items():
+        params = {"history": size, "endpoint": path, "ingest_rate": METRICS_INGEST_RATE}
+        results.append(_result("metrics.read", params, "p50_ms", _percentile(samples, 0.50), "ms", False))
+        results.append(_result("metrics.read", params, "p95_ms", _percentile(samples, 0.95), "ms", False, gate=False))
+    return results
+
+
+def _write_external_file(path, lines):
+    from external_data_stream import ExternalDataStreamGenerator
+    from sim_clock import VirtualClock
+
+    clock = VirtualClock(datetime(2026, 1, 1))
+    generator = ExternalDataStreamGenerator(stream_file=os.devnull, clock=clock, seed=0)
+    with open(path, "w") as f:
+        for _ in range(lines):
+            clock.sleep(20)
+            f.write(json.dumps(generator.next_signal()) + "\n")
+    return generator, clock
+
+
+def bench_external_poll(engine, size):
+    """Cost of one poll_external_stream iteration vs. file size: first read, idle, incremental"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "external_events.jsonl"
+        generator, clock = _write_external_file(path, size)
+
+        started = time.perf_counter()
+        processed = engine.poll_external_stream_once(path, 0)
+        first = time.perf_counter() - started
+        assert processed == size
+
+        idle = []
+        for _ in range(POLL_REPEATS):
+            started = time.perf_counter()
+            engine.poll_external_stream_once(path, processed)
+            idle.append((time.perf_counter() - started) * 1000)
+
+        incremental = []
+        for _ in range(POLL_REPEATS):
+            with open(path, "a") as f:
+                for _ in range(POLL_APPENDED):
+                    clock.sleep(20)
+                    f.write(json.dumps(generator.next_signal()) + "\n")
+            started = time.perf_counter()
+            processed = engine.poll_external_stream_once(path, processed)
+            incremental.append((time.perf_counter() - started) * 1000)
+
+    params = {"lines": size}
+    return [
+        _result("external.poll.first", params, "lines_per_sec", size / first, "lines/s", True),
+        _result("external.poll.idle", params, "median_ms", statistics.median(idle), "ms", False),
+        _result("external.poll.incremental", dict(params, appended=POLL_APPENDED), "median_ms",
+                statistics.median(incremental), "ms", False),
+    ]
+
+
+def bench_fallback_update(engine, size):
+    """update_fallback_state() cost with `size` transactions in history"""
+    _reset_history(engine, size)
+    samples = []
+    for _ in range(FALLBACK_REPEATS):
+        started = time.perf_counter()
+        engine.update_fallback_state()
+        samples.append((time.perf_counter() - started) * 1000)
+    return [_result("fallback.update", {"history": size}, "median_ms", statistics.median(samples), "ms", False)]
+
+
+def bench_budget_writes(size):
+    """budget_system expense throughput with `size` transactions already recorded for the user"""
+    import budget_system
+
+    def reset():
+        with budget_system.budget_lock:
+            budget_system.user_budgets.pop(BUDGET_USER, None)
+        budget_system.init_budget_op({"user_id": BUDGET_USER})
+        budget_system.allocate_income_op({
+            "user_id": BUDGET_USER,
+            "income_amount": 1e9,
+            "allocations": {"living_expenses": 4e8, "emergency_fund": 2e8, "investments": 2e8, "savings": 2e8},
+        })
+        with budget_system.budget_lock:
+            transactions = budget_system.user_budgets[BUDGET_USER]["transactions"]
+            transactions.extend(
+                {"id": f"bench_{i}", "type": "expense", "amount": -10.0, "category": "Groceries",
+                 "bucket": "living_expenses", "description": "benchmark", "timestamp": datetime.now().isoformat()}
+                for i in range(size)
+            )
+
+    reset()
+    started = time.perf_counter()
+    for i in range(BUDGET_OPS):
+        _, status = budget_system.handle_expense_op(
+            {"user_id": BUDGET_USER, "amount": 10 + i % 90, "category": "Groceries"}
+        )
+        assert status == 200
+    single = BUDGET_OPS / (time.perf_counter() - started)
+
+    reset()
+    started = time.perf_counter()
+    for b in range(BUDGET_OPS // BATCH_SIZE):
+        operations = [{"op": "expense", "amount": 10 + i % 90, "category": "Groceries"} for i in range(BATCH_SIZE)]
+        _, status = budget_system.batch_operations_op({"user_id": BUDGET_USER, "operations": operations})
+        assert status == 200
+    batched = (BUDGET_OPS // BATCH_SIZE) * BATCH_SIZE / (time.perf_counter() - started)
+
+    with budget_system.budget_lock:
+        budget_system.user_budgets.pop(BUDGET_USER, None)
+    return [
+        _result("budget.write.single", {"history": size}, "ops_per_sec", single, "ops/s", True),
+        _result("budget.write.batch", {"history": size, "batch_size": BATCH_SIZE}, "ops_per_sec", batched, "ops/s", True),
+    ]
+
+
+# ---------- runner ----------
+
+def best_of(runs):
+    """Merge repeated runs of one case, keeping each metric's best value"""
+    merged = {}
+    for run in runs:
+        for result in run:
+            if result.get("value") is None:
+                merged.setdefault(result["name"], result)
+                continue
+            key = result_key(result)
+            current = merged.get(key)
+            better = max if result["higher_is_better"] else min
+            if current is None or better(result["value"], current["value"]) != current["value"]:
+                merged[key] = result
+    return list(merged.values())
+
+
+def run_suite(sizes, only=None, repeat=DEFAULT_REPEAT, log=print):
+    engine, client = _load_engine()
+    cases = []
+    for size in sizes:
+        cases += [
+            ("ingest.fallback", size, lambda s: _run_fallback_ingest(engine, client, s)),
+            ("ingest.pathway", size, lambda s: _run_pathway_ingest(engine, client, s)),
+            ("metrics.read", size, lambda s: bench_metrics_under_ingest(engine, client, s)),
+            ("external.poll", size, lambda s: bench_external_poll(engine, s)),
+            ("fallback.update", size, lambda s: bench_fallback_update(engine, s)),
+            ("budget.write", size, bench_budget_writes),
+        ]
+
+    results = []
+    for name, size, run in cases:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        started = time.perf_counter()
+        results += best_of([run(size) for _ in range(repeat)])
+        log(f"  {name:<16} size={size:<7} {time.perf_counter() - started:6.2f}s")
+
+    with engine.state_lock:
+        engine.transaction_history.clear()
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": _git_commit(),
+            "pathway_available": engine.PATHWAY_AVAILABLE,
+            "sizes": sizes,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _run_fallback_ingest(engine, client, size):
+    running = engine.PATHWAY_RUNNING
+    engine.PATHWAY_RUNNING = False  # force the in-memory path even if Pathway is up
+    try:
+        return bench_ingest(engine, client, size, "fallback")
+    finally:
+        engine.PATHWAY_RUNNING = running
+
+
+def _run_pathway_ingest(engine, client, size):
+    if not (engine.PATHWAY_AVAILABLE and engine.PATHWAY_RUNNING):
+        return [_skipped(f"ingest.pathway[history={size}]", "pathway not installed or not running")]
+    return bench_ingest(engine, client, size, "pathway")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}].{result['metric']}"
+
+
+def compare(results, baseline, tolerance):
+    """Per-metric comparison rows and the list of regressions (worse than baseline by > tolerance)"""
+    baseline_by_key = {result_key(r): r for r in baseline.get("results", []) if r.get("value") is not None}
+    rows, regressions = [], []
+    for result in results:
+        if result.get("value") is None:
+            rows.append((result["name"], None, None, "skipped: " + result.get("skipped", "")))
+            continue
+        key = result_key(result)
+        base = baseline_by_key.get(key)
+        if base is None or not base["value"]:
+            rows.append((key, result["value"], None, "new"))
+            continue
+        change = (result["value"] - base["value"]) / base["value"]
+        worse = -change if result["higher_is_better"] else change
+        regressed = worse > tolerance
+        if result["unit"] == "ms" and abs(result["value"] - base["value"]) < MIN_REGRESSION_MS:
+            regressed = False
+        if not regressed:
+            status = "ok"
+        elif result.get("gate", True):
+            status = "REGRESSION"
+            regressions.append(key)
+        else:
+            status = "slower (not gating)"
+        rows.append((key, result["value"], base["value"], f"{status} ({change:+.0%})"))
+    return rows, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated data sizes (history length / file lines)")
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name starts with this")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per case (best value is kept)")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with these results")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    print(f"Running engine benchmarks (sizes {sizes})")
+    report = run_suite(sizes, only=args.only, repeat=args.repeat)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        rows, regressions = compare(report["results"], baseline, args.tolerance)
+        print(f"\nCompared with {baseline_path} (commit {baseline['meta'].get('commit')}, tolerance {args.tolerance:.0%}):")
+        for key, value, base, status in rows:
+            value_text = f"{value:>12,.2f}" if value is not None else " " * 12
+            base_text = f"{base:>12,.2f}" if base is not None else " " * 12
+            print(f"  {key:<78} {value_text} {base_text}  {status}")
+    else:
+        print(f"\nNo baseline at {baseline_path}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline saved to {baseline_path}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s)")
+        sys.exit(1)
@@ -0,0 +1,94 @@
+"""
+Benchmark: per-session economy state in the event generator
+============================================================
+Simulates many concurrent players, each polling generate_event() with its own
+session id and balance trajectory from a thread pool (as Flask's threaded server
+would), and reports throughput. Every player's final recovery flag is checked
+against a sequential replay of its trajectory, so cross-session interference shows
+up as a mismatch.
+
+Usage (from the backend folder):
+    python benchmarks/bench_event_sessions.py --players 5000 --events 20 --threads 32
+    python benchmarks/bench_event_sessions.py --http   # go through the Flask routes
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("EVENT_GENERATOR_VERBOSE", "false")
+
+import financial_event_generator as generator  # noqa: E402
+
+
+def balance_trajectory(rng, length):
+    """Random walk that regularly crosses the critical and recovery thresholds"""
+    balance = rng.uniform(-500, 5000)
+    trajectory = []
+    for _ in range(length):
+        trajectory.append(round(balance, 2))
+        balance += rng.uniform(-1500, 1500)
+    return trajectory
+
+
+def expected_recovery(trajectory):
+    recovery = False
+    for balance in trajectory:
+        recovery = generator.select_regime(balance, recovery)[2]
+    return recovery
+
+
+def run(players, events, threads, seed, use_http):
+    rng = random.Random(seed)
+    trajectories = {f"player-{i}": balance_trajectory(rng, events) for i in range(players)}
+    client = generator.app.test_client() if use_http else None
+
+    def play(item):
+        session_id, trajectory = item
+        for balance in trajectory:
+            if client is not None:
+                response = client.get("/events", query_string={"balance": balance, "session": session_id})
+                assert response.status_code == 200
+            else:
+                generator.generate_event(balance, session_id=session_id)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(play, trajectories.items()))
+    elapsed = time.perf_counter() - started
+
+    mismatches = 0
+    for session_id, trajectory in trajectories.items():
+        state = generator.economy_sessions.peek(session_id)
+        if (
+            state is None
+            or state["recovery_mode_active"] != expected_recovery(trajectory)
+            or state["events_generated"] != len(trajectory)
+        ):
+            mismatches += 1
+
+    total = players * events
+    print(f"{'Flask routes' if use_http else 'generate_event()'}: {players:,} players x {events} events, {threads} threads")
+    print(f"  {total:,} events in {elapsed:.3f}s ({total / elapsed:,.0f} events/sec)")
+    print(f"  sessions: {generator.economy_sessions.stats()}")
+    print(f"  per-session state mismatches: {mismatches}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20, help="events per player")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--http", action="store_true", help="call GET /events through the Flask test client")
+    args = parser.parse_args()
+
+    if args.players > generator.economy_sessions.max_sessions:
+        print(f"Note: {args.players:,} players exceed the store capacity "
+              f"({generator.economy_sessions.max_sessions:,}); evicted sessions will be reported as mismatches")
+    sys.exit(1 if run(args.players, args.events, args.threads, args.seed, args.http) else 0)
@@ -0,0 +1,90 @@
+"""
+Benchmark: memoized rule-based views
+====================================
+Per-call cost of the engine's rule-based views when their inputs are unchanged (a
+memoized hit returning cached JSON bytes) versus when every call changes an input (a
+full re-render plus serialization, which is what every call cost before memoization):
+
+  alerts          check_real_time_alerts() + alerts_view.json_bytes()
+  intelligence    compute_intelligence() + intelligence_view.json_bytes()
+  fallback        LLMService._mock_insights()
+  GET /alerts     through the ASGI app (FastAPI TestClient)
+
+Usage (from the backend folder):
+    python benchmarks/bench_rule_views.py
+    python benchmarks/bench_rule_views.py --calls 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def per_call_us(fn, calls):
+    started = time.perf_counter()
+    for index in range(calls):
+        fn(index)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def run(args):
+    os.environ.setdefault("MOUNT_BUDGET_API", "false")
+    os.environ.setdefault("LLM_PROVIDER", "mock")
+    from fastapi.testclient import TestClient
+    import pathway_streaming_enhanced as engine
+
+    metrics = engine.latest_metrics
+    metrics.update(balance=4200.0, total_income=9000.0, total_expenses=-4800.0, financial_health_score=46.0)
+    llm = engine.get_llm_service()
+    intelligence = {"risk_level": "MEDIUM"}
+
+    def nudge(index):
+        # A different balance every call forces a re-render
+        metrics["balance"] = 4200.0 + index % 1000
+
+    def alerts(index, changing):
+        if changing:
+            nudge(index)
+        engine.check_real_time_alerts()
+        engine.alerts_view.json_bytes()
+
+    def intelligence_rules(index, changing):
+        if changing:
+            nudge(index)
+        engine.compute_intelligence()
+        engine.intelligence_view.json_bytes()
+
+    def fallback(index, changing):
+        llm._mock_insights(dict(metrics, balance=4200.0 + (index % 1000 if changing else 0)), intelligence)
+
+    print(f"\n{'view':<16}{'re-render us':>14}{'unchanged us':>14}{'speedup':>10}")
+    for name, fn in (("alerts", alerts), ("intelligence", intelligence_rules), ("fallback", fallback)):
+        render = per_call_us(lambda index: fn(index, True), args.calls)
+        hit = per_call_us(lambda index: fn(index, False), args.calls)
+        print(f"{name:<16}{render:>14.1f}{hit:>14.1f}{render / hit:>9.1f}x")
+
+    with TestClient(engine.app) as client:
+        requests = max(1, args.calls // 20)
+        render = per_call_us(lambda index: (nudge(index), client.get("/alerts")), requests)
+        hit = per_call_us(lambda index: client.get("/alerts"), requests)
+        print(f"{'GET /alerts':<16}{render:>14.1f}{hit:>14.1f}{render / hit:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as stream_dir:
+        # TestClient runs the startup hook; its external signal generator writes here,
+        # not to the tracked data_streams file
+        os.environ["EXTERNAL_STREAM_FILE"] = os.path.join(stream_dir, "external_events.jsonl")
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
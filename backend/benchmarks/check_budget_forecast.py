@@ -0,0 +1,87 @@
+"""
+Check: budget forecasts count down while no transactions arrive
+===============================================================
+Feeds a BudgetForecaster a month of daily groceries and one rent payment against fixed
+bucket balances, then reads the forecast on a controlled clock at --step-days intervals
+over --days days with no further transactions.
+
+Exits 1 if any bucket's days-left increases between reads, or if its projected depletion
+date moves while no transactions arrive.
+
+Usage (from the backend folder):
+    python benchmarks/check_budget_forecast.py
+    python benchmarks/check_budget_forecast.py --days 90 --step-days 1
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BUCKETS = {"living_expenses": 18000.0, "rent": 30000.0, "savings": 50000.0}
+START = datetime(2026, 1, 1)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=60.0, help="days read without new transactions")
+    parser.add_argument("--step-days", type=float, default=5.0, help="days between reads")
+    args = parser.parse_args()
+
+    import budget_forecast
+    from budget_forecast import BudgetForecaster
+
+    clock = Clock(START)
+    forecaster = BudgetForecaster(BUCKETS, clock=clock)
+    transactions = [{"type": "expense", "bucket": "living_expenses", "amount": -600,
+                     "timestamp": (START + timedelta(days=day)).isoformat()} for day in range(30)]
+    transactions.append({"type": "expense", "bucket": "rent", "amount": -15000,
+                         "timestamp": (START + timedelta(days=29)).isoformat()})
+    forecaster.record_transactions("check", transactions, BUCKETS)
+
+    last_at = START + timedelta(days=29)
+    reads = []
+    day = 0.0
+    while day <= args.days:
+        clock.now = last_at + timedelta(days=day)
+        # Read past the cache age so every read is re-projected
+        clock.now += timedelta(seconds=budget_forecast.FORECAST_MAX_AGE_SECONDS)
+        reads.append((day, forecaster.get_forecast("check")))
+        day += args.step_days
+
+    tracked = [name for name in BUCKETS if reads[0][1]["buckets"][name]["days_until_depleted"] is not None]
+    print(f"\n{'day':>6}" + "".join(f"{name + ' days left':>26}" for name in tracked))
+    for day, forecast in reads:
+        print(f"{day:>6g}" + "".join(f"{forecast['buckets'][name]['days_until_depleted']:>26}" for name in tracked))
+
+    failures = []
+    for name in tracked:
+        for (day, previous), (_, current) in zip(reads, reads[1:]):
+            before, after = previous["buckets"][name], current["buckets"][name]
+            if after["days_until_depleted"] > before["days_until_depleted"]:
+                failures.append(f"{name}: days left rose from {before['days_until_depleted']} to "
+                                f"{after['days_until_depleted']} after day {day:g}")
+            if after["projected_depletion_date"] != before["projected_depletion_date"]:
+                failures.append(f"{name}: depletion date moved from {before['projected_depletion_date']} to "
+                                f"{after['projected_depletion_date']} after day {day:g}")
+    if not tracked:
+        failures.append("no bucket has a depletion projection")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: days left only counted down while no transactions arrived")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
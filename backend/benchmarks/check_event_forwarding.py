@@ -0,0 +1,122 @@
+"""
+Check: forwarded generator events move the engine's balance the right way
+=========================================================================
+Serves the engine with uvicorn on a free local port, records an income through POST
+/ingest, then forwards --expenses generator expenses through the event generator's
+conversion (to_ingest_event) and an EventForwarder, the path EVENT_GENERATOR_FORWARD=true
+uses. Reads GET /metrics once the engine has seen every event.
+
+Exits 1 if an expense is not delivered, or if the balance does not go down by the total
+of the forwarded expenses.
+
+Usage (from the backend folder):
+    python benchmarks/check_event_forwarding.py
+    python benchmarks/check_event_forwarding.py --expenses 50
+"""
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def generator_expenses(count, seed):
+    from financial_event_generator import simulate_events
+    from sim_clock import make_rng
+
+    events = simulate_events(count=None, rng=make_rng(seed, "check-forwarding"))
+    return list(islice((event for event in events if event["type"] == "Expense"), count))
+
+
+def wait_for_count(client, count, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        metrics = client.get("/metrics").json()
+        if metrics.get("transaction_count", 0) >= count:
+            return metrics
+        time.sleep(0.05)
+    return client.get("/metrics").json()
+
+
+def run(args):
+    import httpx
+    import uvicorn
+    import pathway_streaming_enhanced as engine
+    from event_forwarder import EventForwarder
+    from financial_event_generator import to_ingest_event
+
+    port = free_port()
+    engine_server = uvicorn.Server(uvicorn.Config(engine.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=engine_server.run, name="engine", daemon=True)
+    thread.start()
+    while not engine_server.started:
+        time.sleep(0.05)
+
+    expenses = generator_expenses(args.expenses, args.seed)
+    forwarder = EventForwarder(f"http://127.0.0.1:{port}/ingest", flush_interval=0.05)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as client:
+            client.post("/ingest", json={"type": "income", "amount": args.income,
+                                         "category": "Salary"}).raise_for_status()
+            before = wait_for_count(client, 1, args.timeout)
+            forwarder.start()
+            for event in expenses:
+                forwarder.submit(to_ingest_event(event))
+            forwarder.stop()
+            after = wait_for_count(client, 1 + len(expenses), args.timeout)
+    finally:
+        engine_server.should_exit = True
+        thread.join(timeout=10)
+    return expenses, before, after, forwarder.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expenses", type=int, default=20, help="generator expenses to forward")
+    parser.add_argument("--income", type=float, default=500000.0, help="income recorded before the expenses")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for the engine to see events")
+    args = parser.parse_args()
+
+    os.environ.setdefault("MOUNT_BUDGET_API", "false")
+    os.environ.setdefault("LLM_PROVIDER", "mock")
+    with tempfile.TemporaryDirectory() as stream_dir:
+        # The engine's external signal generator writes here, not to the tracked data_streams file
+        os.environ["EXTERNAL_STREAM_FILE"] = os.path.join(stream_dir, "external_events.jsonl")
+        expenses, before, after, stats = run(args)
+
+    spent = sum(event["amount"] for event in expenses)
+    change = after["balance"] - before["balance"]
+    print(f"\nforwarded {len(expenses)} expenses totalling {spent:.2f}")
+    print(f"{'':<10}{'balance':>14}{'expenses':>14}{'transactions':>14}")
+    for name, metrics in (("before", before), ("after", after)):
+        print(f"{name:<10}{metrics['balance']:>14.2f}{metrics['total_expenses']:>14.2f}"
+              f"{metrics['transaction_count']:>14}")
+    print(f"forwarder: {stats}")
+
+    failures = []
+    if stats["delivered"] != len(expenses):
+        failures.append(f"{stats['delivered']} of {len(expenses)} expenses were delivered")
+    if abs(change + spent) > 0.01:
+        failures.append(f"balance changed by {change:+.2f}, expected {-spent:+.2f}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: forwarded expenses lowered the balance by their total")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
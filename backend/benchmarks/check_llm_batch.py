@@ -0,0 +1,133 @@
+"""
+Check: batched multi-user insight generation
+============================================
+Generates insights for --users users with different analytics against the fake provider
+(benchmarks/fake_llm_server.py) twice: one provider call per user (the pool runs
+LLM_MAX_CONCURRENCY at once), then through LLMService.submit_batch, which packs up to
+--batch-size users into one structured multi-answer call. Reports throughput (users/min),
+provider calls, prompt tokens and cost per user. Prices default to gpt-4o-mini's
+(LLM_PRICE_INPUT_PER_MTOK / LLM_PRICE_OUTPUT_PER_MTOK) so the fake local model has a cost.
+
+The fake provider charges --request-delay per call (network and prompt processing) and
+--token-delay per output chunk, so a batch takes as long as its combined answer.
+
+Exits 1 if a user is not answered by the provider, if batch answers are not in the
+insight cache afterwards, or if batching is not faster and cheaper per user.
+
+Usage (from the backend folder):
+    python benchmarks/check_llm_batch.py
+    python benchmarks/check_llm_batch.py --users 64 --batch-size 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+
+def user_inputs(index):
+    """Distinct analytics per user (different balance buckets, risk levels and categories)"""
+    balance = 2000 * (index + 1)
+    return (
+        {"balance": balance, "total_income": balance * 1.5, "total_expenses": -balance * 0.5,
+         "financial_health_score": 30 + index % 70},
+        {"risk_level": RISK_LEVELS[index % 4], "alerts": [], "warnings": []},
+        {f"category{index % 5}": {"expenses": -500 * (index % 7 + 1)}},
+    )
+
+
+def make_service(server, batch_size):
+    from llm_providers import OllamaBackend
+    from llm_service import LLMService
+
+    llm = LLMService(backends=[OllamaBackend(base_url=server.url, model="fake")])
+    llm.batch_max_users = batch_size
+    return llm
+
+
+async def run_single(args, users):
+    with FakeLLMServer(token_delay=args.token_delay, first_token_delay=args.request_delay) as server:
+        llm = make_service(server, args.batch_size)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(llm.generate_financial_insights(*inputs, use_cache=False)
+                                         for inputs in users))
+        seconds = time.perf_counter() - started
+        usage = llm.usage.stats()
+        await llm.aclose()
+    return {
+        "results": results, "seconds": seconds, "calls": server.requests,
+        "prompt_tokens": usage["prompt_tokens"] / len(users), "cost": usage["cost_usd"] / len(users),
+        "cached": len(users),
+    }
+
+
+async def run_batch(args, users):
+    with FakeLLMServer(token_delay=args.token_delay, first_token_delay=args.request_delay) as server:
+        llm = make_service(server, args.batch_size)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(llm.submit_batch(f"user-{index}", *inputs)
+                                         for index, inputs in enumerate(users)))
+        seconds = time.perf_counter() - started
+        usage, stats = llm.usage.stats(), llm.batch_stats()
+        cached = sum(llm.get_cached_insights(*inputs) is not None for inputs in users)
+        await llm.aclose()
+    return {
+        "results": results, "seconds": seconds, "calls": server.requests,
+        "prompt_tokens": usage["prompt_tokens"] / len(users), "cost": stats["cost_per_user_usd"],
+        "cached": cached, "stats": stats,
+    }
+
+
+async def main_async(args):
+    users = [user_inputs(index) for index in range(args.users)]
+    single = await run_single(args, users)
+    batch = await run_batch(args, users)
+
+    print(f"\n{args.users} users, batches of up to {args.batch_size}")
+    print(f"{'mode':<10}{'seconds':>9}{'users/min':>11}{'calls':>7}{'prompt tok/user':>17}{'cost/user USD':>15}")
+    for name, result in (("single", single), ("batch", batch)):
+        print(f"{name:<10}{result['seconds']:>9.2f}{args.users / result['seconds'] * 60:>11.0f}{result['calls']:>7}"
+              f"{result['prompt_tokens']:>17.0f}{result['cost']:>15.8f}")
+    print(f"batch_stats: {batch['stats']}")
+
+    failures = []
+    for name, result in (("single", single), ("batch", batch)):
+        fallback = sum(insights.get("provider") != "ollama" for insights in result["results"])
+        if fallback:
+            failures.append(f"{name}: {fallback} users were not answered by the provider")
+    if batch["cached"] != args.users:
+        failures.append(f"batch: only {batch['cached']}/{args.users} answers are in the insight cache")
+    if batch["seconds"] >= single["seconds"]:
+        failures.append("batch: not faster than one call per user")
+    if batch["cost"] >= single["cost"]:
+        failures.append("batch: not cheaper per user")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: batching served {args.users / batch['seconds'] * 60:.0f} users/min "
+              f"({single['seconds'] / batch['seconds']:.1f}x) at {single['cost'] / batch['cost']:.2f}x lower cost per user")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--request-delay", type=float, default=0.5, help="per-call provider overhead in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds per output chunk")
+    args = parser.parse_args()
+    os.environ.setdefault("LLM_PRICE_INPUT_PER_MTOK", "0.15")
+    os.environ.setdefault("LLM_PRICE_OUTPUT_PER_MTOK", "0.60")
+    os.environ.setdefault("MOUNT_BUDGET_API", "false")
+    sys.exit(1 if asyncio.run(main_async(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Check: LLM provider failover, circuit breaking and hedged requests
+==================================================================
+Runs two fake providers (benchmarks/fake_llm_server.py) as a "primary" and a
+"fallback" Ollama and drives LLMService generations through them in three scenarios:
+
+    failover    the primary fails slowly (HTTP 503 after --fail-delay seconds). Every
+                call is answered by the fallback, and once the primary's breaker opens
+                calls stop waiting on it. Then the primary recovers: after the breaker's
+                reset time one trial call goes to it and closes the circuit.
+    hedge       the primary is slow (--slow-delay before its first token). With hedging
+                on, the fallback is asked after --hedge-delay and answers first; later
+                calls are routed to the faster fallback first. Then the primary speeds
+                up: once its latency stats are --stale-after seconds old one call probes
+                it, and it is routed first again.
+    no-hedge    the same slow primary without hedging, for comparison.
+
+Exits 1 if a call is not answered by a provider, if calls keep waiting on an open
+circuit, if the primary does not recover, if the hedged call is not faster, or if the
+sped-up primary does not win its traffic back.
+
+Usage (from the backend folder):
+    python benchmarks/check_llm_failover.py
+    python benchmarks/check_llm_failover.py --fail-delay 2 --slow-delay 3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+
+INPUTS = (
+    {"balance": 42000, "total_income": 60000, "total_expenses": -18000, "financial_health_score": 78},
+    {"risk_level": "LOW", "alerts": [], "warnings": []},
+    {"Food": {"expenses": -6000}, "Rent": {"expenses": -12000}},
+)
+
+
+def make_service(primary, fallback, hedge=False, hedge_delay=2.0, reset_seconds=30.0):
+    from llm_providers import OllamaBackend
+    from llm_service import LLMService
+
+    backends = [OllamaBackend(name="primary", base_url=primary.url, model="fake"),
+                OllamaBackend(name="fallback", base_url=fallback.url, model="fake")]
+    for backend in backends:
+        backend.breaker.reset_seconds = reset_seconds
+    llm = LLMService(backends=backends)
+    llm.hedge, llm.hedge_delay = hedge, hedge_delay
+    return llm
+
+
+async def timed_calls(llm, count):
+    results = []
+    for _ in range(count):
+        started = time.perf_counter()
+        insights = await llm.generate_financial_insights(*INPUTS, use_cache=False)
+        results.append((insights["provider"], time.perf_counter() - started, llm.provider_stats()["route"]))
+    return results
+
+
+def show(title, results):
+    print(f"\n{title}")
+    print(f"{'call':<6}{'answered by':<18}{'ms':>8}  route after")
+    for index, (provider, seconds, route) in enumerate(results, 1):
+        print(f"{index:<6}{provider:<18}{seconds * 1000:>8.0f}  {' -> '.join(route) or '-'}")
+
+
+async def scenario_failover(args, failures):
+    with FakeLLMServer(token_delay=args.token_delay, status_code=503, first_token_delay=args.fail_delay) as primary, \
+            FakeLLMServer(token_delay=args.token_delay) as fallback:
+        llm = make_service(primary, fallback, reset_seconds=args.reset_seconds)
+        threshold = llm.backends[0].breaker.failure_threshold
+        results = await timed_calls(llm, threshold + 3)
+        show(f"failover: primary fails after {args.fail_delay:g}s", results)
+        if any(provider != "fallback" for provider, _, _ in results):
+            failures.append("failover: a call was not answered by the fallback provider")
+        if primary.requests != threshold:
+            failures.append(f"failover: primary was called {primary.requests} times "
+                            f"(breaker should open after {threshold})")
+        slow_after_open = [seconds for _, seconds, _ in results[threshold:] if seconds >= args.fail_delay]
+        if slow_after_open:
+            failures.append(f"failover: {len(slow_after_open)} calls still waited on the open circuit")
+
+        primary.status_code, primary.first_token_delay = 200, 0.0
+        await asyncio.sleep(args.reset_seconds)
+        recovered = await timed_calls(llm, 2)
+        show(f"recovery: primary healthy again after {args.reset_seconds:g}s", recovered)
+        state = llm.backends[0].breaker.state
+        print(f"primary circuit: {state}")
+        if recovered[0][0] != "primary" or state != "closed":
+            failures.append("recovery: the half-open trial did not return traffic to the primary")
+        await llm.aclose()
+
+
+async def scenario_hedge(args, failures):
+    summary = {}
+    for hedge in (False, True):
+        with FakeLLMServer(token_delay=args.token_delay, first_token_delay=args.slow_delay) as primary, \
+                FakeLLMServer(token_delay=args.token_delay) as fallback:
+            llm = make_service(primary, fallback, hedge=hedge, hedge_delay=args.hedge_delay)
+            results = await timed_calls(llm, 3)
+            name = "hedge" if hedge else "no-hedge"
+            show(f"{name}: primary takes {args.slow_delay:g}s longer"
+                 + (f", hedge after {args.hedge_delay:g}s" if hedge else ""), results)
+            summary[name] = results
+            if hedge:
+                primary.first_token_delay = 0.0
+                for backend in llm.backends:
+                    backend.latency.stale_after = args.stale_after
+                await asyncio.sleep(args.stale_after)
+                results = await timed_calls(llm, 2)
+                show(f"re-probe: primary fast again, latency stats stale after {args.stale_after:g}s", results)
+                summary["re-probe"] = results
+            await llm.aclose()
+
+    hedged_first = summary["hedge"][0]
+    if hedged_first[0] != "fallback" or hedged_first[1] >= summary["no-hedge"][0][1]:
+        failures.append("hedge: the hedged call was not answered faster by the fallback")
+    if summary["hedge"][-1][2][:1] != ["fallback"]:
+        failures.append("hedge: the slow primary is still routed first")
+    if summary["re-probe"][0][0] != "primary" or summary["re-probe"][-1][2][:1] != ["primary"]:
+        failures.append("re-probe: the primary was not re-measured and routed first after speeding up")
+
+
+async def main_async(args):
+    os.environ.setdefault("MOUNT_BUDGET_API", "false")
+    failures = []
+    await scenario_failover(args, failures)
+    await scenario_hedge(args, failures)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("\nOK: failed and slow providers were routed around")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between streamed tokens")
+    parser.add_argument("--fail-delay", type=float, default=1.0, help="seconds before the failing primary errors")
+    parser.add_argument("--slow-delay", type=float, default=1.5, help="extra first-token delay of the slow primary")
+    parser.add_argument("--hedge-delay", type=float, default=0.3, help="hedge delay before latency samples exist")
+    parser.add_argument("--stale-after", type=float, default=1.0,
+                        help="LLM_LATENCY_STALE_SECONDS for the re-probe step")
+    parser.add_argument("--reset-seconds", type=float, default=1.0, help="breaker reset time for the check")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main_async(args)) else 0)
+
+
+if __name__ == "__main__":
+    main()
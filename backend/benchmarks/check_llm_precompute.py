@@ -0,0 +1,133 @@
+"""
+Check: LLM insights are precomputed after material state changes
+================================================================
+Starts the fake provider (benchmarks/fake_llm_server.py) as a local Ollama, points the
+engine's LLMService at it and drives the engine in-process. Each run ingests a burst of
+--burst expenses (--burst-gap seconds apart) that escalates the rules risk level, waits
+--read-after seconds (a user opening the dashboard) and reads GET /insights/llm:
+
+    off    precompute disabled: the read finds no insights for the new state and gets
+           the previous state's insights while a refresh starts
+    on     the precompute scheduler saw the escalation, waited for the burst to settle
+           and generated the new state's insights once, before the read
+
+Exits 1 if the read after the precomputed change is not a fresh provider answer, or if
+the burst caused more than one precompute generation.
+
+Usage (from the backend folder):
+    python benchmarks/check_llm_precompute.py
+    python benchmarks/check_llm_precompute.py --burst 10 --token-delay 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+
+
+async def ingest(client, kind, amount, category):
+    response = await client.post("/ingest", json={"type": kind, "amount": amount, "category": category})
+    response.raise_for_status()
+
+
+async def run_change(client, engine, server, args, expense, enabled):
+    """Burst of expenses, then the first read; returns what that read saw"""
+    scheduler = engine.precompute_scheduler
+    scheduler.enabled = enabled
+    # Refreshes started by an earlier read finish first, so they are not counted here
+    await asyncio.gather(*engine.get_llm_service()._inflight.values())
+    requests_before, risk_before = server.requests, engine.latest_intelligence.get("risk_level")
+    for index in range(args.burst):
+        await ingest(client, "expense", -expense / args.burst, f"Category{index % 3}")
+        await asyncio.sleep(args.burst_gap)
+    burst_calls = server.requests - requests_before
+    await asyncio.sleep(args.read_after)
+    started = time.perf_counter()
+    response = await client.get("/insights/llm")
+    response.raise_for_status()
+    insights = response.json()
+    return {
+        "risk": f"{risk_before} -> {engine.latest_intelligence.get('risk_level')}",
+        "read_ms": (time.perf_counter() - started) * 1000,
+        "cache": insights.get("cache"),
+        "provider": insights.get("provider"),
+        "calls_before_read": server.requests - requests_before,
+        "calls_during_burst": burst_calls,
+    }
+
+
+async def run(args, server):
+    import httpx
+    import pathway_streaming_enhanced as engine
+
+    llm = engine.get_llm_service()
+    if llm.provider != "ollama":
+        raise RuntimeError(f"LLMService did not select the fake Ollama (provider={llm.provider})")
+    scheduler = engine.precompute_scheduler
+    scheduler.debounce_seconds = args.debounce
+
+    transport = httpx.ASGITransport(app=engine.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://engine") as client:
+        # Healthy baseline with insights already generated and read
+        await ingest(client, "income", 60000, "Salary")
+        await ingest(client, "expense", -10000, "Rent")
+        await llm.generate_financial_insights(*engine.llm_inputs(engine.gather_llm_context()))
+        (await client.get("/insights/llm")).raise_for_status()
+        scheduler.start()
+
+        # LOW -> HIGH (balance under 2000) without precompute, HIGH -> CRITICAL (overdrawn) with it
+        off = await run_change(client, engine, server, args, 48500, enabled=False)
+        on = await run_change(client, engine, server, args, 5000, enabled=True)
+        stats = scheduler.stats()
+        scheduler.stop()
+        # Let the refresh the "off" read started finish before the loop closes
+        await asyncio.gather(*llm._inflight.values())
+    await llm.aclose()
+    return off, on, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=6, help="expenses per state change")
+    parser.add_argument("--burst-gap", type=float, default=0.05, help="seconds between expenses in a burst")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="LLM_PRECOMPUTE_DEBOUNCE_SECONDS (risk escalations wait a quarter of it)")
+    parser.add_argument("--read-after", type=float, default=2.0, help="seconds from the change to the first read")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    args = parser.parse_args()
+
+    with FakeLLMServer(token_delay=args.token_delay) as server:
+        os.environ["LLM_PROVIDER"] = "ollama"
+        os.environ["OLLAMA_BASE_URL"] = server.url
+        os.environ["OLLAMA_MODEL"] = "fake"
+        os.environ.setdefault("MOUNT_BUDGET_API", "false")
+        off, on, stats = asyncio.run(run(args, server))
+
+    print(f"\n{'precompute':<12}{'risk':<20}{'calls in burst':>15}{'calls by read':>14}{'read cache':>12}"
+          f"{'read provider':>18}{'read ms':>9}")
+    for name, result in (("off", off), ("on", on)):
+        print(f"{name:<12}{result['risk']:<20}{result['calls_during_burst']:>15}{result['calls_before_read']:>14}"
+              f"{str(result['cache']):>12}{str(result['provider']):>18}{result['read_ms']:>9.1f}")
+    print(f"precompute stats: {stats}")
+
+    failures = []
+    if on["cache"] != "fresh" or on["provider"] != "ollama":
+        failures.append(f"first read after the change was {on['cache']} from {on['provider']}, not fresh from ollama")
+    if on["calls_before_read"] != 1:
+        failures.append(f"the burst caused {on['calls_before_read']} precompute generations (expected 1)")
+    if off["cache"] == "fresh":
+        failures.append("without precompute the first read was already fresh; the change was not material")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: the first read after a risk escalation was already warm")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Check: streamed LLM insights render before the generation finishes
+==================================================================
+Starts the fake provider (benchmarks/fake_llm_server.py) as a slow local Ollama, serves
+the engine with uvicorn on a free local port, and reads GET /insights/llm/stream the way
+a browser EventSource would. Reports when the provider sent its first token, when the
+first summary text reached the client, and when the final insights arrived.
+
+Exits 1 if the first summary delta lands more than --budget-ms after the provider's first
+token, or if the stream does not end with provider insights.
+
+Usage (from the backend folder):
+    python benchmarks/check_llm_stream.py
+    python benchmarks/check_llm_stream.py --token-delay 0.2 --tokens 40
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_events(lines):
+    """Parse an SSE line iterator into (event, data) pairs"""
+    event, data = None, []
+    for line in lines:
+        if line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+        elif not line and data:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
+
+
+def run(args, server):
+    import httpx
+    import uvicorn
+    import pathway_streaming_enhanced as engine
+
+    port = free_port()
+    engine_server = uvicorn.Server(uvicorn.Config(engine.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=engine_server.run, name="engine", daemon=True)
+    thread.start()
+    while not engine_server.started:
+        time.sleep(0.05)
+
+    timeline = {}
+    done = None
+    try:
+        started = time.perf_counter()
+        with httpx.stream("GET", f"http://127.0.0.1:{port}/insights/llm/stream", timeout=60.0) as response:
+            response.raise_for_status()
+            for event, payload in read_events(response.iter_lines()):
+                elapsed = time.perf_counter() - started
+                if event == "delta" and payload["section"] == "summary":
+                    timeline.setdefault("first_summary", elapsed)
+                elif event == "recommendation":
+                    timeline.setdefault("first_recommendation", elapsed)
+                elif event == "done":
+                    timeline["done"] = elapsed
+                    done = payload
+    finally:
+        engine_server.should_exit = True
+        thread.join(timeout=10)
+    if server.first_token_at is not None:
+        timeline["first_token"] = server.first_token_at - started
+    return timeline, done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-delay", type=float, default=0.1, help="seconds between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=300.0,
+                        help="allowed delay from first provider token to first summary delta")
+    args = parser.parse_args()
+
+    with FakeLLMServer(token_delay=args.token_delay, tokens=args.tokens) as server:
+        os.environ["LLM_PROVIDER"] = "ollama"
+        os.environ["OLLAMA_BASE_URL"] = server.url
+        os.environ["OLLAMA_MODEL"] = "fake"
+        os.environ.setdefault("MOUNT_BUDGET_API", "false")
+        with tempfile.TemporaryDirectory() as stream_dir:
+            # The engine's external signal generator writes here, not to the tracked data_streams file
+            os.environ["EXTERNAL_STREAM_FILE"] = os.path.join(stream_dir, "external_events.jsonl")
+            timeline, done = run(args, server)
+
+    print(f"\n{'milestone':<26}{'ms after request':>18}")
+    for label, key in (("provider first token", "first_token"), ("first summary delta", "first_summary"),
+                       ("first recommendation", "first_recommendation"), ("final insights", "done")):
+        value = timeline.get(key)
+        print(f"{label:<26}{(f'{value * 1000:.0f}' if value is not None else '-'):>18}")
+
+    failures = []
+    if done is None or done["insights"].get("provider") != "ollama":
+        failures.append("stream did not end with insights from the fake Ollama")
+    if "first_summary" not in timeline or "first_token" not in timeline:
+        failures.append("no summary delta was streamed")
+    elif (timeline["first_summary"] - timeline["first_token"]) * 1000 > args.budget_ms:
+        failures.append(f"first summary delta came {(timeline['first_summary'] - timeline['first_token']) * 1000:.0f}ms "
+                        f"after the first token (budget {args.budget_ms:.0f}ms)")
+    elif "done" in timeline and timeline["first_summary"] >= timeline["done"]:
+        failures.append("summary only arrived with the final insights")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: summary rendered while the generation was still streaming")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
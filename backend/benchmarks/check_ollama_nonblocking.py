@@ -0,0 +1,140 @@
+"""
+Check: Ollama generation does not stall the engine's event loop
+===============================================================
+Starts the fake provider (benchmarks/fake_llm_server.py) as a slow local Ollama,
+points the engine's LLMService at it, and measures GET /metrics latency, first idle
+and then while an insight generation streams from the fake model on the same event
+loop. With a non-blocking client the two latency profiles match. --compare-blocking
+also runs the old pattern (a synchronous httpx call inside a coroutine) to show
+what a stalled loop looks like.
+
+Exits 1 if /metrics latency degrades during generation.
+
+Usage (from the backend folder):
+    python benchmarks/check_ollama_nonblocking.py
+    python benchmarks/check_ollama_nonblocking.py --token-delay 0.2 --compare-blocking
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_llm_server import FakeLLMServer  # noqa: E402
+
+POLL_INTERVAL = 0.02
+IDLE_SAMPLES = 50
+# During generation p95 may exceed idle p95 by this much before the check fails
+ALLOWED_P95_INCREASE = 0.05
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "n": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def timed_get(client, path):
+    started = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def poll_while(client, task):
+    latencies = []
+    while not task.done():
+        latencies.append(await timed_get(client, "/metrics"))
+        await asyncio.sleep(POLL_INTERVAL)
+    return latencies
+
+
+async def run(args, server):
+    import httpx
+    import pathway_streaming_enhanced as engine
+
+    llm = engine.get_llm_service()
+    if llm.provider != "ollama":
+        raise RuntimeError(f"LLMService did not select the fake Ollama (provider={llm.provider})")
+
+    transport = httpx.ASGITransport(app=engine.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://engine") as client:
+        idle = []
+        for _ in range(IDLE_SAMPLES):
+            idle.append(await timed_get(client, "/metrics"))
+            await asyncio.sleep(POLL_INTERVAL)
+
+        inputs = engine.llm_inputs(engine.gather_llm_context())
+        started = time.perf_counter()
+        task = asyncio.ensure_future(llm.generate_financial_insights(*inputs, use_cache=False))
+        during = await poll_while(client, task)
+        insights = await task
+        generation_seconds = time.perf_counter() - started
+
+        blocking = None
+        if args.compare_blocking:
+            def blocking_call():
+                with httpx.Client(base_url=server.url, timeout=60.0) as sync_client:
+                    sync_client.post("/api/generate", json={"model": "fake", "prompt": "x", "stream": False})
+
+            async def old_pattern():
+                blocking_call()   # what the old _generate_ollama_insights did inside async def
+
+            task = asyncio.ensure_future(old_pattern())
+            blocking = await poll_while(client, task)
+            await task
+
+    await llm.aclose()
+    return idle, during, blocking, insights, generation_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--token-delay", type=float, default=0.1, help="seconds between streamed tokens")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--compare-blocking", action="store_true",
+                        help="also measure the old synchronous client pattern")
+    args = parser.parse_args()
+
+    with FakeLLMServer(token_delay=args.token_delay, tokens=args.tokens) as server:
+        os.environ["LLM_PROVIDER"] = "ollama"
+        os.environ["OLLAMA_BASE_URL"] = server.url
+        os.environ["OLLAMA_MODEL"] = "fake"
+        os.environ.setdefault("MOUNT_BUDGET_API", "false")
+        idle, during, blocking, insights, generation_seconds = asyncio.run(run(args, server))
+
+    print(f"\nGeneration: {generation_seconds:.2f}s via provider={insights.get('provider')} "
+          f"({server.requests} provider requests)")
+    rows = [("idle", idle), ("during generation", during)]
+    if blocking is not None:
+        rows.append(("old blocking client", blocking))
+    print(f"{'GET /metrics':<22}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for label, latencies in rows:
+        stats = summarize(latencies)
+        print(f"{label:<22}{stats['n']:>5}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+
+    idle_stats, during_stats = summarize(idle), summarize(during)
+    failures = []
+    if insights.get("provider") != "ollama":
+        failures.append("generation fell back instead of streaming from the fake Ollama")
+    if len(during) < 5:
+        failures.append(f"only {len(during)} /metrics requests completed during a {generation_seconds:.2f}s generation")
+    if during_stats["p95_ms"] > idle_stats["p95_ms"] + ALLOWED_P95_INCREASE * 1000:
+        failures.append("/metrics p95 degraded during generation")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: /metrics latency unaffected by a running Ollama generation")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Fake LLM provider server for local checks
+=========================================
+A small threaded HTTP server that speaks enough of the Ollama API for LLMService:
+
+    GET  /api/tags       health check
+    POST /api/generate   {"stream": true} -> NDJSON token chunks, else one JSON object
+
+Responses are a fixed insight in the JSON shape LLMService requests (summary,
+risk_analysis, recommendations) emitted as `tokens` chunks `token_delay` seconds apart,
+so a generation takes a known amount of wall time without a real model. The final chunk
+reports prompt_eval_count / eval_count (~4 characters per token) like Ollama does.
+
+A request whose `format` schema asks for "users" (LLMService batch mode) is answered with
+the same insight for every "[user <id>]" block in the prompt, streamed as `tokens` chunks
+per user, so a batch takes as long as its output is.
+
+Failure and latency scenarios (attributes can be changed while the server runs):
+    status_code         /api/generate answers with this HTTP status (e.g. 503) and no tokens
+    first_token_delay   extra seconds before the first token (or the error), like a slow or
+                        cold model
+
+Usage:
+    python benchmarks/fake_llm_server.py --port 11500 --token-delay 0.05
+or in-process:
+    with FakeLLMServer(token_delay=0.05) as server:
+        os.environ["OLLAMA_BASE_URL"] = server.url
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE_TEXT = json.dumps({
+    "summary": "Your balance is stable and income covers current spending.",
+    "risk_analysis": "Risk is LOW; expenses are well below income.",
+    "recommendations": [
+        "Keep an emergency fund of three months of expenses",
+        "Move surplus income into savings each month",
+        "Review subscriptions quarterly",
+    ],
+})
+
+
+def batch_text(text, prompt):
+    """A multi-user answer: `text` once per [user <id>] block of the prompt"""
+    ids = re.findall(r"^\[user (\S+)\]", prompt, flags=re.MULTILINE)
+    return json.dumps({"users": [dict(json.loads(text), id=user_id) for user_id in ids]}), max(1, len(ids))
+
+
+def split_tokens(text, count):
+    """Split text into `count` roughly equal chunks"""
+    size = max(1, len(text) // count)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeLLMServer:
+    """Threaded fake provider; use as a context manager or start()/stop()"""
+
+    def __init__(self, host="127.0.0.1", port=0, token_delay=0.05, tokens=20, text=RESPONSE_TEXT,
+                 status_code=200, first_token_delay=0.0):
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.text = text
+        self.status_code = status_code
+        self.first_token_delay = first_token_delay
+        self.requests = 0
+        self.first_token_at = None     # perf_counter() when the latest stream sent its first token
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._json(200, {"models": [{"name": "fake"}]})
+                else:
+                    self._json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/generate":
+                    self._json(404, {"error": "not found"})
+                    return
+                server.requests += 1
+                if server.status_code != 200:
+                    time.sleep(server.first_token_delay)    # a slow failure, like a timing-out upstream
+                    self._json(server.status_code, {"error": "fake provider failure"})
+                    return
+                text, users = server.text, 1
+                if "users" in (request.get("format") or {}).get("properties", {}):
+                    text, users = batch_text(server.text, request.get("prompt", ""))
+                chunks = split_tokens(text, server.tokens * users)
+                if not request.get("stream", True):
+                    time.sleep(server.first_token_delay + server.token_delay * len(chunks))
+                    self._json(200, {"model": request.get("model"), "response": text, "done": True})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for index, chunk in enumerate(chunks + [""]):
+                    time.sleep((server.token_delay if chunk else 0) + (server.first_token_delay if index == 0 else 0))
+                    message = {"response": chunk, "done": index == len(chunks)}
+                    if message["done"]:
+                        message.update(prompt_eval_count=len(request.get("prompt", "")) // 4, eval_count=len(text) // 4)
+                    line = json.dumps(message) + "\n"
+                    data = line.encode()
+                    self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+                    if index == 0:
+                        server.first_token_at = time.perf_counter()
+                self.wfile.write(b"0\r\n\r\n")
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def generation_seconds(self):
+        return self.first_token_delay + self.token_delay * len(split_tokens(self.text, self.tokens))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--status-code", type=int, default=200, help="HTTP status for /api/generate")
+    parser.add_argument("--first-token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeLLMServer(port=args.port, token_delay=args.token_delay, tokens=args.tokens,
+                           status_code=args.status_code, first_token_delay=args.first_token_delay)
+    print(f"Fake LLM provider on {server.url} (~{server.generation_seconds:.1f}s per generation)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
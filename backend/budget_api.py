@@ -0,0 +1,145 @@
+"""
+Budget Allocation API - ASGI Router
+===================================
+FastAPI version of the budget_system endpoints. The handlers and state
+(user_budgets, budget_lock, category_classifier) are shared with the Flask app,
+so the budget API can either:
+
+- be mounted into the streaming engine (pathway_streaming_enhanced.app) and run in
+  the same process and event loop, where expenses can feed the Pathway pipeline
+  in-process via budget_system.transaction_listeners, or
+- run on its own ASGI server:  uvicorn budget_api:app --port 5001
+
+The Flask dev server (python budget_system.py) is still available for compatibility.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Body, FastAPI, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+
+import budget_system
+from telemetry import CONTENT_TYPE, RequestMetricsMiddleware, monitor_event_loop_lag, render
+
+# Handlers are plain `def` so FastAPI runs them in its threadpool: budget_lock is a
+# threading.Lock and must never be waited on from the event loop thread.
+router = APIRouter(prefix="/budget", tags=["budget"])
+
+
+def _respond(result):
+    payload, status_code = result
+    return JSONResponse(content=payload, status_code=status_code)
+
+
+@router.post("/init")
+def init_budget(data: Optional[Dict[str, Any]] = Body(default=None)):
+    """Initialize budget for a user"""
+    return _respond(budget_system.init_budget_op(data))
+
+
+@router.post("/allocate")
+def allocate_income(data: Optional[Dict[str, Any]] = Body(default=None)):
+    """Allocate income across budget buckets"""
+    return _respond(budget_system.allocate_income_op(data))
+
+
+@router.post("/expense")
+def handle_expense(data: Optional[Dict[str, Any]] = Body(default=None)):
+    """Process an expense from appropriate bucket"""
+    return _respond(budget_system.handle_expense_op(data))
+
+
+@router.post("/batch")
+def batch_operations(data: Optional[Dict[str, Any]] = Body(default=None)):
+    """Apply an ordered list of allocations and expenses, atomically per user"""
+    return _respond(budget_system.batch_operations_op(data))
+
+
+@router.get("/buckets/{user_id}")
+def get_buckets(user_id: str):
+    """Get current bucket balances"""
+    return _respond(budget_system.get_buckets_op(user_id))
+
+
+@router.get("/metrics/{user_id}")
+def get_metrics(user_id: str):
+    """Get financial metrics"""
+    return _respond(budget_system.get_metrics_op(user_id))
+
+
+@router.get("/alerts/{user_id}")
+def get_alerts(user_id: str):
+    """Get current alerts"""
+    return _respond(budget_system.get_alerts_op(user_id))
+
+
+@router.get("/transactions/{user_id}")
+def get_transactions(user_id: str, limit: int = Query(default=50)):
+    """Get transaction history"""
+    return _respond(budget_system.get_transactions_op(user_id, limit))
+
+
+@router.get("/forecast/{user_id}")
+def get_forecast(user_id: str):
+    """Get per-bucket depletion projections (cached, no history replay)"""
+    return _respond(budget_system.get_forecast_op(user_id))
+
+
+@router.get("/categories")
+def get_category_mapping():
+    """Get the category mapping, active overrides and classifier stats"""
+    return _respond(budget_system.get_category_mapping_op())
+
+
+@router.put("/categories/overrides")
+def set_category_overrides(data: Optional[Dict[str, Any]] = Body(default=None)):
+    """Replace the category overrides without a restart"""
+    return _respond(budget_system.set_category_overrides_op(data))
+
+
+@router.post("/categories/reload")
+def reload_category_overrides():
+    """Reload category overrides from CATEGORY_OVERRIDES_FILE"""
+    return _respond(budget_system.reload_category_overrides_op())
+
+
+@router.get("/status")
+def status():
+    """Health check"""
+    return _respond(budget_system.status_op())
+
+
+# Standalone ASGI app (same routes as the Flask server on port 5001)
+app = FastAPI(
+    title="FinTwitch Budget Allocation System",
+    description="Category-based budget buckets (ASGI)",
+)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(RequestMetricsMiddleware, service="budget")
+app.include_router(router)
+
+
+# Outside the /budget prefix: /budget/metrics/{user_id} would shadow it. When the router is
+# mounted in the engine, the engine's own /metrics/prometheus exports the same registry.
+@app.get("/metrics/prometheus")
+def metrics_prometheus():
+    """Prometheus metrics"""
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    asyncio.create_task(monitor_event_loop_lag("budget"))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("budget_api:app", host="0.0.0.0", port=5001, reload=False)
@@ -0,0 +1,180 @@
+"""
+Budget Forecasting Engine for FinTwitch
+=======================================
+Projects per-bucket depletion dates and monthly shortfalls from each user's
+expense history (the `bucket` field on expense transactions) and income allocations.
+
+Projections are maintained incrementally: every committed transaction updates an
+exponentially-decayed spend/inflow rate per bucket in O(1), so reading a forecast never
+replays transaction history. Forecasts are projected from the last transaction, the point
+where the bucket balances are known: depletion dates stay fixed until the next transaction
+while days-left counts down from the current time. The rendered forecast is cached per
+user for FORECAST_MAX_AGE_SECONDS.
+"""
+
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+# Decay horizon for spend/inflow rates: recent behaviour dominates, older months fade out
+RATE_HALF_LIFE_DAYS = 30.0
+# Rent, salaries and bills are monthly, so spend and inflow histories shorter than a month
+# are treated as a month long: a single ₹15,000 rent is ~₹700/day, not ₹15,000/day
+MIN_HISTORY_DAYS = 30.0
+DAYS_PER_MONTH = 30.0
+# Cached forecasts are re-projected from the current time once they are this old
+FORECAST_MAX_AGE_SECONDS = 60.0
+
+_TAU_DAYS = RATE_HALF_LIFE_DAYS / math.log(2)
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return datetime.now()
+
+
+class DecayedRate:
+    """Exponentially-decayed event rate (amount per day), updated in O(1) per event"""
+
+    __slots__ = ("min_history_days", "weighted_sum", "first_time", "last_time", "count")
+
+    def __init__(self, min_history_days: float = MIN_HISTORY_DAYS):
+        self.min_history_days = min_history_days
+        self.weighted_sum = 0.0
+        self.first_time: Optional[datetime] = None
+        self.last_time: Optional[datetime] = None
+        self.count = 0
+
+    def add(self, amount: float, when: datetime):
+        if self.last_time is None:
+            self.first_time = self.last_time = when
+        elif when > self.last_time:
+            elapsed_days = (when - self.last_time).total_seconds() / 86400
+            self.weighted_sum *= math.exp(-elapsed_days / _TAU_DAYS)
+            self.last_time = when
+        # Out-of-order events are added at full weight (they are close to last_time in practice)
+        self.weighted_sum += amount
+        self.count += 1
+
+    def per_day(self, as_of: datetime) -> float:
+        """Bias-corrected rate as of a point in time"""
+        if self.last_time is None:
+            return 0.0
+        decay = math.exp(-max(0.0, (as_of - self.last_time).total_seconds()) / 86400 / _TAU_DAYS)
+        history_days = max(self.min_history_days, (as_of - self.first_time).total_seconds() / 86400)
+        # Weight mass a constant rate would have accumulated over the observed history
+        window = _TAU_DAYS * (1 - math.exp(-history_days / _TAU_DAYS))
+        return self.weighted_sum * decay / window
+
+
+class UserForecast:
+    """Running per-bucket state for one user"""
+
+    def __init__(self, bucket_names: Iterable[str]):
+        self.spend = {name: DecayedRate() for name in bucket_names}
+        self.inflow = {name: DecayedRate() for name in bucket_names}
+        self.balances = {name: 0.0 for name in bucket_names}
+        self.last_transaction_at: Optional[datetime] = None
+        self.cached: Optional[Dict[str, Any]] = None
+        self.rendered_at: Optional[datetime] = None
+
+
+class BudgetForecaster:
+    """Thread-safe, incrementally updated per-user bucket forecasts"""
+
+    def __init__(self, bucket_names: Iterable[str], clock=datetime.now):
+        self.bucket_names = list(bucket_names)
+        self._users: Dict[str, UserForecast] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def record_transactions(self, user_id: str, transactions, buckets: Dict[str, float]):
+        """Fold committed transactions into the user's rates (the cached forecast is re-rendered on read)"""
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None:
+                state = self._users[user_id] = UserForecast(self.bucket_names)
+
+            for transaction in transactions:
+                when = _parse_timestamp(transaction.get("timestamp"))
+                if transaction.get("type") == "expense":
+                    bucket = transaction.get("bucket")
+                    if bucket in state.spend:
+                        state.spend[bucket].add(abs(transaction["amount"]), when)
+                elif transaction.get("type") == "income":
+                    for bucket, amount in (transaction.get("allocations") or {}).items():
+                        if bucket in state.inflow and amount > 0:
+                            state.inflow[bucket].add(amount, when)
+                if state.last_transaction_at is None or when > state.last_transaction_at:
+                    state.last_transaction_at = when
+
+            state.balances = {name: float(buckets.get(name, 0)) for name in self.bucket_names}
+            state.cached = None
+
+    def get_forecast(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Forecast for a user as of now (None if no transactions have been recorded)"""
+        now = self._clock()
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None:
+                return None
+            if state.cached is None or (now - state.rendered_at).total_seconds() >= FORECAST_MAX_AGE_SECONDS:
+                state.cached = self._render(user_id, state, now)
+                state.rendered_at = now
+            return state.cached
+
+    def _render(self, user_id: str, state: UserForecast, now: datetime) -> Dict[str, Any]:
+        # Balances are as of the last transaction, so rates and depletion dates are too;
+        # days-left is counted from now (or from the last transaction if it is stamped ahead
+        # of the wall clock, as simulated time is)
+        anchor = state.last_transaction_at or now
+        as_of = max(now, anchor)
+        buckets = {}
+        total_shortfall = 0.0
+        earliest = None
+
+        for name in self.bucket_names:
+            balance = state.balances[name]
+            spend_rate = state.spend[name].per_day(anchor)
+            inflow_rate = state.inflow[name].per_day(anchor)
+            net_burn = spend_rate - inflow_rate
+
+            days_until_depleted = None
+            depletion_date = None
+            if net_burn > 0 and spend_rate > 0:
+                depletes_at = anchor + timedelta(days=max(0.0, balance) / net_burn)
+                days_until_depleted = max(0.0, (depletes_at - as_of).total_seconds() / 86400)
+                depletion_date = depletes_at.isoformat()
+                if earliest is None or days_until_depleted < earliest[1]:
+                    earliest = (name, days_until_depleted)
+
+            monthly_spend = spend_rate * DAYS_PER_MONTH
+            monthly_inflow = inflow_rate * DAYS_PER_MONTH
+            shortfall = max(0.0, monthly_spend - monthly_inflow - max(0.0, balance))
+            total_shortfall += shortfall
+
+            buckets[name] = {
+                "balance": round(balance, 2),
+                "daily_spend_rate": round(spend_rate, 2),
+                "daily_inflow_rate": round(inflow_rate, 2),
+                "days_until_depleted": round(days_until_depleted, 1) if days_until_depleted is not None else None,
+                "projected_depletion_date": depletion_date,
+                "projected_monthly_spend": round(monthly_spend, 2),
+                "monthly_shortfall": round(shortfall, 2),
+                "expense_count": state.spend[name].count
+            }
+
+        return {
+            "user_id": user_id,
+            "as_of": as_of.isoformat(),
+            "last_transaction_at": state.last_transaction_at.isoformat() if state.last_transaction_at else None,
+            "buckets": buckets,
+            "total_monthly_shortfall": round(total_shortfall, 2),
+            "first_bucket_to_deplete": earliest[0] if earliest else None,
+            "rate_half_life_days": RATE_HALF_LIFE_DAYS
+        }
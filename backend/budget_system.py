@@ -3,19 +3,28 @@ Budget Allocation System for FinTwitch
 Real-time financial intelligence simulator with category-based budget buckets
 """
 
+import copy
 import datetime
+import os
 import uuid
 from datetime import datetime
+from pathlib import Path
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import threading
 
+from budget_forecast import BudgetForecaster
+from category_classifier import CategoryClassifier
+from telemetry import InstrumentedLock, instrument_flask
+
 app = Flask(__name__)
 CORS(app)
+# Request latency per route plus GET /metrics/prometheus
+instrument_flask(app, service="budget")
 
 # Global storage for user budget data (in production, use database)
 user_budgets = {}
-budget_lock = threading.Lock()
+budget_lock = InstrumentedLock(threading.Lock(), "budget_lock")
 
 # Budget Categories
 BUDGET_CATEGORIES = {
@@ -51,6 +60,33 @@ RISK_THRESHOLDS = {
     "high_risk_balance": 2000
 }
 
+# Optional JSON file of {"category keyword": "bucket"} overrides, reloadable at runtime
+CATEGORY_OVERRIDES_FILE = os.getenv(
+    "BUDGET_CATEGORY_OVERRIDES",
+    str(Path(__file__).parent / "category_overrides.json")
+)
+
+category_classifier = CategoryClassifier(
+    EXPENSE_CATEGORY_MAPPING,
+    valid_buckets=BUDGET_CATEGORIES.keys(),
+    default_bucket="living_expenses",
+    overrides_file=CATEGORY_OVERRIDES_FILE
+)
+try:
+    category_classifier.reload_overrides()
+except (ValueError, OSError) as e:
+    print(f"WARNING: Could not load category overrides: {e}")
+
+# Upper bound on operations accepted by a single /budget/batch request
+MAX_BATCH_OPERATIONS = 10000
+
+# Per-bucket depletion projections, updated as transactions commit
+budget_forecaster = BudgetForecaster(BUDGET_CATEGORIES.keys())
+
+# Callbacks run with (user_id, transaction) after budget changes are committed.
+# The streaming engine registers one when the budget API is mounted in-process.
+transaction_listeners = []
+
 
 def get_default_budget():
     """Initialize default budget structure"""
@@ -154,34 +190,130 @@ def generate_alerts(budget_data):
 
 
 def categorize_expense(expense_category):
-    """Map expense category to budget bucket"""
-    for key, bucket in EXPENSE_CATEGORY_MAPPING.items():
-        if key.lower() in expense_category.lower():
-            return bucket
-    return "living_expenses"  # Default fallback
+    """Map expense category to budget bucket (falls back to living_expenses)"""
+    return category_classifier.classify(expense_category)
 
 
-@app.route('/budget/init', methods=['POST'])
-def init_budget():
+def notify_transaction_listeners(user_id, transactions):
+    """Hand committed transactions to registered listeners (called outside budget_lock)"""
+    for listener in list(transaction_listeners):
+        for transaction in transactions:
+            try:
+                listener(user_id, transaction)
+            except Exception as e:
+                print(f"WARNING: Budget transaction listener failed: {e}")
+
+
+# ==================== REQUEST HANDLERS (shared by Flask and the ASGI router) ====================
+# Each handler takes plain request data and returns (payload, status_code).
+
+def init_budget_op(data):
     """Initialize budget for a user"""
-    data = request.json
+    data = data or {}
     user_id = data.get('user_id')
     
     if not user_id:
-        return jsonify({"error": "user_id required"}), 400
+        return {"error": "user_id required"}, 400
     
     with budget_lock:
         if user_id not in user_budgets:
             budget = get_default_budget()
             budget["user_id"] = user_id
             user_budgets[user_id] = budget
-            return jsonify({"message": "Budget initialized", "budget": budget}), 201
+            return {"message": "Budget initialized", "budget": copy.deepcopy(budget)}, 201
         else:
-            return jsonify({"message": "Budget already exists", "budget": user_budgets[user_id]}), 200
+            return {"message": "Budget already exists", "budget": copy.deepcopy(user_budgets[user_id])}, 200
 
 
-@app.route('/budget/allocate', methods=['POST'])
-def allocate_income():
+def get_or_create_budget(user_id):
+    """Return the user's budget, creating a default one if needed (caller holds budget_lock)"""
+    if user_id not in user_budgets:
+        budget = get_default_budget()
+        budget["user_id"] = user_id
+        user_budgets[user_id] = budget
+    return user_budgets[user_id]
+
+
+def validate_allocation(income_amount, allocations):
+    """Return an error message if the allocation is invalid, otherwise None"""
+    total_allocated = sum(allocations.values())
+    if total_allocated > income_amount:
+        return f"Total allocation (Rupee {total_allocated}) exceeds income (Rupee {income_amount})"
+    return None
+
+
+def apply_allocation(budget, income_amount, allocations, description):
+    """Credit bucket balances and record the income transaction (no metrics/alerts refresh)"""
+    for bucket, amount in allocations.items():
+        if bucket in budget["buckets"]:
+            budget["buckets"][bucket] += amount
+    
+    transaction = {
+        "id": str(uuid.uuid4()),
+        "type": "income",
+        "amount": income_amount,
+        "allocations": allocations,
+        "bucket": None,  # Income goes to multiple buckets
+        "description": description,
+        "timestamp": datetime.now().isoformat()
+    }
+    budget["transactions"].append(transaction)
+    return transaction
+
+
+def apply_expense(budget, amount, category, description):
+    """
+    Deduct an expense from its bucket and record the transaction (no metrics/alerts refresh)
+    Returns (transaction, deficit, alert) where alert is set when the bucket ran short
+    """
+    bucket_name = categorize_expense(category)
+    bucket_balance = budget["buckets"][bucket_name]
+    
+    deficit = 0
+    alert = None
+    
+    # Deduct from bucket
+    if bucket_balance >= amount:
+        budget["buckets"][bucket_name] -= amount
+    else:
+        # Insufficient funds in bucket
+        deficit = amount - bucket_balance
+        budget["buckets"][bucket_name] = 0
+        
+        alert = {
+            "id": str(uuid.uuid4()),
+            "type": "danger",
+            "category": bucket_name,
+            "message": f"Insufficient funds in {BUDGET_CATEGORIES[bucket_name]['name']}! Deficit: Rupee {deficit:.2f}",
+            "timestamp": datetime.now().isoformat(),
+            "severity": "critical"
+        }
+    
+    transaction = {
+        "id": str(uuid.uuid4()),
+        "type": "expense",
+        "amount": -amount,
+        "category": category,
+        "bucket": bucket_name,
+        "description": description,
+        "deficit": deficit,
+        "timestamp": datetime.now().isoformat(),
+        "resulting_balance": budget["buckets"][bucket_name]
+    }
+    budget["transactions"].append(transaction)
+    return transaction, deficit, alert
+
+
+def refresh_derived_state(budget, extra_alerts=None):
+    """Recompute metrics and alerts once after a set of bucket changes"""
+    budget["metrics"] = calculate_metrics(budget)
+    budget["alerts"] = generate_alerts(budget)
+    if extra_alerts:
+        # Most recent deficit alert first, matching the single-expense endpoint
+        budget["alerts"][:0] = list(reversed(extra_alerts))
+
+
+def allocate_income_op(data):
     """
     Allocate income across budget buckets
     Body: {
@@ -196,64 +328,38 @@ def allocate_income():
         "description": "Salary March 2026"
     }
     """
-    data = request.json
+    data = data or {}
     user_id = data.get('user_id')
     income_amount = data.get('income_amount', 0)
     allocations = data.get('allocations', {})
     description = data.get('description', 'Income allocation')
     
     if not user_id:
-        return jsonify({"error": "user_id required"}), 400
+        return {"error": "user_id required"}, 400
     
     # Validate allocation total
-    total_allocated = sum(allocations.values())
-    if total_allocated > income_amount:
-        return jsonify({"error": f"Total allocation (Rupee {total_allocated}) exceeds income (Rupee {income_amount})"}), 400
+    error = validate_allocation(income_amount, allocations)
+    if error:
+        return {"error": error}, 400
     
     with budget_lock:
-        # Initialize if not exists
-        if user_id not in user_budgets:
-            budget = get_default_budget()
-            budget["user_id"] = user_id
-            user_budgets[user_id] = budget
-        
-        budget = user_budgets[user_id]
-        
-        # Update bucket balances
-        for bucket, amount in allocations.items():
-            if bucket in budget["buckets"]:
-                budget["buckets"][bucket] += amount
-        
-        # Record transaction
-        transaction = {
-            "id": str(uuid.uuid4()),
-            "type": "income",
-            "amount": income_amount,
-            "allocations": allocations,
-            "bucket": None,  # Income goes to multiple buckets
-            "description": description,
-            "timestamp": datetime.now().isoformat()
-        }
-        budget["transactions"].append(transaction)
-        
-        # Update metrics
-        budget["metrics"] = calculate_metrics(budget)
-        
-        # Generate alerts
-        budget["alerts"] = generate_alerts(budget)
-        
-        user_budgets[user_id] = budget
-        
-        return jsonify({
-            "message": "Income allocated successfully",
-            "transaction": transaction,
-            "buckets": budget["buckets"],
-            "metrics": budget["metrics"]
-        }), 200
+        budget = get_or_create_budget(user_id)
+        transaction = apply_allocation(budget, income_amount, allocations, description)
+        refresh_derived_state(budget)
+        budget_forecaster.record_transactions(user_id, [transaction], budget["buckets"])
+        buckets = budget["buckets"].copy()
+        metrics = budget["metrics"]
+    
+    notify_transaction_listeners(user_id, [transaction])
+    return {
+        "message": "Income allocated successfully",
+        "transaction": transaction,
+        "buckets": buckets,
+        "metrics": metrics
+    }, 200
 
 
-@app.route('/budget/expense', methods=['POST'])
-def handle_expense():
+def handle_expense_op(data):
     """
     Process an expense from appropriate bucket
     Body: {
@@ -263,148 +369,376 @@ def handle_expense():
         "description": "Monthly rent payment"
     }
     """
-    data = request.json
+    data = data or {}
     user_id = data.get('user_id')
     amount = abs(data.get('amount', 0))  # Ensure positive
     category = data.get('category', 'General')
     description = data.get('description', '')
     
     if not user_id or amount <= 0:
-        return jsonify({"error": "user_id and positive amount required"}), 400
+        return {"error": "user_id and positive amount required"}, 400
     
     with budget_lock:
         if user_id not in user_budgets:
-            return jsonify({"error": "Budget not initialized"}), 404
+            return {"error": "Budget not initialized"}, 404
         
         budget = user_budgets[user_id]
-        
-        # Determine which bucket to use
-        bucket_name = categorize_expense(category)
-        bucket_balance = budget["buckets"][bucket_name]
-        
-        deficit = 0
-        alert = None
-        
-        # Deduct from bucket
-        if bucket_balance >= amount:
-            budget["buckets"][bucket_name] -= amount
-        else:
-            # Insufficient funds in bucket
-            deficit = amount - bucket_balance
-            budget["buckets"][bucket_name] = 0
+        transaction, deficit, alert = apply_expense(budget, amount, category, description)
+        refresh_derived_state(budget, [alert] if alert else None)
+        budget_forecaster.record_transactions(user_id, [transaction], budget["buckets"])
+        buckets = budget["buckets"].copy()
+        metrics = budget["metrics"]
+    
+    notify_transaction_listeners(user_id, [transaction])
+    return {
+        "message": "Expense processed",
+        "transaction": transaction,
+        "buckets": buckets,
+        "metrics": metrics,
+        "deficit": deficit > 0,
+        "alert": alert
+    }, 200
+
+
+def _apply_batch_operation(budget, op):
+    """Apply one batch operation to a budget. Returns (result, deficit_alert) or raises ValueError"""
+    kind = op.get('op')
+    
+    if kind == 'allocate':
+        income_amount = op.get('income_amount', 0)
+        allocations = op.get('allocations', {})
+        error = validate_allocation(income_amount, allocations)
+        if error:
+            raise ValueError(error)
+        transaction = apply_allocation(budget, income_amount, allocations, op.get('description', 'Income allocation'))
+        return {"transaction": transaction}, None
+    
+    if kind == 'expense':
+        amount = abs(op.get('amount', 0))
+        if amount <= 0:
+            raise ValueError("positive amount required")
+        transaction, deficit, alert = apply_expense(
+            budget, amount, op.get('category', 'General'), op.get('description', '')
+        )
+        return {"transaction": transaction, "deficit": deficit > 0, "alert": alert}, alert
+    
+    raise ValueError(f"Unknown op '{kind}' (expected 'allocate' or 'expense')")
+
+
+def batch_operations_op(data):
+    """
+    Apply an ordered list of allocations and expenses, atomically per user
+    Body: {
+        "user_id": "user123",            # optional default for operations
+        "operations": [
+            {"op": "allocate", "income_amount": 50000, "allocations": {...}},
+            {"op": "expense", "amount": 1500, "category": "Rent"},
+            {"op": "expense", "user_id": "user456", "amount": 200, "category": "Groceries"}
+        ]
+    }
+    Operations keep their order within each user. If any operation for a user fails,
+    none of that user's operations are applied. Metrics and alerts are recomputed
+    once per user per batch.
+    """
+    data = data or {}
+    default_user_id = data.get('user_id')
+    operations = data.get('operations')
+    
+    if not isinstance(operations, list) or not operations:
+        return {"error": "operations list required"}, 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return {"error": f"Too many operations (max {MAX_BATCH_OPERATIONS})"}, 400
+    
+    # Group operation indices by user, preserving order
+    results = [None] * len(operations)
+    ops_by_user = {}
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            results[index] = {"index": index, "status": "error", "error": "operation must be an object"}
+            continue
+        user_id = op.get('user_id', default_user_id)
+        if not user_id:
+            results[index] = {"index": index, "status": "error", "error": "user_id required"}
+            continue
+        ops_by_user.setdefault(user_id, []).append(index)
+    
+    users = {}
+    committed_transactions = []
+    for user_id, indices in ops_by_user.items():
+        with budget_lock:
+            created = user_id not in user_budgets
+            if created and operations[indices[0]].get('op') != 'allocate':
+                budget = None
+            else:
+                budget = get_or_create_budget(user_id)
             
-            alert = {
-                "id": str(uuid.uuid4()),
-                "type": "danger",
-                "category": bucket_name,
-                "message": f"Insufficient funds in {BUDGET_CATEGORIES[bucket_name]['name']}! Deficit: Rupee {deficit:.2f}",
-                "timestamp": datetime.now().isoformat(),
-                "severity": "critical"
+            # Snapshot for rollback; transactions are append-only so a length is enough
+            if budget is not None:
+                saved_buckets = budget["buckets"].copy()
+                saved_tx_count = len(budget["transactions"])
+            
+            user_results = []
+            deficit_alerts = []
+            failure = None
+            for index in indices:
+                op = operations[index]
+                if budget is None:
+                    failure = (index, "Budget not initialized")
+                    break
+                try:
+                    result, alert = _apply_batch_operation(budget, op)
+                except (ValueError, TypeError, AttributeError) as e:
+                    failure = (index, str(e))
+                    break
+                result.update({"index": index, "op": op.get('op'), "user_id": user_id, "status": "ok"})
+                user_results.append(result)
+                if alert:
+                    deficit_alerts.append(alert)
+            
+            if failure:
+                if budget is not None:
+                    budget["buckets"] = saved_buckets
+                    del budget["transactions"][saved_tx_count:]
+                    if created:
+                        del user_budgets[user_id]
+                failed_index, error = failure
+                for index in indices:
+                    status = "error" if index == failed_index else "rolled_back"
+                    entry = {"index": index, "op": operations[index].get('op'), "user_id": user_id, "status": status}
+                    if index == failed_index:
+                        entry["error"] = error
+                    results[index] = entry
+                users[user_id] = {"committed": False, "error": error}
+                continue
+            
+            refresh_derived_state(budget, deficit_alerts)
+            budget_forecaster.record_transactions(
+                user_id, [r["transaction"] for r in user_results], budget["buckets"]
+            )
+            for result in user_results:
+                results[result["index"]] = result
+            users[user_id] = {
+                "committed": True,
+                "buckets": budget["buckets"].copy(),
+                "metrics": budget["metrics"]
             }
-        
-        # Record transaction
-        transaction = {
-            "id": str(uuid.uuid4()),
-            "type": "expense",
-            "amount": -amount,
-            "category": category,
-            "bucket": bucket_name,
-            "description": description,
-            "deficit": deficit,
-            "timestamp": datetime.now().isoformat(),
-            "resulting_balance": budget["buckets"][bucket_name]
-        }
-        budget["transactions"].append(transaction)
-        
-        # Update metrics
-        budget["metrics"] = calculate_metrics(budget)
-        
-        # Generate alerts
-        budget["alerts"] = generate_alerts(budget)
-        if alert:
-            budget["alerts"].insert(0, alert)
-        
-        user_budgets[user_id] = budget
-        
-        return jsonify({
-            "message": "Expense processed",
-            "transaction": transaction,
-            "buckets": budget["buckets"],
-            "metrics": budget["metrics"],
-            "deficit": deficit > 0,
-            "alert": alert
-        }), 200
+            committed_transactions.append((user_id, [r["transaction"] for r in user_results]))
+    
+    for user_id, transactions in committed_transactions:
+        notify_transaction_listeners(user_id, transactions)
+    
+    all_committed = all(r["status"] == "ok" for r in results)
+    return {
+        "message": "Batch processed" if all_committed else "Batch partially applied",
+        "results": results,
+        "users": users
+    }, 200 if all_committed else 207
 
 
-@app.route('/budget/buckets/<user_id>', methods=['GET'])
-def get_buckets(user_id):
+def get_buckets_op(user_id):
     """Get current bucket balances"""
     with budget_lock:
         if user_id not in user_budgets:
-            return jsonify({"error": "Budget not initialized"}), 404
+            return {"error": "Budget not initialized"}, 404
         
         budget = user_budgets[user_id]
-        return jsonify({
-            "buckets": budget["buckets"],
+        return {
+            "buckets": budget["buckets"].copy(),
             "metrics": calculate_metrics(budget)
-        }), 200
+        }, 200
 
 
-@app.route('/budget/metrics/<user_id>', methods=['GET'])
-def get_metrics(user_id):
+def get_metrics_op(user_id):
     """Get financial metrics"""
     with budget_lock:
         if user_id not in user_budgets:
-            return jsonify({"error": "Budget not initialized"}), 404
+            return {"error": "Budget not initialized"}, 404
         
         budget = user_budgets[user_id]
         metrics = calculate_metrics(budget)
         
-        return jsonify(metrics), 200
+        return metrics, 200
 
 
-@app.route('/budget/alerts/<user_id>', methods=['GET'])
-def get_alerts(user_id):
+def get_alerts_op(user_id):
     """Get current alerts"""
     with budget_lock:
         if user_id not in user_budgets:
-            return jsonify({"error": "Budget not initialized"}), 404
+            return {"error": "Budget not initialized"}, 404
         
         budget = user_budgets[user_id]
         alerts = generate_alerts(budget)
         
-        return jsonify({"alerts": alerts}), 200
+        return {"alerts": alerts}, 200
 
 
-@app.route('/budget/transactions/<user_id>', methods=['GET'])
-def get_transactions(user_id):
+def get_transactions_op(user_id, limit=50):
     """Get transaction history"""
-    limit = request.args.get('limit', type=int, default=50)
-    
     with budget_lock:
         if user_id not in user_budgets:
-            return jsonify({"error": "Budget not initialized"}), 404
+            return {"error": "Budget not initialized"}, 404
         
         budget = user_budgets[user_id]
         transactions = budget["transactions"][-limit:]
         
-        return jsonify({
+        return {
             "transactions": transactions,
             "count": len(transactions)
-        }), 200
+        }, 200
 
 
-@app.route('/budget/status', methods=['GET'])
-def status():
+def get_forecast_op(user_id):
+    """Get per-bucket depletion projections (cached, no history replay)"""
+    forecast = budget_forecaster.get_forecast(user_id)
+    if forecast is None:
+        with budget_lock:
+            if user_id not in user_budgets:
+                return {"error": "Budget not initialized"}, 404
+        return {"user_id": user_id, "buckets": {}, "message": "No transactions yet"}, 200
+    return forecast, 200
+
+
+def get_category_mapping_op():
+    """Get the category mapping, active overrides and classifier stats"""
+    return {
+        "mapping": EXPENSE_CATEGORY_MAPPING,
+        "overrides": category_classifier.overrides,
+        "default_bucket": category_classifier.default_bucket,
+        "stats": category_classifier.stats()
+    }, 200
+
+
+def set_category_overrides_op(data):
+    """
+    Replace the category overrides without a restart
+    Body: {"overrides": {"Gym": "living_expenses", "SIP": "investments"}}
+    """
+    data = data or {}
+    overrides = data.get('overrides')
+    if not isinstance(overrides, dict):
+        return {"error": "overrides object required"}, 400
+    
+    try:
+        category_classifier.set_overrides(overrides)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    return {"message": "Category overrides updated", "overrides": category_classifier.overrides}, 200
+
+
+def reload_category_overrides_op():
+    """Reload category overrides from CATEGORY_OVERRIDES_FILE"""
+    try:
+        overrides = category_classifier.reload_overrides()
+    except (ValueError, OSError) as e:
+        return {"error": f"Could not reload overrides: {e}"}, 400
+    
+    return {"message": "Category overrides reloaded", "overrides": overrides}, 200
+
+
+def status_op():
     """Health check"""
     with budget_lock:
         user_count = len(user_budgets)
     
-    return jsonify({
+    return {
         "status": "running",
         "service": "Budget Allocation System",
         "users": user_count
-    }), 200
+    }, 200
+
+
+# ==================== FLASK ROUTES (standalone mode, port 5001) ====================
+
+@app.route('/budget/init', methods=['POST'])
+def init_budget():
+    """Initialize budget for a user"""
+    payload, status_code = init_budget_op(request.json)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/allocate', methods=['POST'])
+def allocate_income():
+    """Allocate income across budget buckets"""
+    payload, status_code = allocate_income_op(request.json)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/expense', methods=['POST'])
+def handle_expense():
+    """Process an expense from appropriate bucket"""
+    payload, status_code = handle_expense_op(request.json)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/batch', methods=['POST'])
+def batch_operations():
+    """Apply an ordered list of allocations and expenses, atomically per user"""
+    payload, status_code = batch_operations_op(request.json)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/buckets/<user_id>', methods=['GET'])
+def get_buckets(user_id):
+    """Get current bucket balances"""
+    payload, status_code = get_buckets_op(user_id)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/metrics/<user_id>', methods=['GET'])
+def get_metrics(user_id):
+    """Get financial metrics"""
+    payload, status_code = get_metrics_op(user_id)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/alerts/<user_id>', methods=['GET'])
+def get_alerts(user_id):
+    """Get current alerts"""
+    payload, status_code = get_alerts_op(user_id)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/transactions/<user_id>', methods=['GET'])
+def get_transactions(user_id):
+    """Get transaction history"""
+    payload, status_code = get_transactions_op(user_id, request.args.get('limit', type=int, default=50))
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/forecast/<user_id>', methods=['GET'])
+def get_forecast(user_id):
+    """Get per-bucket depletion projections (cached, no history replay)"""
+    payload, status_code = get_forecast_op(user_id)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/categories', methods=['GET'])
+def get_category_mapping():
+    """Get the category mapping, active overrides and classifier stats"""
+    payload, status_code = get_category_mapping_op()
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/categories/overrides', methods=['PUT'])
+def set_category_overrides():
+    """Replace the category overrides without a restart"""
+    payload, status_code = set_category_overrides_op(request.json)
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/categories/reload', methods=['POST'])
+def reload_category_overrides():
+    """Reload category overrides from CATEGORY_OVERRIDES_FILE"""
+    payload, status_code = reload_category_overrides_op()
+    return jsonify(payload), status_code
+
+
+@app.route('/budget/status', methods=['GET'])
+def status():
+    """Health check"""
+    payload, status_code = status_op()
+    return jsonify(payload), status_code
 
 
 if __name__ == "__main__":
@@ -415,10 +749,14 @@ if __name__ == "__main__":
     print("  POST   /budget/init          - Initialize budget")
     print("  POST   /budget/allocate      - Allocate income")
     print("  POST   /budget/expense       - Process expense")
+    print("  POST   /budget/batch         - Bulk allocations and expenses")
     print("  GET    /budget/buckets/<id>  - Get bucket balances")
     print("  GET    /budget/metrics/<id>  - Get financial metrics")
     print("  GET    /budget/alerts/<id>   - Get risk alerts")
     print("  GET    /budget/transactions/<id> - Get transaction history")
+    print("  GET    /budget/forecast/<id> - Bucket depletion forecast")
+    print("  GET    /budget/categories    - Category mapping and overrides")
+    print("  GET    /metrics/prometheus   - Prometheus metrics")
     print("=" * 60)
     
     try:
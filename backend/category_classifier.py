@@ -0,0 +1,166 @@
+"""
+Expense Category Classifier for FinTwitch
+=========================================
+Maps free-text expense categories ("Monthly Rent", "GROCERIES - weekly") to budget buckets.
+
+- One pre-built, case-insensitive Aho-Corasick automaton over every mapping key
+- LRU cache of resolved categories (most expenses repeat a handful of labels)
+- Runtime overrides that take priority over the base mapping, swapped in without a restart
+
+Matching keeps the original semantics: the first key (in mapping order, overrides first)
+that appears as a substring of the category wins; unknown categories use the default bucket.
+"""
+
+import functools
+import json
+import threading
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Distinct unknown categories remembered for the stats endpoint
+MAX_TRACKED_UNMATCHED = 1000
+
+
+class CompiledCategoryMatcher:
+    """Immutable snapshot of a mapping compiled into an Aho-Corasick automaton with its own LRU cache"""
+
+    def __init__(self, mapping: Dict[str, str], default_bucket: str, cache_size: int = 4096):
+        # Drop empty keys: an empty substring would match every category
+        self.keys = [k for k in mapping if k]
+        self.buckets = [mapping[k] for k in self.keys]
+        self.default_bucket = default_bucket
+        self._build_automaton()
+        self.lookup = functools.lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _build_automaton(self):
+        """Build goto/fail tables; each state keeps the best (lowest) key priority ending there"""
+        goto = [{}]
+        best = [None]
+        for priority, key in enumerate(self.keys):
+            state = 0
+            for ch in key.lower():
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    best.append(None)
+                state = nxt
+            if best[state] is None or priority < best[state]:
+                best[state] = priority
+
+        # Breadth-first fail links; fold the fail state's output into each state
+        fail = [0] * len(goto)
+        frontier = deque(goto[0].values())
+        while frontier:
+            state = frontier.popleft()
+            for ch, nxt in goto[state].items():
+                frontier.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                inherited = best[fail[nxt]]
+                if inherited is not None and (best[nxt] is None or inherited < best[nxt]):
+                    best[nxt] = inherited
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+
+    def _resolve(self, category: str) -> Optional[str]:
+        """Return the bucket for the highest-priority key found in category, or None"""
+        goto, fail, best = self._goto, self._fail, self._best
+        state = 0
+        found = None
+        for ch in category.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            priority = best[state]
+            if priority is not None and (found is None or priority < found):
+                found = priority
+                if found == 0:
+                    break
+        return self.buckets[found] if found is not None else None
+
+
+class CategoryClassifier:
+    """Thread-safe category-to-bucket classifier with hot-swappable overrides"""
+
+    def __init__(
+        self,
+        base_mapping: Dict[str, str],
+        valid_buckets: Iterable[str],
+        default_bucket: str = "living_expenses",
+        cache_size: int = 4096,
+        overrides_file: Optional[str] = None
+    ):
+        self.base_mapping = dict(base_mapping)
+        self.valid_buckets = set(valid_buckets)
+        self.default_bucket = default_bucket
+        self.cache_size = cache_size
+        self.overrides_file = Path(overrides_file) if overrides_file else None
+        self.overrides: Dict[str, str] = {}
+        self.unmatched = Counter()
+        self._lock = threading.Lock()
+        self._matcher = self._compile()
+
+    def _compile(self) -> CompiledCategoryMatcher:
+        # Overrides first so they win over base keys; dict merge keeps first-seen order
+        merged = dict(self.overrides)
+        overridden = {k.lower() for k in self.overrides}
+        for key, bucket in self.base_mapping.items():
+            if key.lower() not in overridden:
+                merged.setdefault(key, bucket)
+        return CompiledCategoryMatcher(merged, self.default_bucket, self.cache_size)
+
+    def classify(self, category: str) -> str:
+        """Map an expense category to a budget bucket"""
+        bucket = self._matcher.lookup(category or "")
+        if bucket is None:
+            # Bounded so arbitrary free-text labels can't grow this without limit
+            with self._lock:
+                if category in self.unmatched or len(self.unmatched) < MAX_TRACKED_UNMATCHED:
+                    self.unmatched[category] += 1
+            return self.default_bucket
+        return bucket
+
+    def set_overrides(self, overrides: Dict[str, str]):
+        """Replace the override mapping and recompile. Raises ValueError on unknown buckets."""
+        invalid = {k: v for k, v in overrides.items() if v not in self.valid_buckets}
+        if invalid:
+            raise ValueError(f"Unknown bucket(s) in overrides: {invalid}")
+        with self._lock:
+            self.overrides = dict(overrides)
+            # Swapping the matcher also drops the old LRU cache
+            self._matcher = self._compile()
+
+    def reload_overrides(self) -> Dict[str, str]:
+        """Reload overrides from the configured JSON file (missing file clears them)"""
+        if self.overrides_file is None or not self.overrides_file.exists():
+            self.set_overrides({})
+            return {}
+        overrides = json.loads(self.overrides_file.read_text() or "{}")
+        if not isinstance(overrides, dict):
+            raise ValueError("Overrides file must contain a JSON object of category -> bucket")
+        self.set_overrides(overrides)
+        return overrides
+
+    def stats(self) -> Dict[str, object]:
+        """Cache and coverage statistics"""
+        info = self._matcher.lookup.cache_info()
+        lookups = info.hits + info.misses
+        with self._lock:
+            unmatched = dict(self.unmatched.most_common(20))
+        return {
+            "mapping_size": len(self._matcher.keys),
+            "override_count": len(self.overrides),
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize,
+            "cache_hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+            "unmatched_categories": unmatched
+        }
@@ -0,0 +1,153 @@
+"""
+Circuit Breaker and Latency Stats for FinTwitch
+===============================================
+Per-dependency health used to route around a failing or slow provider.
+
+CircuitBreaker: after `failure_threshold` consecutive failures the circuit opens and
+calls are refused without waiting on the dependency. After `reset_seconds` it is
+half-open: exactly one trial call is let through; success closes the circuit, failure
+opens it for another `reset_seconds`.
+
+LatencyStats: EWMA and percentiles over recent successful call durations, for
+latency-aware routing and hedge delays. Stats with no sample for `stale_after` seconds are
+out of date: claim_probe() lets one call through to re-measure, and the first sample after
+such a gap restarts the stats instead of being averaged into the old estimate.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}   # for a gauge
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open trial"""
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # Caller holds the lock; an open circuit turns half-open once reset_seconds pass
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    def available(self) -> bool:
+        """Whether allow() would currently let a call through (does not claim the trial)"""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._trial_running)
+
+    def allow(self) -> bool:
+        """Claim permission for one call; False (counted as rejected) while open"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = CLOSED
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._current_state() == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._trial_running = False
+
+    def release(self):
+        """Give back a claimed half-open trial whose call ended without a verdict (e.g. cancelled)"""
+        with self._lock:
+            self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+class LatencyStats:
+    """EWMA and percentiles of recent successful call durations (seconds)"""
+
+    def __init__(self, window: int = 100, alpha: float = 0.2, stale_after: Optional[float] = None,
+                 clock=time.monotonic):
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self.ewma: Optional[float] = None
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._clock = clock
+        self._sampled_at = self._probed_at = clock()
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        now = self._clock()
+        with self._lock:
+            if self.stale_after is not None and self._samples and now - self._sampled_at >= self.stale_after:
+                self._samples.clear()
+                self.ewma = None
+            self._samples.append(seconds)
+            self._sampled_at = now
+            self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+
+    def claim_probe(self) -> bool:
+        """True, once per stale_after seconds, when the stats are out of date and need a fresh sample"""
+        if self.stale_after is None:
+            return False
+        now = self._clock()
+        with self._lock:
+            if now - max(self._sampled_at, self._probed_at) < self.stale_after:
+                return False
+            self._probed_at = now
+            return True
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "samples": len(self),
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
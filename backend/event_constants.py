@@ -0,0 +1,35 @@
+"""
+Event Economy Constants for FinTwitch
+=====================================
+Balance thresholds, category mix and amount ranges shared by the live event generator
+(financial_event_generator.py) and the vectorized one (synthetic_events.py). Kept in a
+module of their own so the NumPy generator can use them without importing the Flask app.
+"""
+
+# Balance thresholds for adaptive economy
+CRITICAL_BALANCE_THRESHOLD = 0     # At or below this: trigger recovery mode
+EXPENSE_BLOCK_THRESHOLD = 100      # Below this: No expenses generated
+RECOVERY_THRESHOLD = 2000          # Must reach this to exit recovery mode and resume normal expenses
+LOW_BALANCE_THRESHOLD = 500        # Boost income generation
+RECOVERY_BALANCE_THRESHOLD = 1500  # Return to balanced mode
+HIGH_BALANCE_THRESHOLD = 80000     # Above this: Increase expenses significantly
+MAX_BALANCE_THRESHOLD = 100000     # Hard cap: income blocked until user allocates money
+
+# Category mix and amount ranges
+INCOME_AMOUNT_RANGES = {
+    "Salary": (3000, 5000),
+    "Bonus": (500, 2000),
+    "Interest": (50, 500),
+    "Dividend": (50, 500),
+}
+EXPENSE_AMOUNT_RANGES = {
+    "Rent": (1500, 2500),
+    "Groceries": (100, 400),
+    "Utilities": (100, 300),
+    "Subscription": (20, 150),
+    "Emergency": (500, 3000),
+    "Entertainment": (20, 150),
+    "Transport": (20, 150),
+}
+INCOME_CATEGORIES = list(INCOME_AMOUNT_RANGES)
+EXPENSE_CATEGORIES = ["Rent", "Groceries", "Utilities", "Subscription", "Emergency", "Entertainment", "Transport"]
@@ -0,0 +1,296 @@
+"""
+Pooled, Batched Event Forwarder for FinTwitch
+=============================================
+Delivers generator events to the Pathway streaming engine without a new connection
+(and a silent drop) per event:
+
+- Persistent keep-alive connection pool (requests.Session + HTTPAdapter)
+- In-memory send queue drained in batches into POST /ingest/batch
+- Retry with exponential backoff on failure; only events that were not accepted are resent
+- Bounded NDJSON disk spool while the engine is down, replayed once it is back
+- Events the engine rejects (4xx other than 404/405/408/429, e.g. a malformed event) are
+  not retried: a rejected batch is re-sent event by event so the rest still get in, and
+  the rejected events are dropped and counted
+- Delivered / retried / spooled / rejected / dropped counters and send latency for /status
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class EventForwarder:
+    """Background forwarder from an event producer to the engine's ingest API"""
+
+    def __init__(
+        self,
+        ingest_url: str,
+        batch_url: Optional[str] = None,
+        spool_file: Optional[str] = None,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        timeout: float = 2.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 5.0,
+        max_spool_bytes: int = 10 * 1024 * 1024,
+        pool_size: int = 4,
+        probe_interval: float = 5.0,
+    ):
+        self.ingest_url = ingest_url
+        self.batch_url = batch_url or ingest_url.rstrip("/") + "/batch"
+        self.spool_file = Path(spool_file) if spool_file else None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_spool_bytes = max_spool_bytes
+        self.probe_interval = probe_interval
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._spool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._batch_supported = True
+        self._engine_up = True
+        self._last_replay_attempt = 0.0
+
+        self.counters = {
+            "submitted": 0,
+            "delivered": 0,
+            "retried": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "batches_sent": 0,
+            "send_failures": 0,
+        }
+        self._latencies_ms = deque(maxlen=1000)
+        self.last_rejection: Optional[Dict[str, Any]] = None
+
+    # ---------- producer side ----------
+
+    def start(self):
+        """Start the sender thread (idempotent)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="event-forwarder", daemon=True)
+            self._thread.start()
+
+    def submit(self, event: Dict[str, Any]):
+        """Queue an event for delivery; never blocks the caller"""
+        self.start()
+        self._count("submitted")
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Producer is outrunning the engine: go straight to disk
+            self._spool([event])
+
+    def stop(self, flush_timeout: float = 5.0):
+        """Flush what can be sent within flush_timeout, then stop the sender thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=flush_timeout)
+
+    # ---------- sender thread ----------
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                pending = self._send_with_retry(batch)
+                if pending:
+                    self._spool(pending)
+            elif self._engine_up or time.monotonic() - self._last_replay_attempt >= self.probe_interval:
+                # While the engine is down, the replay attempt doubles as a periodic probe
+                self._last_replay_attempt = time.monotonic()
+                self._replay_spool()
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send_with_retry(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deliver batch, retrying what the engine did not accept; returns the events still pending"""
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retried", len(pending))
+                delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+                if self._stop.wait(delay):
+                    break
+            pending = self._send(pending)
+            if not pending:
+                self._engine_up = True
+                return []
+        self._engine_up = False
+        return pending
+
+    @staticmethod
+    def _retryable(status_code: int) -> bool:
+        # Engine down or overloaded; any other 4xx means the events themselves were rejected
+        return status_code >= 500 or status_code in (408, 429)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One delivery attempt; returns the events that failed and may be retried"""
+        if not self._batch_supported:
+            return self._send_each(batch)
+        started = time.perf_counter()
+        try:
+            response = self.session.post(self.batch_url, json=batch, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            self._count("send_failures")
+            return batch
+        if response.status_code in (404, 405):
+            # Older engine without /ingest/batch: fall back to per-event posts on the pool
+            self._batch_supported = False
+            return self._send_each(batch)
+        if response.status_code == 200:
+            self._delivered(len(batch), started)
+            return []
+        if not self._retryable(response.status_code):
+            # One malformed event fails validation for the whole batch: isolate it
+            return self._send_each(batch)
+        self._count("send_failures")
+        return batch
+
+    def _send_each(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Per-event posts; accepted events are never resent, rejected ones are dropped"""
+        started = time.perf_counter()
+        failed = []
+        delivered = 0
+        for index, event in enumerate(batch):
+            try:
+                response = self.session.post(self.ingest_url, json=event, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                # Engine unreachable: the rest of the batch would fail the same way
+                failed.extend(batch[index:])
+                break
+            if response.status_code == 200:
+                delivered += 1
+            elif self._retryable(response.status_code):
+                failed.append(event)
+            else:
+                self._reject(event, response)
+        if delivered:
+            self._delivered(delivered, started)
+        if failed:
+            self._count("send_failures")
+        return failed
+
+    def _delivered(self, count: int, started: float):
+        with self._stats_lock:
+            self.counters["delivered"] += count
+            self.counters["batches_sent"] += 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    def _reject(self, event: Dict[str, Any], response: requests.Response):
+        with self._stats_lock:
+            self.counters["rejected"] += 1
+            self.last_rejection = {"id": event.get("id"), "status": response.status_code,
+                                   "detail": response.text[:200]}
+
+    # ---------- disk spool ----------
+
+    def _spool(self, events: List[Dict[str, Any]], requeue: bool = False):
+        """Append events to the bounded spool; requeue=True puts back events that were already counted"""
+        if self.spool_file is None:
+            self._count("dropped", len(events))
+            return
+        with self._spool_lock:
+            size = self.spool_file.stat().st_size if self.spool_file.exists() else 0
+            kept = 0
+            self.spool_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spool_file, "a") as f:
+                for event in events:
+                    line = json.dumps(event) + "\n"
+                    if size + len(line) > self.max_spool_bytes:
+                        break
+                    f.write(line)
+                    size += len(line)
+                    kept += 1
+        if not requeue:
+            self._count("spooled", kept)
+        self._count("dropped", len(events) - kept)
+
+    def _replay_spool(self):
+        """Resend spooled events in batches once the engine accepts traffic again"""
+        with self._spool_lock:
+            if self.spool_file is None or not self.spool_file.exists() or self.spool_file.stat().st_size == 0:
+                return
+            lines = self.spool_file.read_text().splitlines()
+            self.spool_file.write_text("")
+
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                self._count("dropped")
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            pending = self._send(batch)
+            self._count("replayed", len(batch) - len(pending))
+            if pending:
+                # Engine went away again; put the unsent events back and wait for the next cycle
+                self._engine_up = False
+                self._spool(pending + events[start + self.batch_size:], requeue=True)
+                return
+            self._engine_up = True
+
+    # ---------- metrics ----------
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.counters[name] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.counters)
+            stats["last_rejection"] = self.last_rejection
+            latencies = sorted(self._latencies_ms)
+        spool_bytes = 0
+        if self.spool_file is not None and self.spool_file.exists():
+            spool_bytes = self.spool_file.stat().st_size
+        stats.update({
+            "queue_depth": self._queue.qsize(),
+            "spool_bytes": spool_bytes,
+            "engine_reachable": self._engine_up,
+            "batch_endpoint": self._batch_supported,
+            "latency_ms": {
+                "p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                "p95": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+                "max": round(latencies[-1], 2) if latencies else None,
+            },
+        })
+        return stats
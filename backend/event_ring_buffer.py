@@ -0,0 +1,125 @@
+"""
+Bounded Event Ring Buffer for FinTwitch
+=======================================
+Fixed-capacity, thread-safe ring buffer of generated events. Every event gets a
+monotonically increasing sequence number, and consumers read "everything since my
+cursor" by slicing only the slots they need, so appends are O(1) and reads are
+O(events returned) regardless of capacity.
+
+Overflow policies:
+- "overwrite": the oldest event is replaced; lagging consumers are told how many
+  events they missed.
+- "drop": a new event is dropped while the oldest one is still unread by some
+  registered consumer (with no registered consumers there is nothing to protect,
+  so the oldest is replaced).
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+OVERFLOW_POLICIES = ("overwrite", "drop")
+# Server-tracked cursors are kept per consumer name; bound them like any other client-keyed map
+MAX_CONSUMERS = 256
+
+
+class EventRingBuffer:
+    """Bounded multi-consumer event buffer with sequence-number cursors"""
+
+    def __init__(self, capacity: int = 50, policy: str = "overwrite", max_consumers: int = MAX_CONSUMERS):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"policy must be one of {OVERFLOW_POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.max_consumers = max_consumers
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._next_seq = 0                      # sequence number of the next append
+        self._consumers: Dict[str, int] = {}    # consumer name -> next sequence to read
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.dropped = 0
+        self.missed = 0
+
+    @property
+    def _oldest_seq(self) -> int:
+        return max(0, self._next_seq - self.capacity)
+
+    def append(self, event: Dict[str, Any]) -> Optional[int]:
+        """Store an event; returns its sequence number, or None if the drop policy rejected it"""
+        with self._lock:
+            if self._next_seq >= self.capacity:
+                if (
+                    self.policy == "drop"
+                    and self._consumers
+                    and min(self._consumers.values()) <= self._oldest_seq
+                ):
+                    self.dropped += 1
+                    return None
+                self.evicted += 1
+            seq = self._next_seq
+            self._slots[seq % self.capacity] = event
+            self._next_seq += 1
+            return seq
+
+    def _read(self, cursor: int, limit: Optional[int]) -> Tuple[List[Dict[str, Any]], int, int]:
+        oldest = self._oldest_seq
+        cursor = min(max(0, cursor), self._next_seq)
+        missed = max(0, oldest - cursor)
+        start = max(cursor, oldest)
+        end = self._next_seq if limit is None else min(self._next_seq, start + max(0, limit))
+        slots, capacity = self._slots, self.capacity
+        return [slots[seq % capacity] for seq in range(start, end)], end, missed
+
+    def read_since(self, cursor: int, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Events with sequence >= cursor (oldest first), for client-held cursors.
+        Returns (events, next_cursor, missed) where missed counts events overwritten before they were read.
+        """
+        with self._lock:
+            return self._read(cursor, limit)
+
+    def register_consumer(self, name: str, from_start: bool = False) -> int:
+        """Create (or reset) a server-tracked cursor at the newest or oldest retained event"""
+        with self._lock:
+            if name not in self._consumers and len(self._consumers) >= self.max_consumers:
+                raise ValueError(f"too many consumers (max {self.max_consumers})")
+            self._consumers[name] = self._oldest_seq if from_start else self._next_seq
+            return self._consumers[name]
+
+    def unregister_consumer(self, name: str) -> bool:
+        with self._lock:
+            return self._consumers.pop(name, None) is not None
+
+    def read(self, name: str, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+        """Read and advance a registered consumer's cursor (KeyError if not registered)"""
+        with self._lock:
+            events, next_cursor, missed = self._read(self._consumers[name], limit)
+            self._consumers[name] = next_cursor
+            self.missed += missed
+            return events, next_cursor, missed
+
+    def latest(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The newest events still retained, oldest first"""
+        with self._lock:
+            size = min(self._next_seq, self.capacity)
+            count = size if limit is None else min(size, max(0, limit))
+            return self._read(self._next_seq - count, None)[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return min(self._next_seq, self.capacity)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": min(self._next_seq, self.capacity),
+                "capacity": self.capacity,
+                "policy": self.policy,
+                "next_sequence": self._next_seq,
+                "oldest_sequence": self._oldest_seq,
+                "evicted": self.evicted,
+                "dropped": self.dropped,
+                "missed_by_consumers": self.missed,
+                "consumer_lag": {name: self._next_seq - cursor for name, cursor in self._consumers.items()},
+            }
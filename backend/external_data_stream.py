@@ -10,22 +10,30 @@ Generates continuous external financial signals that feed into the Pathway pipel
 - Random macroeconomic events
 
 These streams demonstrate multi-source data ingestion and fusion.
+Pacing and timestamps come from a (possibly accelerated) SimulatedClock and draws from a
+per-generator RNG, so a seeded generator on a VirtualClock produces identical output.
 """
 
 import asyncio
-import random
-import time
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 from pathlib import Path
 
+from sim_clock import SimulatedClock, make_rng
+
 
 class ExternalDataStreamGenerator:
     """Generates continuous external financial data streams"""
     
-    def __init__(self, stream_file: str = "data_streams/external_events.jsonl"):
+    def __init__(
+        self,
+        stream_file: str = "data_streams/external_events.jsonl",
+        clock: Optional[SimulatedClock] = None,
+        seed: Optional[int] = None
+    ):
         self.stream_file = Path(stream_file)
+        self.clock = clock or SimulatedClock()
+        self.rng = make_rng(seed, "external")
         self.stream_file.parent.mkdir(parents=True, exist_ok=True)
         
         # Ensure file exists
@@ -71,12 +79,12 @@ class ExternalDataStreamGenerator:
     def generate_market_signal(self) -> Dict[str, Any]:
         """Generate random market sentiment signal"""
         # Random walk for sentiment
-        self.market_sentiment += random.uniform(-0.05, 0.05)
+        self.market_sentiment += self.rng.uniform(-0.05, 0.05)
         self.market_sentiment = max(0.0, min(1.0, self.market_sentiment))
         
         # Occasional significant events
-        if random.random() < 0.1:  # 10% chance
-            event = random.choice(self.market_events)
+        if self.rng.random() < 0.1:  # 10% chance
+            event = self.rng.choice(self.market_events)
             self.market_sentiment += event.get("sentiment_change", 0)
             self.market_sentiment = max(0.0, min(1.0, self.market_sentiment))
             
@@ -93,8 +101,8 @@ class ExternalDataStreamGenerator:
                 "impact": "positive" if event.get("sentiment_change", 0) > 0 else "negative",
                 "value": abs(event.get("sentiment_change", 0)),
                 "description": event["description"],
-                "timestamp": datetime.now().isoformat(),
-                "id": f"market_{int(time.time() * 1000)}"
+                "timestamp": self.clock.now().isoformat(),
+                "id": f"market_{self.clock.timestamp_ms()}"
             }
         
         # Normal sentiment update
@@ -108,13 +116,13 @@ class ExternalDataStreamGenerator:
             "impact": "neutral",
             "value": 0,
             "description": f"Market sentiment: {sentiment_label}",
-            "timestamp": datetime.now().isoformat(),
-            "id": f"market_{int(time.time() * 1000)}"
+            "timestamp": self.clock.now().isoformat(),
+            "id": f"market_{self.clock.timestamp_ms()}"
         }
     
     def generate_economic_signal(self) -> Dict[str, Any]:
         """Generate economic indicator signal"""
-        event = random.choice(self.economic_events)
+        event = self.rng.choice(self.economic_events)
         
         if "rate_change" in event:
             self.interest_rate += event["rate_change"]
@@ -128,8 +136,8 @@ class ExternalDataStreamGenerator:
                 "impact": "positive" if event["rate_change"] < 0 else "negative",
                 "value": abs(event["rate_change"]),
                 "description": event["description"],
-                "timestamp": datetime.now().isoformat(),
-                "id": f"econ_{int(time.time() * 1000)}"
+                "timestamp": self.clock.now().isoformat(),
+                "id": f"econ_{self.clock.timestamp_ms()}"
             }
         
         if "inflation_change" in event:
@@ -144,13 +152,13 @@ class ExternalDataStreamGenerator:
                 "impact": "positive" if event["inflation_change"] < 0 else "negative",
                 "value": abs(event["inflation_change"]),
                 "description": event["description"],
-                "timestamp": datetime.now().isoformat(),
-                "id": f"econ_{int(time.time() * 1000)}"
+                "timestamp": self.clock.now().isoformat(),
+                "id": f"econ_{self.clock.timestamp_ms()}"
             }
     
     def generate_policy_signal(self) -> Dict[str, Any]:
         """Generate government policy/scheme signal"""
-        event = random.choice(self.policy_events)
+        event = self.rng.choice(self.policy_events)
         
         return {
             "stream_type": "external_signal",
@@ -160,10 +168,23 @@ class ExternalDataStreamGenerator:
             "impact": event["impact"],
             "value": event["value"],
             "description": event["description"],
-            "timestamp": datetime.now().isoformat(),
-            "id": f"policy_{int(time.time() * 1000)}"
+            "timestamp": self.clock.now().isoformat(),
+            "id": f"policy_{self.clock.timestamp_ms()}"
         }
     
+    def next_signal(self) -> Dict[str, Any]:
+        """Generate one signal of a randomly selected type"""
+        signal_type = self.rng.choices(
+            ['market', 'economic', 'policy'],
+            weights=[0.5, 0.3, 0.2]  # Market signals more frequent
+        )[0]
+        
+        if signal_type == 'market':
+            return self.generate_market_signal()
+        if signal_type == 'economic':
+            return self.generate_economic_signal()
+        return self.generate_policy_signal()
+    
     def append_event(self, event: Dict[str, Any]):
         """Append event to JSONL stream file"""
         with open(self.stream_file, 'a') as f:
@@ -173,25 +194,14 @@ class ExternalDataStreamGenerator:
         """Run continuous data stream generation"""
         print(f"? Starting external data stream generator...")
         print(f"   Stream file: {self.stream_file}")
-        print(f"   Interval: {interval_seconds}s")
+        print(f"   Interval: {interval_seconds}s of simulated time")
         
         self.is_running = True
         event_count = 0
         
         try:
             while self.is_running:
-                # Randomly select signal type
-                signal_type = random.choices(
-                    ['market', 'economic', 'policy'],
-                    weights=[0.5, 0.3, 0.2]  # Market signals more frequent
-                )[0]
-                
-                if signal_type == 'market':
-                    event = self.generate_market_signal()
-                elif signal_type == 'economic':
-                    event = self.generate_economic_signal()
-                else:
-                    event = self.generate_policy_signal()
+                event = self.next_signal()
                 
                 # Append to stream
                 self.append_event(event)
@@ -199,8 +209,8 @@ class ExternalDataStreamGenerator:
                 
                 print(f"  + [{event_count}] {event['category'].upper()}: {event['description'][:60]}...")
                 
-                # Wait for next event
-                await asyncio.sleep(interval_seconds)
+                # Wait for next event (simulated seconds)
+                await self.clock.asleep(interval_seconds)
         
         except asyncio.CancelledError:
             print(f"? External data stream stopped. Total events generated: {event_count}")
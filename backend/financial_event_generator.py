@@ -1,140 +1,229 @@
 import datetime
-import random
+import json
+import os
 import threading
 import time
 import uuid
-from datetime import datetime
-import requests
+from datetime import timedelta
+from pathlib import Path
 
-from flask import Flask, jsonify, request
+from event_constants import (
+    CRITICAL_BALANCE_THRESHOLD,
+    EXPENSE_AMOUNT_RANGES,
+    EXPENSE_BLOCK_THRESHOLD,
+    EXPENSE_CATEGORIES,
+    HIGH_BALANCE_THRESHOLD,
+    INCOME_AMOUNT_RANGES,
+    INCOME_CATEGORIES,
+    LOW_BALANCE_THRESHOLD,
+    MAX_BALANCE_THRESHOLD,
+    RECOVERY_BALANCE_THRESHOLD,
+    RECOVERY_THRESHOLD,
+)
+from event_forwarder import EventForwarder
+from event_ring_buffer import EventRingBuffer
+from session_state import SessionStateStore
+from sim_clock import SimulatedClock, make_rng, seed_from_env
+from profiler import register_flask_profiling
+from telemetry import REGISTRY, instrument_flask
+
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)
+# Request latency per route plus GET /metrics/prometheus
+instrument_flask(app, service="event_generator")
+# Opt-in stack sampler: POST /admin/profiling, GET /admin/profiling/flamegraph
+register_flask_profiling(app)
 
 # Pathway Streaming Engine endpoint
 PATHWAY_INGEST_URL = "http://localhost:8000/ingest"
 
-# Global Event Queue
-event_queue = []
-queue_lock = threading.Lock()
+# EVENT_GENERATOR_FORWARD=true runs the background generator and forwards its events to the
+# engine. Off by default: the frontend already relays /events transactions via sendToBackend.
+FORWARD_TO_ENGINE = os.getenv("EVENT_GENERATOR_FORWARD", "false").lower() == "true"
+
+# Keep-alive, batched delivery to the engine; spools to disk while it is down
+pathway_forwarder = EventForwarder(
+    PATHWAY_INGEST_URL,
+    spool_file=str(Path(__file__).parent / "data_streams" / "forwarder_spool.ndjson")
+)
+
+# Global Event Queue: bounded ring buffer read through consumer cursors (GET /events/queue)
+EVENT_QUEUE_CAPACITY = int(os.getenv("EVENT_QUEUE_CAPACITY", "50"))
+EVENT_QUEUE_POLICY = os.getenv("EVENT_QUEUE_POLICY", "overwrite")  # "overwrite" or "drop"
+event_queue = EventRingBuffer(EVENT_QUEUE_CAPACITY, EVENT_QUEUE_POLICY)
+
+# Forwarder and queue counters are read at scrape time from their own thread-safe stats
+for _name in ("delivered", "retried", "spooled", "rejected", "dropped", "send_failures"):
+    REGISTRY.counter(f"fintwitch_forwarder_{_name}_total", f"Events {_name} by the engine forwarder").set_function(
+        lambda name=_name: pathway_forwarder.stats()[name])
+REGISTRY.gauge("fintwitch_event_queue_size", "Events retained in the ring buffer").set_function(
+    lambda: len(event_queue))
+
+# Upper bound for one GET /events/bulk call
+MAX_BULK_EVENTS = 5_000_000
+# Upper bound for GET /events?count= and for a bounded GET /events/stream
+MAX_EVENTS_PER_CALL = 1000
+MAX_STREAM_EVENTS = 1_000_000
+# Upper bound for GET /events/stream?rate= (events per wall-clock second)
+MAX_STREAM_RATE = 1000.0
+# Simulated seconds between consecutive events (same spacing as background_generator)
+SIMULATED_INTERVAL_RANGE = (5, 10)
 
-# Balance thresholds for adaptive economy
-CRITICAL_BALANCE_THRESHOLD = 0     # At or below this: trigger recovery mode
-EXPENSE_BLOCK_THRESHOLD = 100      # Below this: No expenses generated
-RECOVERY_THRESHOLD = 2000          # Must reach this to exit recovery mode and resume normal expenses
-LOW_BALANCE_THRESHOLD = 500        # Boost income generation
-RECOVERY_BALANCE_THRESHOLD = 1500  # Return to balanced mode
-HIGH_BALANCE_THRESHOLD = 80000     # Above this: Increase expenses significantly
-MAX_BALANCE_THRESHOLD = 100000     # Hard cap: income blocked until user allocates money
+# Shared simulated clock and RNG (SIM_CLOCK_SPEED / SIM_CLOCK_START / SIM_SEED)
+sim_clock = SimulatedClock.from_env()
+event_rng = make_rng(seed_from_env(), "transactions")
 
-# Recovery state tracker - once balance hits 0, expenses are blocked until RECOVERY_THRESHOLD
-recovery_mode_active = False
+# Per-session economy state (recovery mode, event count), bounded and idle-expired.
+# Once a session's balance hits 0, its expenses are blocked until RECOVERY_THRESHOLD.
+MAX_ECONOMY_SESSIONS = int(os.getenv("EVENT_GENERATOR_MAX_SESSIONS", "10000"))
+ECONOMY_SESSION_TTL_SECONDS = float(os.getenv("EVENT_GENERATOR_SESSION_TTL", "1800"))
+# Session used when a caller provides a balance but no session id
+DEFAULT_SESSION_ID = "default"
+MAX_SESSION_ID_LENGTH = 128
+# Per-event regime logging; disable under load
+VERBOSE_REGIME_LOGGING = os.getenv("EVENT_GENERATOR_VERBOSE", "true").lower() == "true"
 
-def generate_event(user_balance=None):
-    """Generates a random financial event with adaptive economy logic."""
-    global recovery_mode_active
+def new_economy_state():
+    return {"recovery_mode_active": False, "events_generated": 0, "last_balance": None}
 
+economy_sessions = SessionStateStore(
+    new_economy_state,
+    max_sessions=MAX_ECONOMY_SESSIONS,
+    ttl_seconds=ECONOMY_SESSION_TTL_SECONDS
+)
+
+def select_regime(user_balance, recovery_active):
+    """
+    Adaptive economy regime for a balance.
+    Returns (income_probability, expense_multiplier, recovery_active, messages); pure, so the
+    caller decides where the recovery flag lives.
+    """
+    messages = []
+    # Exit recovery mode once balance reaches RECOVERY_THRESHOLD
+    if recovery_active and user_balance >= RECOVERY_THRESHOLD:
+        recovery_active = False
+        messages.append(f"✅ RECOVERY COMPLETE (Balance: \u20b9{user_balance:.2f}) - Resuming normal mode")
+
+    if user_balance <= CRITICAL_BALANCE_THRESHOLD:
+        # Trigger recovery mode — income only until RECOVERY_THRESHOLD
+        recovery_active = True
+        income_probability = 1.0
+        expense_multiplier = 0.0
+        messages.append(f"🚨 CRITICAL: Balance \u20b9{user_balance:.2f} - INCOME ONLY until \u20b9{RECOVERY_THRESHOLD}")
+    elif recovery_active:
+        # Still recovering — balance > 0 but hasn't hit RECOVERY_THRESHOLD yet
+        income_probability = 1.0
+        expense_multiplier = 0.0
+        messages.append(f"🔄 RECOVERING (Balance: \u20b9{user_balance:.2f}) - Income only until \u20b9{RECOVERY_THRESHOLD}")
+    elif user_balance >= MAX_BALANCE_THRESHOLD:
+        # Balance cap reached — block all income until user allocates money
+        income_probability = 0.0
+        expense_multiplier = 4.0
+        messages.append(f"🔝 CAP REACHED (Balance: \u20b9{user_balance:.2f}) - Expenses only; allocate money to Budget Vault to unlock income")
+    elif user_balance >= HIGH_BALANCE_THRESHOLD:
+        # High balance (80k+) — ramp up expenses aggressively before cap
+        income_probability = 0.05
+        expense_multiplier = 3.0
+        messages.append(f"💰 HIGH BALANCE MODE (Balance: \u20b9{user_balance:.2f}) - Heavy expenses to prevent cap breach!")
+    elif user_balance < LOW_BALANCE_THRESHOLD:
+        # Low balance — boost income
+        income_probability = 0.80
+        expense_multiplier = 0.4
+        messages.append(f"⚠️  LOW BALANCE MODE ({user_balance}) - Boosting income...")
+    elif user_balance < RECOVERY_BALANCE_THRESHOLD:
+        # Balanced mode
+        income_probability = 0.50
+        expense_multiplier = 0.7
+        messages.append(f"📈 BALANCED MODE ({user_balance}) - Balanced generation...")
+    else:
+        # Normal mode — 45% income, 55% expense
+        income_probability = 0.45
+        expense_multiplier = 1.0
+    return income_probability, expense_multiplier, recovery_active, messages
+
+def generate_event(user_balance=None, session_id=None, rng=None, clock=None):
+    """
+    Generates a random financial event with adaptive economy logic (state kept per session).
+    rng/clock default to the module's shared event_rng and sim_clock.
+    """
+    rng = rng or event_rng
+    clock = clock or sim_clock
     if user_balance is not None:
-        # Exit recovery mode once balance reaches RECOVERY_THRESHOLD
-        if recovery_mode_active and user_balance >= RECOVERY_THRESHOLD:
-            recovery_mode_active = False
-            print(f"✅ RECOVERY COMPLETE (Balance: \u20b9{user_balance:.2f}) - Resuming normal mode")
-
-        if user_balance <= CRITICAL_BALANCE_THRESHOLD:
-            # Trigger recovery mode — income only until RECOVERY_THRESHOLD
-            recovery_mode_active = True
-            income_probability = 1.0
-            expense_multiplier = 0.0
-            print(f"🚨 CRITICAL: Balance \u20b9{user_balance:.2f} - INCOME ONLY until \u20b9{RECOVERY_THRESHOLD}")
-        elif recovery_mode_active:
-            # Still recovering — balance > 0 but hasn't hit RECOVERY_THRESHOLD yet
-            income_probability = 1.0
-            expense_multiplier = 0.0
-            print(f"🔄 RECOVERING (Balance: \u20b9{user_balance:.2f}) - Income only until \u20b9{RECOVERY_THRESHOLD}")
-        elif user_balance >= MAX_BALANCE_THRESHOLD:
-            # Balance cap reached — block all income until user allocates money
-            income_probability = 0.0
-            expense_multiplier = 4.0
-            print(f"🔝 CAP REACHED (Balance: \u20b9{user_balance:.2f}) - Expenses only; allocate money to Budget Vault to unlock income")
-        elif user_balance >= HIGH_BALANCE_THRESHOLD:
-            # High balance (80k+) — ramp up expenses aggressively before cap
-            income_probability = 0.05
-            expense_multiplier = 3.0
-            print(f"💰 HIGH BALANCE MODE (Balance: \u20b9{user_balance:.2f}) - Heavy expenses to prevent cap breach!")
-        elif user_balance < LOW_BALANCE_THRESHOLD:
-            # Low balance — boost income
-            income_probability = 0.80
-            expense_multiplier = 0.4
-            print(f"⚠️  LOW BALANCE MODE ({user_balance}) - Boosting income...")
-        elif user_balance < RECOVERY_BALANCE_THRESHOLD:
-            # Balanced mode
-            income_probability = 0.50
-            expense_multiplier = 0.7
-            print(f"📈 BALANCED MODE ({user_balance}) - Balanced generation...")
-        else:
-            # Normal mode — 45% income, 55% expense
-            income_probability = 0.45
-            expense_multiplier = 1.0
+        # Read-modify-write of the session's recovery flag is atomic under the store lock
+        with economy_sessions.session(session_id or DEFAULT_SESSION_ID) as state:
+            income_probability, expense_multiplier, state["recovery_mode_active"], messages = select_regime(
+                user_balance, state["recovery_mode_active"]
+            )
+            state["events_generated"] += 1
+            state["last_balance"] = user_balance
+        if VERBOSE_REGIME_LOGGING:
+            for message in messages:
+                print(message)
     else:
         income_probability = 0.45
         expense_multiplier = 1.0
     
-    if random.random() < income_probability:
+    if rng.random() < income_probability:
         event_type = "Income"
-        category = random.choice(["Salary", "Bonus", "Interest", "Dividend"])
-        # Income amounts
-        if category == "Salary":
-            amount = random.uniform(3000, 5000)
-        elif category == "Bonus":
-            amount = random.uniform(500, 2000)
-        else:
-            amount = random.uniform(50, 500)
+        category = rng.choice(INCOME_CATEGORIES)
+        amount = rng.uniform(*INCOME_AMOUNT_RANGES[category])
     else:
         event_type = "Expense"
-        category = random.choice(["Rent", "Groceries", "Utilities", "Subscription", "Emergency", "Entertainment", "Transport"])
+        category = rng.choice(EXPENSE_CATEGORIES)
         # Expense amounts (reduced when balance is low)
-        if category == "Rent":
-            amount = random.uniform(1500, 2500) * expense_multiplier
-        elif category == "Emergency":
-            amount = random.uniform(500, 3000) * expense_multiplier
-        elif category == "Groceries":
-            amount = random.uniform(100, 400) * expense_multiplier
-        elif category == "Utilities":
-            amount = random.uniform(100, 300) * expense_multiplier
-        else:
-            amount = random.uniform(20, 150) * expense_multiplier
+        amount = rng.uniform(*EXPENSE_AMOUNT_RANGES[category]) * expense_multiplier
 
     return {
-        "id": str(uuid.uuid4()),
+        # Drawn from the RNG (not uuid4) so seeded runs produce identical ids
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
         "type": event_type,
         "category": category,
         "amount": round(amount, 2),
-        "timestamp": datetime.now().isoformat()
+        "timestamp": clock.now().isoformat()
+    }
+
+def simulate_events(user_balance=None, count=1, session_id=None, start_time=None, rng=None):
+    """
+    Yield count events (unbounded if count is None), applying each one to the balance
+    before generating the next. Timestamps advance in simulated time (SIMULATED_INTERVAL_RANGE per event), independent
+    of how fast the caller consumes them.
+    """
+    rng = rng or event_rng
+    sim_time = start_time or sim_clock.now()
+    balance = user_balance
+    generated = 0
+    while count is None or generated < count:
+        generated += 1
+        event = generate_event(balance, session_id=session_id, rng=rng)
+        event["timestamp"] = sim_time.isoformat()
+        if balance is not None:
+            balance += event["amount"] if event["type"] == "Income" else -event["amount"]
+            event["balance_after"] = round(balance, 2)
+        yield event
+        sim_time += timedelta(seconds=rng.uniform(*SIMULATED_INTERVAL_RANGE))
+
+def to_ingest_event(event):
+    """
+    Convert a generator event to the Pathway /ingest schema. Expenses are sent negative,
+    the convention the engine's fallback totals expect (as replay_trace does).
+    """
+    event_type = event["type"].lower()  # "Income" -> "income"
+    amount = abs(event["amount"])
+    return {
+        "type": event_type,
+        "amount": -amount if event_type == "expense" else amount,
+        "category": event["category"],
+        "timestamp": event["timestamp"],
+        "description": f"{event['type']} - {event['category']}",
+        "id": event["id"]
     }
 
 def forward_to_pathway(event):
-    """Forward event to Pathway streaming engine"""
-    try:
-        # Convert event format to match Pathway schema
-        pathway_event = {
-            "type": event["type"].lower(),  # "Income" -> "income"
-            "amount": event["amount"],
-            "category": event["category"],
-            "timestamp": event["timestamp"],
-            "description": f"{event['type']} - {event['category']}"
-        }
-        
-        response = requests.post(PATHWAY_INGEST_URL, json=pathway_event, timeout=1)
-        if response.status_code == 200:
-            print(f"  ✓ Forwarded to Pathway")
-        else:
-            print(f"  ⚠ Pathway ingestion failed: {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        # Fail silently - Pathway might not be running
-        print(f"  ⚠ Pathway unavailable: {str(e)[:50]}")
-    except Exception as e:
-        print(f"  ⚠ Error forwarding to Pathway: {str(e)[:50]}")
+    """Queue event for batched delivery to the Pathway streaming engine"""
+    pathway_forwarder.submit(to_ingest_event(event))
 
 def print_event(event):
     """Pretty prints the event details."""
@@ -154,17 +243,15 @@ def background_generator():
     print("Starting Background Event Generator...")
     while True:
         try:
-            delay = random.uniform(5, 10)
-            time.sleep(delay)
+            sim_clock.sleep(event_rng.uniform(*SIMULATED_INTERVAL_RANGE))
             
             # Generate event with no balance (uses normal mode)
             event = generate_event(None)
             
-            with queue_lock:
-                event_queue.append(event)
-                # Keep queue size manageable
-                if len(event_queue) > 50:
-                    event_queue.pop(0)
+            # O(1); the oldest event is overwritten (or the new one dropped) at capacity
+            event_queue.append(event)
+            if FORWARD_TO_ENGINE:
+                forward_to_pathway(event)
             
             print_event(event)
             
@@ -172,32 +259,157 @@ def background_generator():
             print(f"Error in generator: {e}")
             time.sleep(5)
 
+def get_session_id():
+    """Economy session for a request: ?session=, then X-Session-Id, then the client address"""
+    session_id = request.args.get('session') or request.headers.get('X-Session-Id') or request.remote_addr
+    return (session_id or DEFAULT_SESSION_ID)[:MAX_SESSION_ID_LENGTH]
+
 @app.route('/events', methods=['GET'])
 def get_events():
-    """Generates events adaptively based on user balance (no background queue)."""
+    """
+    Generates events adaptively based on user balance (no background queue).
+    Query: balance, count (default 1; the balance is simulated forward between events), session
+    """
     # Get user balance from query parameter
     user_balance = request.args.get('balance', type=float)
+    count = request.args.get('count', type=int, default=1)
+    if count <= 0 or count > MAX_EVENTS_PER_CALL:
+        return jsonify({"error": f"count must be between 1 and {MAX_EVENTS_PER_CALL}"}), 400
     
-    # Always generate event based on current balance (adaptive mode)
+    # Always generate events based on current balance (adaptive mode)
     if user_balance is not None:
-        adaptive_event = generate_event(user_balance)
-        print_event(adaptive_event)
+        adaptive_events = list(simulate_events(user_balance, count, session_id=get_session_id()))
+        if VERBOSE_REGIME_LOGGING:
+            for event in adaptive_events:
+                print_event(event)
         # NOTE: Do NOT forward_to_pathway here - the frontend transact() already
         # calls sendToBackend(tx) which sends to Pathway. Double-calling would
         # inflate Pathway metrics by 2x.
-        return jsonify([adaptive_event])
+        return jsonify(adaptive_events)
+    
+    # Fallback: generate normal events if no balance provided
+    return jsonify(list(simulate_events(None, count)))
+
+@app.route('/events/stream', methods=['GET'])
+def stream_events():
+    """
+    Long-lived event stream (Server-Sent Events or NDJSON chunks) at a requested rate
+    Query: balance, session, rate (events per second, 0 = as fast as possible; requires count),
+           count (omit for an unbounded stream), format=sse|ndjson
+    """
+    user_balance = request.args.get('balance', type=float)
+    rate = request.args.get('rate', type=float, default=1.0)
+    count = request.args.get('count', type=int)
+    stream_format = request.args.get('format', default='sse')
+    if stream_format not in ('sse', 'ndjson'):
+        return jsonify({"error": "format must be 'sse' or 'ndjson'"}), 400
+    if rate < 0 or rate > MAX_STREAM_RATE:
+        return jsonify({"error": f"rate must be between 0 and {MAX_STREAM_RATE:g}"}), 400
+    if count is not None and (count <= 0 or count > MAX_STREAM_EVENTS):
+        return jsonify({"error": f"count must be between 1 and {MAX_STREAM_EVENTS}"}), 400
+    if rate == 0 and count is None:
+        return jsonify({"error": "an unthrottled stream (rate=0) needs a count"}), 400
+    session_id = get_session_id() if user_balance is not None else None
+    
+    def generate():
+        interval = 1.0 / rate if rate else 0.0
+        next_send = time.monotonic()
+        for event in simulate_events(user_balance, count, session_id=session_id):
+            if stream_format == 'sse':
+                yield f"id: {event['id']}\nevent: financial_event\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+            if interval:
+                # Pace against a schedule so per-event overhead doesn't lower the rate
+                next_send += interval
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream' if stream_format == 'sse' else 'application/x-ndjson',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/events/bulk', methods=['GET'])
+def get_events_bulk():
+    """
+    Generate many events in one call as NDJSON (NumPy-vectorized, seeded, reproducible)
+    Query: n, seed, balance (optional regime), schema=generator|ingest
+    """
+    try:
+        import synthetic_events
+    except ImportError as e:
+        return jsonify({"error": f"Bulk generation requires numpy: {e}"}), 501
     
-    # Fallback: generate normal event if no balance provided
-    normal_event = generate_event(None)
-    return jsonify([normal_event])
+    n = request.args.get('n', type=int, default=1000)
+    seed = request.args.get('seed', type=int, default=0)
+    balance = request.args.get('balance', type=float)
+    schema = request.args.get('schema', default='generator')
+    if n <= 0 or n > MAX_BULK_EVENTS:
+        return jsonify({"error": f"n must be between 1 and {MAX_BULK_EVENTS}"}), 400
+    if schema not in ('generator', 'ingest'):
+        return jsonify({"error": "schema must be 'generator' or 'ingest'"}), 400
+    
+    result = synthetic_events.generate_events(n, seed=seed, balance=balance)
+    print(f"Bulk generated {n:,} events ({result['events_per_sec']:,.0f} events/sec)")
+    return Response(
+        synthetic_events.iter_ndjson(result["columns"], schema=schema, run_id=f"syn{seed}"),
+        mimetype='application/x-ndjson',
+        headers={
+            "X-Events-Count": str(n),
+            "X-Generation-Seconds": f"{result['seconds']:.6f}",
+            "X-Events-Per-Sec": f"{result['events_per_sec']:.0f}"
+        }
+    )
+
+@app.route('/events/queue', methods=['GET'])
+def read_event_queue():
+    """
+    Read queued background events since a cursor
+    Query: consumer (server-tracked cursor, registered at the oldest event on first read)
+           or cursor (client-held sequence number, default 0); limit (optional)
+    """
+    consumer = request.args.get('consumer')
+    limit = request.args.get('limit', type=int)
+    if consumer:
+        try:
+            try:
+                events, next_cursor, missed = event_queue.read(consumer, limit)
+            except KeyError:
+                event_queue.register_consumer(consumer, from_start=True)
+                events, next_cursor, missed = event_queue.read(consumer, limit)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 429
+    else:
+        events, next_cursor, missed = event_queue.read_since(request.args.get('cursor', type=int, default=0), limit)
+    return jsonify({"events": events, "next_cursor": next_cursor, "missed": missed})
+
+@app.route('/events/queue/consumers/<consumer>', methods=['DELETE'])
+def remove_queue_consumer(consumer):
+    """Drop a server-tracked cursor"""
+    if not event_queue.unregister_consumer(consumer):
+        return jsonify({"error": "Consumer not found"}), 404
+    return jsonify({"status": "removed", "consumer": consumer})
 
 @app.route('/status', methods=['GET'])
 def status():
-    return jsonify({"status": "running", "queue_size": len(event_queue)})
+    return jsonify({
+        "status": "running",
+        "queue_size": len(event_queue),
+        "queue": event_queue.stats(),
+        "sessions": economy_sessions.stats(),
+        "forwarder": pathway_forwarder.stats()
+    })
 
 if __name__ == "__main__":
     # Note: Background generator DISABLED for fully adaptive event generation
     # Events now generated on-demand based on real-time balance
+    # (unless EVENT_GENERATOR_FORWARD=true, which streams its events straight to the engine)
+    if FORWARD_TO_ENGINE:
+        threading.Thread(target=background_generator, name="background-generator", daemon=True).start()
+        print(f"Forwarding background events to {PATHWAY_INGEST_URL}")
     
     print("========================================")
     print("Financial Event Generator - ADAPTIVE MODE")
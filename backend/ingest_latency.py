@@ -0,0 +1,116 @@
+"""
+Ingest-to-Visible Latency Tracking for FinTwitch
+================================================
+Measures how long an ingested event takes to show up in each Pathway output table.
+
+Every event is stamped with its ingest time (wall-clock microseconds, carried through
+the pipeline as the `ingested_at` column). Output tables reduce it to
+`last_ingested_at` = max(ingested_at) of the rows they reflect, so when a subscribe
+callback fires, every event stamped at or before that watermark is visible in that
+table. The tracker keeps the stamps of recent events in order and, per table, a cursor
+of how far that table has caught up; advancing the cursor yields one latency sample
+per event. Events stamped but not yet visible are the table's backlog, which grows
+when the pipeline falls behind (commit interval too long, backpressure).
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_PENDING = 100000   # stamped events remembered until every table has seen them
+DEFAULT_WINDOW = 2048          # latency samples kept per table for percentiles
+PERCENTILES = (50, 90, 95, 99)
+
+
+def now_us() -> int:
+    return time.time_ns() // 1000
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class IngestLatencyTracker:
+    """Ingest stamps for one input stream and per-output-table visibility latency"""
+
+    def __init__(self, tables: Iterable[str], max_pending: int = DEFAULT_MAX_PENDING,
+                 window: int = DEFAULT_WINDOW, on_sample=None):
+        self.max_pending = max_pending
+        self._stamps: Deque[int] = deque()
+        self._first_seq = 0                     # sequence number of self._stamps[0]
+        self._next_seq = 0
+        self._cursors: Dict[str, int] = {table: 0 for table in tables}
+        self._watermarks: Dict[str, int] = {table: 0 for table in self._cursors}
+        self._samples: Dict[str, Deque[float]] = {table: deque(maxlen=window) for table in self._cursors}
+        self._observed: Dict[str, int] = {table: 0 for table in self._cursors}
+        self._unmeasured: Dict[str, int] = {table: 0 for table in self._cursors}
+        self._on_sample = on_sample             # callable(table, seconds), e.g. a histogram
+        self._lock = threading.Lock()
+
+    def stamp(self) -> int:
+        """Ingest time for a new event; stamps are handed out in sequence order"""
+        if not self._cursors:
+            return now_us()
+        with self._lock:
+            stamp = max(now_us(), self._stamps[-1] if self._stamps else 0)
+            self._stamps.append(stamp)
+            self._next_seq += 1
+            if len(self._stamps) > self.max_pending:
+                self._stamps.popleft()
+                self._first_seq += 1
+            return stamp
+
+    def observe(self, table: str, watermark: Optional[int]):
+        """A callback of `table` fired reflecting every event stamped at or before watermark"""
+        if not watermark:
+            return
+        now = now_us()
+        samples = []
+        with self._lock:
+            if table not in self._cursors or watermark <= self._watermarks[table]:
+                return
+            self._watermarks[table] = watermark
+            cursor = self._cursors[table]
+            if cursor < self._first_seq:
+                # Stamps dropped from the pending window before this table caught up
+                self._unmeasured[table] += self._first_seq - cursor
+                cursor = self._first_seq
+            stamps = self._stamps
+            offset = cursor - self._first_seq
+            while offset < len(stamps) and stamps[offset] <= watermark:
+                samples.append(max(0, now - stamps[offset]) / 1_000_000)
+                offset += 1
+            self._cursors[table] = self._first_seq + offset
+            self._samples[table].extend(samples)
+            self._observed[table] += len(samples)
+            self._trim()
+        if self._on_sample is not None:
+            for seconds in samples:
+                self._on_sample(table, seconds)
+
+    def _trim(self):
+        # Forget stamps every table has already seen
+        slowest = min(self._cursors.values())
+        while self._first_seq < slowest and self._stamps:
+            self._stamps.popleft()
+            self._first_seq += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tables = {
+                table: (sorted(self._samples[table]), self._observed[table],
+                        self._next_seq - max(self._cursors[table], self._first_seq),
+                        self._unmeasured[table])
+                for table in self._cursors
+            }
+        result = {}
+        for table, (ordered, observed, backlog, unmeasured) in tables.items():
+            entry = {"events_measured": observed, "backlog": backlog, "unmeasured": unmeasured}
+            if ordered:
+                for pct in PERCENTILES:
+                    entry[f"p{pct}_ms"] = round(_percentile(ordered, pct) * 1000, 2)
+                entry["max_ms"] = round(ordered[-1] * 1000, 2)
+            result[table] = entry
+        return result
@@ -0,0 +1,201 @@
+"""
+Semantic Insight Cache for FinTwitch
+====================================
+LLM insights keyed on a quantized fingerprint of the analytics that go into the prompt,
+so materially identical financial states reuse a prior insight instead of calling the
+provider again, and different states (e.g. different users) never share one.
+
+Quantization keeps the key stable while numbers drift: money amounts fall into
+logarithmic buckets (LLM_CACHE_RELATIVE_STEP, default 10% wide), scores into
+fixed-width bands, and categorical fields (risk level, trend, top spending categories,
+fusion action, ...) are used as-is. Counters that only ever grow (transaction count)
+are left out.
+
+Entries are fresh for a TTL, then stale (servable while a refresh runs) for a grace
+period, then dropped; the least recently used entry is evicted at capacity.
+"""
+
+import copy
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+DEFAULT_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "600"))
+# After the TTL an entry is stale: still served by get_stale() while a refresh runs
+DEFAULT_STALE_SECONDS = float(os.getenv("LLM_CACHE_STALE_SECONDS", "600"))
+RELATIVE_STEP = float(os.getenv("LLM_CACHE_RELATIVE_STEP", "0.1"))
+SCORE_STEP = 10.0          # health/risk scores (0-100) in bands of 10
+TOP_CATEGORIES = 3
+
+
+def money_bucket(value: Any, relative_step: float = RELATIVE_STEP) -> int:
+    """Signed logarithmic bucket: amounts within ~relative_step of each other share a bucket"""
+    try:
+        value = float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+    if not math.isfinite(value) or abs(value) < 1:
+        return 0
+    bucket = int(math.log(abs(value)) / math.log1p(relative_step)) + 1
+    return bucket if value > 0 else -bucket
+
+
+def score_band(value: Any, step: float = SCORE_STEP) -> int:
+    try:
+        return int(float(value or 0) // step)
+    except (TypeError, ValueError):
+        return 0
+
+
+def days_band(days: Any) -> str:
+    """Depletion horizon in the bands the advice actually changes at"""
+    if not days:
+        return "none"
+    for limit in (7, 30, 90):
+        if days <= limit:
+            return f"<={limit}"
+    return ">90"
+
+
+def insight_fingerprint(
+    metrics: Dict[str, Any],
+    intelligence: Dict[str, Any],
+    categories: Dict[str, Any],
+    advanced_analytics: Optional[Dict[str, Any]] = None,
+    predictions: Optional[Dict[str, Any]] = None,
+    external_signals: Optional[Dict[str, Any]] = None,
+    fusion_metrics: Optional[Dict[str, Any]] = None,
+    scope: str = "",
+) -> str:
+    """Stable cache key for the prompt inputs; scope separates providers/models"""
+    advanced_analytics = advanced_analytics or {}
+    predictions = predictions or {}
+    external_signals = external_signals or {}
+    fusion_metrics = fusion_metrics or {}
+
+    top_categories = sorted(
+        ((name, (values or {}).get("expenses", 0) or 0) for name, values in (categories or {}).items()),
+        key=lambda item: (-abs(item[1]), item[0]),
+    )[:TOP_CATEGORIES]
+
+    state = {
+        "scope": scope,
+        "balance": money_bucket(metrics.get("balance")),
+        "income": money_bucket(metrics.get("total_income")),
+        "expenses": money_bucket(abs(metrics.get("total_expenses") or 0)),
+        "health": score_band(metrics.get("financial_health_score")),
+        "risk_level": intelligence.get("risk_level"),
+        "alerts": len(intelligence.get("alerts") or []),
+        "warnings": len(intelligence.get("warnings") or []),
+        "top_categories": [name for name, amount in top_categories if amount],
+        "trend": advanced_analytics.get("trend"),
+        "pattern": advanced_analytics.get("spending_pattern"),
+        "anomaly": bool(advanced_analytics.get("anomaly_detected")),
+        "velocity": money_bucket(advanced_analytics.get("spending_velocity")),
+        "depletion": days_band(predictions.get("days_until_zero_balance")),
+        "burn_rate": money_bucket(predictions.get("burn_rate_per_day")),
+        "escalation": bool(predictions.get("risk_escalation_warning")),
+        "sentiment": round(float(external_signals.get("market_sentiment") or 0), 1),
+        "volatility": round(float(external_signals.get("market_volatility") or 0), 1),
+        "fusion_risk": score_band(fusion_metrics.get("overall_financial_risk")),
+        "action": fusion_metrics.get("recommended_action"),
+    }
+    encoded = json.dumps(state, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class InsightCache:
+    """Thread-safe LRU + TTL cache of insight dicts with hit/miss accounting"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 stale_seconds: float = DEFAULT_STALE_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (fresh_until, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Deep copy of the cached value (callers may mutate it), or None"""
+        now = self._clock()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def get_stale(self, key: str) -> Optional[Dict[str, Any]]:
+        """Copy of an entry past its TTL but inside the stale grace period, or None"""
+        now = self._clock()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is None or entry[0] > now:
+                return None
+            self.stale_served += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def is_fresh(self, key: str) -> bool:
+        """Whether key has an entry inside its TTL (not counted as a hit or miss, no copy)"""
+        now = self._clock()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            return entry is not None and entry[0] > now
+
+    def _live_entry(self, key: str, now: float) -> Optional[tuple]:
+        # Caller holds the lock; drops the entry once its stale grace period is over too
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] + self.stale_seconds <= now:
+            del self._entries[key]
+            self.evicted_expired += 1
+            return None
+        return entry
+
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = (self._clock() + ttl, copy.deepcopy(value))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted_capacity += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "stale_served": self.stale_served,
+                "evicted_expired": self.evicted_expired,
+                "evicted_capacity": self.evicted_capacity,
+            }
@@ -0,0 +1,248 @@
+"""
+Compact Insight Prompts for FinTwitch
+=====================================
+Builds the LLM prompt from processed analytics as short "fact" lines under a token
+budget, and defines the JSON shape the providers are asked to answer in.
+
+Facts are ranked: the core state (balance, income, expenses, health, risk level) is
+always sent; alerts and forward-looking risks come next; trends, categories and market
+context fill the rest of the budget. Defaults that carry no information (no anomaly,
+neutral trend, zero amounts) are left out. A prompt depends only on the analytics it is
+built from, so the same state always produces the same prompt. Token counts are estimated at ~4 characters per token.
+
+Providers return INSIGHT_SCHEMA JSON (OpenAI response_format, Gemini response schema,
+Ollama format), so parse_insights() validates instead of guessing at sections.
+
+Batch prompts pack several users' facts (each under LLM_BATCH_USER_TOKEN_BUDGET) behind
+one shared instruction block and ask for BATCH_INSIGHT_SCHEMA: one answer per user id.
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "300"))
+BATCH_USER_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_USER_TOKEN_BUDGET", "150"))
+CHARS_PER_TOKEN = 4
+MAX_RECOMMENDATIONS = 4
+
+INSIGHT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string", "description": "2-3 sentence overview of the current finances"},
+        "risk_analysis": {"type": "string", "description": "1-2 sentences explaining the risk level"},
+        "recommendations": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "3-4 specific, actionable steps",
+        },
+    },
+    "required": ["summary", "risk_analysis", "recommendations"],
+    "additionalProperties": False,
+}
+BATCH_INSIGHT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "users": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "string"}, **INSIGHT_SCHEMA["properties"]},
+                "required": ["id", *INSIGHT_SCHEMA["required"]],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["users"],
+    "additionalProperties": False,
+}
+
+
+def gemini_schema(schema: Any) -> Any:
+    """Gemini's response schema is an OpenAPI subset without additionalProperties"""
+    if isinstance(schema, dict):
+        return {key: gemini_schema(value) for key, value in schema.items() if key != "additionalProperties"}
+    if isinstance(schema, list):
+        return [gemini_schema(item) for item in schema]
+    return schema
+
+
+GEMINI_INSIGHT_SCHEMA = gemini_schema(INSIGHT_SCHEMA)
+
+INSTRUCTIONS = (
+    "You are a concise financial advisor. Using the live analytics below (amounts in INR), "
+    "reply with JSON only: {\"summary\": 2-3 sentences, \"risk_analysis\": 1-2 sentences on why "
+    "the risk level is what it is, \"recommendations\": 3-4 specific actions}. Be direct and data-driven."
+)
+BATCH_INSTRUCTIONS = (
+    "You are a concise financial advisor. Each [user <id>] block below is one person's live analytics "
+    "(amounts in INR). Reply with JSON only: {\"users\": [{\"id\": the block's id, \"summary\": 2-3 "
+    "sentences, \"risk_analysis\": 1-2 sentences on the risk level, \"recommendations\": 3-4 specific "
+    "actions}]}, one entry per user. Treat each user independently; be direct and data-driven."
+)
+
+# Rank of each fact group; lower is sent first
+ESSENTIAL, URGENT, CONTEXT, MARKET = 0, 1, 2, 3
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _inr(value: Any) -> str:
+    return f"INR {float(value or 0):,.0f}"
+
+
+def collect_facts(
+    metrics: Dict[str, Any],
+    intelligence: Dict[str, Any],
+    categories: Dict[str, Any],
+    advanced_analytics: Optional[Dict[str, Any]] = None,
+    predictions: Optional[Dict[str, Any]] = None,
+    external_signals: Optional[Dict[str, Any]] = None,
+    fusion_metrics: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[int, str, str]]:
+    """(rank, key, line) for every informative fact, in presentation order"""
+    advanced_analytics = advanced_analytics or {}
+    predictions = predictions or {}
+    external_signals = external_signals or {}
+    fusion_metrics = fusion_metrics or {}
+    facts = [
+        (ESSENTIAL, "balance", f"balance: {_inr(metrics.get('balance'))}"),
+        (ESSENTIAL, "flow", f"income/expenses: {_inr(metrics.get('total_income'))} / "
+                            f"{_inr(abs(metrics.get('total_expenses') or 0))}"),
+        (ESSENTIAL, "health", f"health score: {float(metrics.get('financial_health_score') or 0):.0f}/100"),
+        (ESSENTIAL, "risk", f"risk level: {intelligence.get('risk_level', 'UNKNOWN')}"),
+    ]
+    for index, alert in enumerate((intelligence.get("alerts") or [])[:3]):
+        facts.append((URGENT, f"alert{index}", f"alert: {alert}"))
+    for index, warning in enumerate((intelligence.get("warnings") or [])[:2]):
+        facts.append((URGENT, f"warning{index}", f"warning: {warning}"))
+
+    days = predictions.get("days_until_zero_balance")
+    if days:
+        facts.append((URGENT, "depletion", f"balance runs out in {days} days"))
+    if predictions.get("projected_monthly_deficit"):
+        facts.append((URGENT, "deficit", f"projected monthly deficit: {_inr(predictions['projected_monthly_deficit'])}"))
+    if advanced_analytics.get("anomaly_detected"):
+        facts.append((URGENT, "anomaly", "spending anomaly detected"))
+    fusion_risk = fusion_metrics.get("overall_financial_risk")
+    if fusion_risk:
+        facts.append((URGENT if fusion_risk > 50 else MARKET, "fusion_risk",
+                      f"market-adjusted risk: {fusion_risk:.0f}/100"))
+    action = fusion_metrics.get("recommended_action")
+    if action and action != "monitor":
+        facts.append((URGENT, "action", f"suggested action: {action.replace('_', ' ')}"))
+
+    trend = advanced_analytics.get("trend")
+    if trend and trend != "stable":
+        facts.append((CONTEXT, "trend", f"spending trend: {trend}, "
+                                        f"{_inr(advanced_analytics.get('spending_velocity'))}/min"))
+    pattern = advanced_analytics.get("spending_pattern")
+    if pattern and pattern != "normal":
+        facts.append((CONTEXT, "pattern", f"spending pattern: {pattern}"))
+    if predictions.get("burn_rate_per_day"):
+        facts.append((CONTEXT, "burn_rate", f"daily burn: {_inr(predictions['burn_rate_per_day'])}"))
+    if predictions.get("recommended_daily_budget"):
+        facts.append((CONTEXT, "daily_budget", f"recommended daily budget: "
+                                               f"{_inr(predictions['recommended_daily_budget'])}"))
+    top_categories = sorted(
+        ((name, abs((values or {}).get("expenses", 0) or 0)) for name, values in (categories or {}).items()),
+        key=lambda item: -item[1],
+    )[:3]
+    top_categories = [f"{name} {_inr(amount)}" for name, amount in top_categories if amount]
+    if top_categories:
+        facts.append((CONTEXT, "categories", "top spending: " + ", ".join(top_categories)))
+
+    sentiment = external_signals.get("market_sentiment")
+    if sentiment is not None and abs(sentiment - 0.5) >= 0.1:
+        facts.append((MARKET, "sentiment", f"market sentiment: {sentiment:.2f} (0 bearish, 1 bullish)"))
+    if external_signals.get("market_volatility"):
+        facts.append((MARKET, "volatility", f"market volatility: {external_signals['market_volatility']:.2f}"))
+    if external_signals.get("interest_rate"):
+        facts.append((MARKET, "rates", f"interest/inflation: {external_signals['interest_rate']:.1f}% / "
+                                       f"{external_signals.get('inflation_rate', 0):.1f}%"))
+    return facts
+
+
+def select_fact_lines(
+    facts: List[Tuple[int, str, str]],
+    token_budget: int,
+    used: int = 0,
+) -> List[str]:
+    """Lines of the facts that fit token_budget (given `used` tokens already spent), in order"""
+    chosen = set()
+    for position, (rank, _, line) in sorted(enumerate(facts), key=lambda item: (item[1][0], item[0])):
+        cost = estimate_tokens(line) + 1
+        if rank != ESSENTIAL and used + cost > token_budget:
+            continue
+        chosen.add(position)
+        used += cost
+    return [line for position, (_, _, line) in enumerate(facts) if position in chosen]
+
+
+class CompactPromptBuilder:
+    """Prompt under a token budget (a pure function of the analytics); keeps stats on the last one"""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.last_stats: Dict[str, Any] = {}
+
+    def build(self, *inputs) -> str:
+        facts = collect_facts(*inputs)
+        lines = select_fact_lines(facts, self.token_budget, estimate_tokens(INSTRUCTIONS) + 1)
+        prompt = INSTRUCTIONS + "\n" + "\n".join(lines)
+        self.last_stats = {
+            "estimated_tokens": estimate_tokens(prompt),
+            "token_budget": self.token_budget,
+            "facts_sent": len(lines),
+            "facts_dropped": len(facts) - len(lines),
+        }
+        return prompt
+
+
+def build_batch_prompt(users: Dict[str, tuple], user_token_budget: int = BATCH_USER_TOKEN_BUDGET) -> str:
+    """One prompt for several users: shared instructions, then each user's facts under its own budget"""
+    blocks = [BATCH_INSTRUCTIONS]
+    for user_id, inputs in users.items():
+        lines = select_fact_lines(collect_facts(*inputs), user_token_budget)
+        blocks.append(f"[user {user_id}]\n" + "\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def parse_insights(content: str) -> Dict[str, Any]:
+    """Validate a provider's JSON answer against INSIGHT_SCHEMA; ValueError if it does not fit"""
+    return _validate_insights(json.loads(content))
+
+
+def parse_batch_insights(content: str) -> Dict[str, Dict[str, Any]]:
+    """Answers by user id from a BATCH_INSIGHT_SCHEMA reply; malformed entries are left out"""
+    data = json.loads(content)
+    if not isinstance(data, dict) or not isinstance(data.get("users"), list):
+        raise ValueError("batch insight response has no users list")
+    answers = {}
+    for item in data["users"]:
+        try:
+            answers[str(item["id"])] = _validate_insights(item)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return answers
+
+
+def _validate_insights(data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ValueError("insight response is not a JSON object")
+    summary, risk_analysis = data.get("summary"), data.get("risk_analysis")
+    recommendations = data.get("recommendations")
+    if not isinstance(summary, str) or not summary.strip():
+        raise ValueError("insight response has no summary")
+    if not isinstance(risk_analysis, str) or not risk_analysis.strip():
+        raise ValueError("insight response has no risk_analysis")
+    if not isinstance(recommendations, list) or not all(isinstance(item, str) for item in recommendations):
+        raise ValueError("insight recommendations are not a list of strings")
+    return {
+        "summary": summary.strip(),
+        "risk_analysis": risk_analysis.strip(),
+        "recommendations": [item.strip() for item in recommendations if item.strip()][:MAX_RECOMMENDATIONS],
+    }
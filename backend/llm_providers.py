@@ -0,0 +1,292 @@
+"""
+LLM Provider Backends for FinTwitch
+===================================
+One backend per LLM provider (Gemini, OpenAI, Ollama). Each reads its settings from the
+environment, imports its SDK and builds its client in load() (called on LLMService's
+loader thread), and streams the answer to an insight prompt as text tokens in the
+INSIGHT_SCHEMA JSON shape.
+
+Every backend carries its own CircuitBreaker and LatencyStats, which LLMService uses to
+route around a failing or slow provider. Breakers open after LLM_BREAKER_FAILURES
+consecutive failures and allow a trial call after LLM_BREAKER_RESET_SECONDS; a slow
+provider is re-measured with one call once its latency stats are LLM_LATENCY_STALE_SECONDS old.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from circuit_breaker import CircuitBreaker, LatencyStats
+from insight_prompt import GEMINI_INSIGHT_SCHEMA, INSIGHT_SCHEMA, gemini_schema
+
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# A provider routed last for being slow gets one probe call once its latency stats are this old
+LLM_LATENCY_STALE_SECONDS = float(os.getenv("LLM_LATENCY_STALE_SECONDS", "60"))
+# Ollama health is checked on first use and re-checked at most this often while it is down
+OLLAMA_HEALTH_RECHECK_SECONDS = float(os.getenv("OLLAMA_HEALTH_RECHECK_SECONDS", "30"))
+
+
+class ProviderBackend:
+    """Base provider: configuration, client loading, availability and token streaming"""
+
+    name = "base"
+    label = "LLM"
+
+    def __init__(self, name: Optional[str] = None, max_concurrency: int = 4):
+        self.name = name or self.name
+        self.max_concurrency = max_concurrency
+        self.client = None
+        self.model = "default"
+        self.max_tokens = 500
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+        self.latency = LatencyStats(stale_after=LLM_LATENCY_STALE_SECONDS)
+
+    def configured(self) -> bool:
+        """Whether the environment has what this provider needs (no imports, no network I/O)"""
+        return True
+
+    def load(self) -> bool:
+        """Import the SDK and create the client; False if the provider cannot be used"""
+        raise NotImplementedError
+
+    async def available(self) -> bool:
+        return self.client is not None
+
+    def token_stream(self, prompt: str, usage: Dict[str, Any], schema: Dict[str, Any] = INSIGHT_SCHEMA,
+                     max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Answer tokens in the JSON shape of schema (max_tokens overrides the provider's limit,
+        e.g. for a multi-user batch); fills usage with prompt_tokens / completion_tokens
+        """
+        raise NotImplementedError
+
+    def on_error(self, error: Exception):
+        """A call failed at the transport or API level (not a malformed answer)"""
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.model, "circuit": self.breaker.stats(), "latency": self.latency.stats()}
+
+
+class GeminiBackend(ProviderBackend):
+    name = "gemini"
+    label = "Gemini"
+
+    def configured(self) -> bool:
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        if not self.api_key or self.api_key == "your_gemini_api_key_here":
+            print("INFO: Gemini API key not configured, skipping Gemini")
+            print("INFO: Get FREE API key at: https://aistudio.google.com/app/apikey")
+            return False
+        self.model = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+        self.max_tokens = int(os.getenv("GEMINI_MAX_TOKENS", "500"))
+        return True
+
+    def load(self) -> bool:
+        """Initialize Google Gemini client using modern google-genai SDK"""
+        try:
+            from google import genai
+
+            self.client = genai.Client(api_key=self.api_key)
+            print(f"+ LLM Provider: Google Gemini ({self.model})")
+            print("OK Using modern google-genai SDK")
+            return True
+        except ImportError:
+            print("INFO: Google GenAI package not installed, skipping Gemini")
+            print("INFO: Install with: pip install -U google-genai")
+        except Exception as e:
+            print(f"ERROR: Gemini initialization failed: {e}, skipping Gemini")
+        return False
+
+    async def token_stream(self, prompt: str, usage: Dict[str, Any], schema: Dict[str, Any] = INSIGHT_SCHEMA,
+                           max_tokens: Optional[int] = None):
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": GEMINI_INSIGHT_SCHEMA if schema is INSIGHT_SCHEMA else gemini_schema(schema),
+                "max_output_tokens": max_tokens or self.max_tokens,
+                "temperature": 0.7,
+            }
+        )
+        async for chunk in stream:
+            metadata = getattr(chunk, "usage_metadata", None)
+            if metadata is not None:
+                # Cumulative; the last chunk carries the totals
+                usage["prompt_tokens"] = metadata.prompt_token_count
+                usage["completion_tokens"] = metadata.candidates_token_count
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAIBackend(ProviderBackend):
+    name = "openai"
+    label = "OpenAI"
+
+    def configured(self) -> bool:
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        if not self.api_key or self.api_key == "your_openai_api_key_here":
+            print("INFO: OpenAI API key not configured, skipping OpenAI")
+            return False
+        self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "500"))
+        return True
+
+    def load(self) -> bool:
+        """Initialize OpenAI client"""
+        try:
+            from openai import AsyncOpenAI
+
+            self.client = AsyncOpenAI(api_key=self.api_key)
+            print(f"+ LLM Provider: OpenAI ({self.model})")
+            return True
+        except ImportError:
+            print("INFO: OpenAI package not installed, skipping OpenAI")
+        except Exception as e:
+            print(f"ERROR: OpenAI initialization failed: {e}, skipping OpenAI")
+        return False
+
+    async def token_stream(self, prompt: str, usage: Dict[str, Any], schema: Dict[str, Any] = INSIGHT_SCHEMA,
+                           max_tokens: Optional[int] = None):
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens or self.max_tokens,
+            temperature=0.7,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "financial_insights", "strict": True, "schema": schema},
+            },
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                usage["completion_tokens"] = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class OllamaBackend(ProviderBackend):
+    name = "ollama"
+    label = "Ollama"
+
+    def __init__(self, name: Optional[str] = None, max_concurrency: int = 4,
+                 base_url: Optional[str] = None, model: Optional[str] = None):
+        super().__init__(name, max_concurrency)
+        self.base_url = base_url
+        self._model_override = model
+        self._healthy: Optional[bool] = None     # None = not checked yet
+        self._checked_at = 0.0
+        self._health_lock = None
+
+    def configured(self) -> bool:
+        self.base_url = self.base_url or os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+        self.model = self._model_override or os.getenv("OLLAMA_MODEL", "llama3.2")
+        self.max_tokens = int(os.getenv("OLLAMA_MAX_TOKENS", "500"))
+        return True
+
+    def load(self) -> bool:
+        """Initialize the async Ollama client (no network I/O here; health is checked lazily)"""
+        try:
+            import httpx
+            # Pooled keep-alive connections; the long read timeout covers slow local inference
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2,
+                                    max_keepalive_connections=self.max_concurrency)
+            )
+            print(f"+ LLM Provider: Ollama ({self.model}) at {self.base_url} - health checked on first use")
+            return True
+        except Exception as e:
+            print(f"??  Ollama initialization failed: {e}, skipping Ollama")
+            return False
+
+    async def available(self) -> bool:
+        """Cached GET /api/tags health check; concurrent callers share one probe"""
+        recheck = (
+            self._healthy is None
+            or (not self._healthy and time.monotonic() - self._checked_at >= OLLAMA_HEALTH_RECHECK_SECONDS)
+        )
+        if not recheck:
+            return self._healthy
+        if self._health_lock is None:
+            self._health_lock = asyncio.Lock()
+        async with self._health_lock:
+            if self._healthy is not None and time.monotonic() - self._checked_at < 1.0:
+                return self._healthy   # another caller just checked
+            try:
+                response = await self.client.get("/api/tags", timeout=3.0)
+                healthy = response.status_code == 200
+            except Exception as e:
+                print(f"??  Ollama health check failed: {e}")
+                healthy = False
+            if healthy and not self._healthy:
+                print(f"OK Ollama reachable at {self.base_url}")
+            self._healthy = healthy
+            self._checked_at = time.monotonic()
+            return healthy
+
+    def on_error(self, error: Exception):
+        # Force a fresh health check before the next attempt; repeated failures open the breaker
+        self._healthy = None
+
+    async def token_stream(self, prompt: str, usage: Dict[str, Any], schema: Dict[str, Any] = INSIGHT_SCHEMA,
+                           max_tokens: Optional[int] = None):
+        """Response tokens from Ollama's streaming NDJSON /api/generate (JSON constrained to schema)"""
+        async with self.client.stream(
+            "POST",
+            "/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "format": schema,
+                "options": {"num_predict": max_tokens or self.max_tokens},
+            }
+        ) as response:
+            if response.status_code != 200:
+                raise Exception(f"Ollama returned status {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise Exception(f"Ollama error: {chunk['error']}")
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    usage["prompt_tokens"] = chunk.get("prompt_eval_count")
+                    usage["completion_tokens"] = chunk.get("eval_count")
+                    break
+
+    async def aclose(self):
+        """Release pooled connections"""
+        if self.client is not None:
+            await self.client.aclose()
+
+
+BACKENDS = {backend.name: backend for backend in (GeminiBackend, OpenAIBackend, OllamaBackend)}
+
+
+def build_chain(names: Iterable[str], max_concurrency: int = 4) -> List[ProviderBackend]:
+    """Backends for the named providers, in order (duplicates, unknown names and "mock" skipped)"""
+    chain: List[ProviderBackend] = []
+    for name in names:
+        name = name.strip().lower()
+        if not name or name == "mock" or any(backend.name == name for backend in chain):
+            continue
+        backend_class = BACKENDS.get(name)
+        if backend_class is None:
+            print(f"INFO: Unknown LLM provider '{name}', skipping")
+            continue
+        chain.append(backend_class(max_concurrency=max_concurrency))
+    return chain
@@ -2,104 +2,357 @@
 FinTwitch Real LLM Service
 ===========================
 Provides genuine AI-powered financial insights using real LLM providers:
+- Google Gemini
 - OpenAI (GPT-4, GPT-3.5-turbo)
 - Ollama (Local models)
 - Fallback to intelligent mock
 
 Generates context-aware natural language insights from live financial metrics.
+Providers form an ordered failover chain (LLM_PROVIDER, then LLM_FALLBACK_PROVIDERS),
+each behind its own circuit breaker; see llm_providers.
 """
 
+import asyncio
+import concurrent.futures
+import copy
 import os
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Any, Optional
 from datetime import datetime
 import json
 from dotenv import load_dotenv
 from pathlib import Path
 
+from insight_cache import InsightCache, insight_fingerprint
+from circuit_breaker import STATE_VALUES
+from insight_prompt import (
+    BATCH_INSIGHT_SCHEMA, MAX_RECOMMENDATIONS, CompactPromptBuilder, build_batch_prompt, parse_batch_insights,
+    parse_insights,
+)
+from llm_providers import ProviderBackend, build_chain
+from llm_usage import UsageTracker
+from memo_render import MemoizedRenderer
+from telemetry import REGISTRY
+
 # Load environment variables from .env file in backend folder
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "fintwitch_llm_request_duration_seconds",
+    "LLM insight generation latency (outcome=fallback when a provider error fell back to mock)",
+    ("provider", "outcome"),
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "fintwitch_llm_cache_lookups_total", "Insight cache lookups", ("result",))
+_CACHE_HIT = LLM_CACHE_LOOKUPS.labels(result="hit")
+_CACHE_MISS = LLM_CACHE_LOOKUPS.labels(result="miss")
+
+# Mock/fallback insights quote exact amounts and a failed provider should be retried soon,
+# so they are cached briefly; real provider insights use LLM_CACHE_TTL_SECONDS
+FALLBACK_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_FALLBACK_TTL_SECONDS", "30"))
+
+# Generation pool: at most LLM_MAX_CONCURRENCY provider calls at once, LLM_MAX_QUEUE more
+# waiting; beyond that requests degrade to rule-based insights instead of piling up
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+LLM_GENERATION_TIMEOUT_SECONDS = float(os.getenv("LLM_GENERATION_TIMEOUT_SECONDS", "10"))
+
+# Failover chain after LLM_PROVIDER (comma-separated, e.g. "openai,ollama"). Providers whose
+# breaker is open are skipped; one more than LLM_ROUTING_SLACK times slower (EWMA) than the
+# fastest is tried after the others, except for one probe call in its usual place once its
+# stats are LLM_LATENCY_STALE_SECONDS old (so a recovered provider wins traffic back). With LLM_HEDGE_REQUESTS a second provider is also asked
+# once the first has run past its p95 latency (LLM_HEDGE_DELAY_SECONDS until
+# LLM_HEDGE_MIN_SAMPLES calls are known); the first answer wins, the other is cancelled.
+LLM_FALLBACK_PROVIDERS = os.getenv("LLM_FALLBACK_PROVIDERS", "")
+LLM_ROUTING_SLACK = float(os.getenv("LLM_ROUTING_SLACK", "1.5"))
+LLM_HEDGE_REQUESTS = os.getenv("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "2.0"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "5"))
+
+# Batch mode (submit_batch): per-user requests arriving within LLM_BATCH_WINDOW_MS are packed,
+# up to LLM_BATCH_MAX_USERS, into one provider call with one structured answer per user
+LLM_BATCH_MAX_USERS = int(os.getenv("LLM_BATCH_MAX_USERS", "8"))
+LLM_BATCH_WINDOW_SECONDS = float(os.getenv("LLM_BATCH_WINDOW_MS", "50")) / 1000
+LLM_BATCH_TIMEOUT_SECONDS = float(os.getenv("LLM_BATCH_TIMEOUT_SECONDS", "30"))
+LLM_GENERATIONS = REGISTRY.counter(
+    "fintwitch_llm_generations_total", "Insight generation requests by how they were served", ("result",))
+LLM_FIRST_TOKEN = REGISTRY.histogram(
+    "fintwitch_llm_time_to_first_token_seconds", "Provider request start to first streamed token", ("provider",))
+LLM_PROVIDER_CALLS = REGISTRY.counter(
+    "fintwitch_llm_provider_calls_total",
+    "Provider attempts by outcome (ok, error, timeout, rejected by an open circuit, cancelled hedge loser)",
+    ("provider", "outcome"))
+LLM_CIRCUIT_STATE = REGISTRY.gauge(
+    "fintwitch_llm_circuit_state", "Provider circuit breaker (0 closed, 1 half-open, 2 open)", ("provider",))
+LLM_HEDGES = REGISTRY.counter(
+    "fintwitch_llm_hedges_total", "Hedged provider requests fired, and how many answered first", ("result",))
+LLM_BATCH_USERS = REGISTRY.counter(
+    "fintwitch_llm_batch_users_total",
+    "Users served by batch generation (answered, cached, deduplicated, retried singly, fallback)", ("result",))
+
+class InsightStreamParser:
+    """
+    Incremental reader of the provider's INSIGHT_SCHEMA JSON as it streams.
+    
+    feed() takes raw tokens and returns events for what has arrived so far:
+    {"type": "delta", "section": "summary" | "risk_analysis", "text": ...} with the newly
+    decoded characters of those string values (so the summary renders while it is still
+    being written), and {"type": "recommendation", "index": i, "text": ...} per completed
+    array item. It only tracks JSON structure; the final insights always come from
+    parse_insights() on the complete text.
+    """
+    
+    TEXT_FIELDS = ("summary", "risk_analysis")
+    
+    def __init__(self):
+        self.text: Dict[str, str] = {field: "" for field in self.TEXT_FIELDS}
+        self.recommendations: List[str] = []
+        self._stack: List[str] = []         # open containers, "{" or "["
+        self._keys: List[Optional[str]] = []   # current key of each open object
+        self._expect_key = False
+        self._in_string = False
+        self._is_key = False
+        self._escaped = False
+        self._raw: List[str] = []            # undecoded characters of the current string
+        self._emitted = 0
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        events = []
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(events)
+                    continue
+                self._raw.append(char)
+            elif char == '"':
+                self._in_string, self._is_key = True, self._expect_key
+                self._raw, self._emitted = [], 0
+            elif char == "{":
+                self._stack.append("{")
+                self._keys.append(None)
+                self._expect_key = True
+            elif char == "[":
+                self._stack.append("[")
+                self._expect_key = False
+            elif char in "}]":
+                if self._stack and self._stack.pop() == "{":
+                    self._keys.pop()
+                self._expect_key = False
+            elif char == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1] == "{"
+            elif char == ":":
+                self._expect_key = False
+        if self._in_string and not self._is_key and self._field() in self.TEXT_FIELDS:
+            self._emit_delta(self._decode(final=False), events)
+        return events
+    
+    def _field(self) -> Optional[str]:
+        # Which part of the answer the current string value belongs to
+        if self._stack == ["{"]:
+            return self._keys[0]
+        if self._stack == ["{", "["] and self._keys[0] == "recommendations":
+            return "recommendations"
+        return None
+    
+    def _decode(self, final: bool) -> str:
+        raw = "".join(self._raw)
+        if final:
+            return json.loads(f'"{raw}"', strict=False)
+        # A partial string may end mid-escape (a lone backslash, half a \uXXXX) or mid surrogate pair
+        cut = raw.rfind("\\")
+        for candidate in (raw, raw[:cut] if cut != -1 else raw):
+            try:
+                decoded = json.loads(f'"{candidate}"', strict=False)
+                break
+            except ValueError:
+                continue
+        else:
+            return ""
+        if decoded and "\ud800" <= decoded[-1] <= "\udbff":
+            decoded = decoded[:-1]
+        return decoded
+    
+    def _emit_delta(self, decoded: str, events: List[Dict[str, Any]]):
+        if len(decoded) <= self._emitted:
+            return
+        field = self._field()
+        delta = decoded[self._emitted:]
+        self._emitted = len(decoded)
+        self.text[field] += delta
+        events.append({"type": "delta", "section": field, "text": delta})
+    
+    def _end_string(self, events: List[Dict[str, Any]]):
+        try:
+            value = self._decode(final=True)
+        except ValueError:
+            return
+        if self._is_key:
+            if self._keys:
+                self._keys[-1] = value
+            return
+        field = self._field()
+        if field in self.TEXT_FIELDS:
+            self._emit_delta(value, events)
+        elif field == "recommendations" and len(self.recommendations) < MAX_RECOMMENDATIONS and value.strip():
+            self.recommendations.append(value.strip())
+            events.append({"type": "recommendation", "index": len(self.recommendations) - 1,
+                           "text": value.strip()})
+
+
+class _StreamOwner:
+    """
+    Routes streamed events from concurrent provider attempts to one consumer.
+    
+    The first attempt to emit owns the stream; the others' events are dropped. If the
+    owner fails, a {"type": "reset"} event tells the consumer to discard what it has
+    shown and the next attempt to emit takes over.
+    """
+    
+    def __init__(self, on_event: Optional[Callable[[Dict[str, Any]], None]]):
+        self.on_event = on_event
+        self.owner: Optional[str] = None
+    
+    def sink(self, name: str) -> Optional[Callable[[Dict[str, Any]], None]]:
+        if self.on_event is None:
+            return None
+        
+        def emit(event: Dict[str, Any]):
+            if self.owner is None:
+                self.owner = name
+            if self.owner == name:
+                self.on_event(event)
+        
+        return emit
+    
+    def failed(self, name: str):
+        if self.on_event is not None and self.owner == name:
+            self.owner = None
+            self.on_event({"type": "reset"})
+
+
 class LLMService:
     """Real LLM integration for financial intelligence generation"""
     
-    def __init__(self):
+    def __init__(self, backends: Optional[List[ProviderBackend]] = None):
         self.provider = os.getenv("LLM_PROVIDER", "gemini").lower()
         self.enabled = os.getenv("ENABLE_LLM_INSIGHTS", "true").lower() == "true"
+        self.cache = InsightCache()
+        self.prompt_builder = CompactPromptBuilder()
+        self.usage = UsageTracker()
+        self.fallback_view = MemoizedRenderer("fallback_insights", self._render_mock_insights)
+        REGISTRY.gauge("fintwitch_llm_cache_entries", "Insights held in the cache").set_function(
+            lambda: len(self.cache))
         
-        if self.provider == "gemini":
-            self._init_gemini()
-        elif self.provider == "openai":
-            self._init_openai()
-        elif self.provider == "ollama":
-            self._init_ollama()
-        else:
-            self.provider = "mock"
+        # Single-flight generations by cache key, and the bounded pool they run in
+        self.max_concurrency = LLM_MAX_CONCURRENCY
+        self.max_queue = LLM_MAX_QUEUE
+        self.generation_timeout = LLM_GENERATION_TIMEOUT_SECONDS
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._pool: Optional[asyncio.Semaphore] = None
+        self._pool_loop = None
+        self._running = 0
+        self._queued = 0
+        # Last real (non-fallback) insight each reader was served, for reads of a new state
+        self._previous: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        REGISTRY.gauge("fintwitch_llm_generations_running", "Provider calls in progress").set_function(
+            lambda: self._running)
+        REGISTRY.gauge("fintwitch_llm_generations_queued", "Generations waiting for a pool slot").set_function(
+            lambda: self._queued)
+        
+        # Batch mode: pending users by cache key (identical states share one answer)
+        self.batch_max_users = LLM_BATCH_MAX_USERS
+        self.batch_window = LLM_BATCH_WINDOW_SECONDS
+        self.batch_timeout = LLM_BATCH_TIMEOUT_SECONDS
+        self._batch_pending: Dict[str, Dict[str, Any]] = {}
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks = set()
+        self._batch_stats = {"users": 0, "batches": 0, "batched_users": 0, "cost_usd": 0.0,
+                             "first_at": None, "last_at": None}
+        
+        # Ordered provider chain. SDKs are imported and clients created on a background thread
+        # (start_loading), so building the service - and the engine's startup - never waits on them
+        if backends is None:
+            backends = build_chain([self.provider, *LLM_FALLBACK_PROVIDERS.split(",")], self.max_concurrency)
+        self.backends: List[ProviderBackend] = [backend for backend in backends if backend.configured()]
+        self.provider = self.backends[0].name if self.backends else "mock"
+        if not self.backends:
             print("INFO: LLM Provider: Mock (set LLM_PROVIDER in .env for real AI)")
+        self.routing_slack = LLM_ROUTING_SLACK
+        self.hedge = LLM_HEDGE_REQUESTS
+        self.hedge_delay = LLM_HEDGE_DELAY_SECONDS
+        for backend in self.backends:
+            LLM_CIRCUIT_STATE.set_function(lambda backend=backend: STATE_VALUES[backend.breaker.state],
+                                           provider=backend.name)
+        
+        self.load_seconds: Optional[float] = None
+        self._load_future: concurrent.futures.Future = concurrent.futures.Future()
+        self._load_thread: Optional[threading.Thread] = None
+        self._load_lock = threading.Lock()
+        if not self.backends:
+            self.load_seconds = 0.0
+            self._load_future.set_result(self.provider)
     
-    def _init_gemini(self):
-        """Initialize Google Gemini client using modern google-genai SDK"""
-        try:
-            from google import genai
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key or api_key == "your_gemini_api_key_here":
-                print("INFO: Gemini API key not configured, falling back to mock")
-                print("INFO: Get FREE API key at: https://aistudio.google.com/app/apikey")
-                self.provider = "mock"
-                return
-            
-            # Initialize modern GenAI client
-            self.client = genai.Client(api_key=api_key)
-            self.model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
-            self.max_tokens = int(os.getenv("GEMINI_MAX_TOKENS", "500"))
-            print(f"+ LLM Provider: Google Gemini ({self.model_name})")
-            print("OK Using modern google-genai SDK")
-        except ImportError:
-            print("INFO: Google GenAI package not installed, falling back to mock")
-            print("INFO: Install with: pip install -U google-genai")
-            self.provider = "mock"
-        except Exception as e:
-            print(f"ERROR: Gemini initialization failed: {e}, falling back to mock")
-            self.provider = "mock"
+    def start_loading(self) -> concurrent.futures.Future:
+        """Load the provider clients on a background thread (once); the future resolves to the primary provider"""
+        with self._load_lock:
+            if self._load_thread is None and not self._load_future.done():
+                self._load_thread = threading.Thread(target=self._load, name="llm-loader", daemon=True)
+                self._load_thread.start()
+        return self._load_future
     
-    def _init_openai(self):
-        """Initialize OpenAI client"""
+    def _load(self):
+        start = time.perf_counter()
         try:
-            from openai import AsyncOpenAI
-            api_key = os.getenv("OPENAI_API_KEY")
-            if not api_key or api_key == "your_openai_api_key_here":
-                print("INFO: OpenAI API key not configured, falling back to mock")
-                self.provider = "mock"
-                return
-            
-            self.client = AsyncOpenAI(api_key=api_key)
-            self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-            self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "500"))
-            print(f"+ LLM Provider: OpenAI ({self.model})")
-        except ImportError:
-            print("INFO: OpenAI package not installed, falling back to mock")
-            self.provider = "mock"
-        except Exception as e:
-            print(f"ERROR: OpenAI initialization failed: {e}, falling back to mock")
-            self.provider = "mock"
+            # A provider whose SDK or client fails to load leaves the chain; the next one moves up
+            self.backends = [backend for backend in self.backends if backend.load()]
+            self.provider = self.backends[0].name if self.backends else "mock"
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self._load_future.set_result(self.provider)
     
-    def _init_ollama(self):
-        """Initialize Ollama client"""
+    async def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Wait (without blocking the loop) for the provider clients; False on timeout"""
+        future = self.start_loading()
+        if future.done():
+            return True
         try:
-            import httpx
-            self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-            self.model = os.getenv("OLLAMA_MODEL", "llama3.2")
-            self.client = httpx.Client(base_url=self.base_url, timeout=30.0)
-            
-            # Test connection
-            response = self.client.get("/api/tags")
-            if response.status_code == 200:
-                print(f"+ LLM Provider: Ollama ({self.model})")
-            else:
-                raise ConnectionError("Ollama not responding")
-        except Exception as e:
-            print(f"??  Ollama initialization failed: {e}, falling back to mock")
-            self.provider = "mock"
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def loading_stats(self) -> Dict[str, Any]:
+        if self._load_future.done():
+            state = "ready"
+        else:
+            state = "loading" if self._load_thread is not None else "not_started"
+        return {
+            "state": state,
+            "provider": self.provider,
+            "chain": [backend.name for backend in self.backends],
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+        }
+    
+    def provider_stats(self) -> Dict[str, Any]:
+        """Breaker state and latency of each provider in the chain, plus the current routing order"""
+        return {
+            "chain": {backend.name: backend.stats() for backend in self.backends},
+            "route": [backend.name for backend in self._route()],
+            "hedge": self.hedge,
+        }
+    
+    async def aclose(self):
+        """Release pooled provider connections"""
+        for backend in self.backends:
+            await backend.aclose()
     
     async def generate_financial_insights(
         self,
@@ -109,13 +362,18 @@ class LLMService:
         advanced_analytics: Dict[str, Any] = None,
         predictions: Dict[str, Any] = None,
         external_signals: Dict[str, Any] = None,
-        fusion_metrics: Dict[str, Any] = None
+        fusion_metrics: Dict[str, Any] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Generate comprehensive financial insights from live PROCESSED ANALYTICS
         
         IMPORTANT: LLM receives structured analytics, NOT raw transaction data
         
+        Materially identical analytics (see insight_cache) are served from the cache
+        without a provider call. use_cache=False skips the lookup (the caller just
+        missed) but still stores the result.
+        
         Args:
             metrics: Core financial metrics (balance, income, expenses, etc.)
             intelligence: Rule-based intelligence (alerts, warnings, risk level)
@@ -128,28 +386,341 @@ class LLMService:
         Returns:
             Dict with summary, risk_analysis, recommendations, confidence
         """
-        if not self.enabled:
-            return self._mock_insights(metrics, intelligence)
+        inputs = (metrics, intelligence, categories, advanced_analytics, predictions, external_signals, fusion_metrics)
+        key = self.cache_key(*inputs)
+        if use_cache:
+            cached = self.get_cached_insights(*inputs, key=key)
+            if cached is not None:
+                return cached
         
-        if self.provider == "gemini":
-            return await self._generate_gemini_insights(
-                metrics, intelligence, categories, 
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
-        elif self.provider == "openai":
-            return await self._generate_openai_insights(
-                metrics, intelligence, categories,
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
-        elif self.provider == "ollama":
-            return await self._generate_ollama_insights(
-                metrics, intelligence, categories,
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
+        # Shielded: a caller timing out must not cancel the generation others are sharing
+        return copy.deepcopy(await asyncio.shield(self._single_flight(key, inputs)))
+    
+    async def stream_financial_insights(
+        self,
+        metrics: Dict[str, Any],
+        intelligence: Dict[str, Any],
+        categories: Dict[str, Any],
+        advanced_analytics: Dict[str, Any] = None,
+        predictions: Dict[str, Any] = None,
+        external_signals: Dict[str, Any] = None,
+        fusion_metrics: Dict[str, Any] = None,
+        use_cache: bool = True
+    ):
+        """
+        Async generator of insight events while the provider streams its answer
+        
+        Yields InsightStreamParser events ("delta" / "recommendation") as tokens arrive,
+        then one {"type": "done", "insights": {...}, "source": ...} with the final insights,
+        which are authoritative. A provider failing mid-stream yields {"type": "reset"}
+        and the next provider in the chain (or rule-based insights) takes over. source is
+        "cache" (no provider call), "coalesced" (joined a generation already running for
+        the same state; no partial events) or "generated".
+        The generation runs as a single-flight task, so a consumer that stops early does
+        not cancel it and its result is still cached.
+        """
+        inputs = (metrics, intelligence, categories, advanced_analytics, predictions, external_signals, fusion_metrics)
+        key = self.cache_key(*inputs)
+        if use_cache:
+            cached = self.get_cached_insights(*inputs, key=key)
+            if cached is not None:
+                yield {"type": "done", "insights": cached, "source": "cache"}
+                return
+        
+        events: asyncio.Queue = asyncio.Queue()
+        running = self._inflight.get(key)
+        coalesced = running is not None and not running.done()
+        task = self._single_flight(key, inputs, on_event=events.put_nowait)
+        task.add_done_callback(lambda _: events.put_nowait(None))
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield event
+        
+        if task.cancelled() or task.exception() is not None:
+            insights = self._mock_insights(metrics, intelligence)
         else:
+            insights = copy.deepcopy(task.result())
+        yield {"type": "done", "insights": insights, "source": "coalesced" if coalesced else "generated"}
+    
+    def _single_flight(
+        self,
+        key: str,
+        inputs: tuple,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> asyncio.Task:
+        """The in-flight generation for key, starting one (streaming to on_event) if there is none"""
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            LLM_GENERATIONS.inc(result="coalesced")
+            return task
+        
+        task = asyncio.get_running_loop().create_task(self._generate_and_store(key, inputs, on_event))
+        self._inflight[key] = task
+        
+        def _finished(done):
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not done.cancelled() and done.exception() is not None:
+                print(f"INFO: LLM generation failed: {done.exception()}")
+        
+        task.add_done_callback(_finished)
+        return task
+    
+    def refresh_in_background(self, *inputs) -> asyncio.Task:
+        """Start (or join) the single-flight generation for these analytics without awaiting it"""
+        return self._single_flight(self.cache_key(*inputs), inputs)
+    
+    def precompute(self, *inputs) -> Optional[asyncio.Task]:
+        """
+        Warm the cache for these analytics ahead of a read: the refresh task, or None when
+        fresh insights are already cached or being generated. Needs a running loop.
+        """
+        key = self.cache_key(*inputs)
+        running = self._inflight.get(key)
+        if self.cache.is_fresh(key) or (running is not None and not running.done()):
+            return None
+        return self._single_flight(key, inputs)
+    
+    def get_insights_swr(self, *inputs, user_id: str = "default"):
+        """
+        Stale-while-revalidate lookup: returns (insights, freshness) where freshness is
+        "fresh" (cache hit), "stale" (this state's expired entry) or "previous" (the last good
+        insight this user_id was served, for an earlier state), or (None, "miss"). Anything
+        but a fresh hit starts one background refresh (coalesced with any already running).
+        Needs a running loop.
+        """
+        key = self.cache_key(*inputs)
+        cached = self.get_cached_insights(*inputs, key=key)
+        if cached is not None:
+            self._remember(user_id, cached)
+            return cached, "fresh"
+        self._single_flight(key, inputs)
+        stale = self.cache.get_stale(key)
+        if stale is not None:
+            self._remember(user_id, stale)
+            return stale, "stale"
+        previous = self._previous.get(user_id)
+        if previous is not None:
+            return copy.deepcopy(previous), "previous"
+        return None, "miss"
+    
+    def _remember(self, user_id: str, insights: Dict[str, Any]):
+        if insights.get("provider") == "mock_intelligent":
+            return
+        self._previous[user_id] = copy.deepcopy(insights)
+        self._previous.move_to_end(user_id)
+        while len(self._previous) > self.cache.max_entries:
+            self._previous.popitem(last=False)
+    
+    async def _acquire_slot(self) -> bool:
+        """Wait for a pool slot; False when the queue is already full"""
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool_loop is not loop:
+            self._pool = asyncio.Semaphore(self.max_concurrency)
+            self._pool_loop = loop
+        if self._pool.locked() and self._queued >= self.max_queue:
+            return False
+        self._queued += 1
+        try:
+            await self._pool.acquire()
+        finally:
+            self._queued -= 1
+        return True
+    
+    async def _generate_and_store(
+        self,
+        key: str,
+        inputs: tuple,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        metrics, intelligence = inputs[0], inputs[1]
+        if not await self._acquire_slot():
+            LLM_GENERATIONS.inc(result="rejected")
             return self._mock_insights(metrics, intelligence)
+        
+        provider = self.provider if self.enabled else "disabled"
+        outcome = "error"
+        self._running += 1
+        start = time.perf_counter()
+        try:
+            insights = await asyncio.wait_for(self._generate_insights(*inputs, on_event=on_event),
+                                              self.generation_timeout)
+            # Provider errors are swallowed into mock insights; count them separately
+            real_provider = provider not in ("mock", "disabled")
+            outcome = "fallback" if real_provider and insights.get("provider") == "mock_intelligent" else "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            print(f"INFO: LLM generation timed out after {self.generation_timeout:g}s, using rule-based insights")
+            insights = self._mock_insights(metrics, intelligence)
+        finally:
+            self._running -= 1
+            self._pool.release()
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - start, provider=provider, outcome=outcome)
+        
+        LLM_GENERATIONS.inc(result="generated")
+        is_fallback = insights.get("provider") == "mock_intelligent"
+        self.cache.put(key, insights, ttl_seconds=FALLBACK_CACHE_TTL_SECONDS if is_fallback else None)
+        return insights
     
-    def _build_context_prompt(
+    def submit_batch(self, user_id: str, *inputs) -> asyncio.Future:
+        """
+        Queue one user's insight request for batch generation; the future resolves to their insights
+        
+        Requests submitted within LLM_BATCH_WINDOW_MS are packed, up to LLM_BATCH_MAX_USERS per
+        provider call, into one multi-user prompt answered in BATCH_INSIGHT_SCHEMA. Answers are
+        scattered into the insight cache under each user's state, so later single lookups hit.
+        Users with materially identical analytics share one answer; a user the provider left
+        out is retried as a single generation. Needs a running loop.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_stats["users"] += 1
+        if self._batch_stats["first_at"] is None:
+            self._batch_stats["first_at"] = time.perf_counter()
+        key = self.cache_key(*inputs)
+        cached = self.get_cached_insights(*inputs, key=key)
+        if cached is not None:
+            LLM_BATCH_USERS.inc(result="cached")
+            self._resolve_batch([future], cached)
+            return future
+        
+        entry = self._batch_pending.get(key)
+        if entry is not None:
+            LLM_BATCH_USERS.inc(result="deduplicated")
+            entry["futures"].append(future)
+            return future
+        self._batch_pending[key] = {"user_id": str(user_id), "inputs": inputs, "futures": [future]}
+        if len(self._batch_pending) >= self.batch_max_users:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(self.batch_window, self._flush_batch)
+        return future
+    
+    def _flush_batch(self):
+        """Start one batch generation for everything pending"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        if not self._batch_pending:
+            return
+        batch, self._batch_pending = self._batch_pending, {}
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+    
+    def _resolve_batch(self, futures: List[asyncio.Future], insights: Dict[str, Any]):
+        for future in futures:
+            if not future.done():
+                future.set_result(copy.deepcopy(insights))
+        self._batch_stats["last_at"] = time.perf_counter()
+    
+    async def _run_batch(self, batch: Dict[str, Dict[str, Any]]):
+        # Users are numbered in the prompt (short, no user identifiers sent to the provider)
+        ids = {f"u{index}": key for index, key in enumerate(batch, 1)}
+        answers = None
+        try:
+            if self.enabled and await self._acquire_slot():
+                self._running += 1
+                try:
+                    answers = await asyncio.wait_for(self._generate_batch(ids, batch), self.batch_timeout)
+                except asyncio.TimeoutError:
+                    print(f"INFO: LLM batch of {len(ids)} timed out after {self.batch_timeout:g}s")
+                finally:
+                    self._running -= 1
+                    self._pool.release()
+            
+            retries = {}
+            for prompt_id, key in ids.items():
+                entry = batch[key]
+                insights = answers.get(prompt_id) if answers is not None else None
+                if insights is not None:
+                    LLM_BATCH_USERS.inc(len(entry["futures"]), result="answered")
+                    self.cache.put(key, insights)
+                    self._resolve_batch(entry["futures"], insights)
+                elif answers is not None:
+                    # Answered, but not for this user: a single generation (own failover and fallback)
+                    retries[key] = self._single_flight(key, entry["inputs"])
+                else:
+                    LLM_BATCH_USERS.inc(len(entry["futures"]), result="fallback")
+                    insights = self._mock_insights(*entry["inputs"][:2])
+                    self.cache.put(key, insights, ttl_seconds=FALLBACK_CACHE_TTL_SECONDS)
+                    self._resolve_batch(entry["futures"], insights)
+            for key, task in retries.items():
+                LLM_BATCH_USERS.inc(len(batch[key]["futures"]), result="retried")
+                self._resolve_batch(batch[key]["futures"], await task)
+        finally:
+            for entry in batch.values():
+                if any(not future.done() for future in entry["futures"]):
+                    self._resolve_batch(entry["futures"], self._mock_insights(*entry["inputs"][:2]))
+    
+    async def _generate_batch(
+        self,
+        ids: Dict[str, str],
+        batch: Dict[str, Dict[str, Any]]
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Insights by prompt id from one multi-user provider call; None if no provider answered"""
+        await self.wait_until_loaded()
+        if not self.backends:
+            return None
+        prompt = build_batch_prompt({prompt_id: batch[key]["inputs"] for prompt_id, key in ids.items()})
+        
+        async def call(backend: ProviderBackend, usage: Dict[str, Any]):
+            tokens = backend.token_stream(prompt, usage, BATCH_INSIGHT_SCHEMA, backend.max_tokens * len(ids))
+            content = "".join([token async for token in tokens])
+            answers = {prompt_id: answer for prompt_id, answer in parse_batch_insights(content).items()
+                       if prompt_id in ids}
+            if not answers:
+                raise ValueError("batch insight response answered no user")
+            return backend, answers, self.usage.record(backend.name, backend.model, prompt, content, usage)
+        
+        result = await self._generate_with_failover(call, _StreamOwner(None), batch=True)
+        if result is None:
+            return None
+        backend, answers, usage = result
+        LLM_GENERATIONS.inc(result="batch")
+        self._batch_stats["batches"] += 1
+        self._batch_stats["batched_users"] += len(ids)
+        self._batch_stats["cost_usd"] += usage["cost_usd"]
+        # Each user carries an equal share of the call's tokens and cost
+        share = {
+            "prompt_tokens": round(usage["prompt_tokens"] / len(ids)),
+            "completion_tokens": round(usage["completion_tokens"] / len(ids)),
+            "cost_usd": round(usage["cost_usd"] / len(ids), 8),
+            "estimated": usage["estimated"],
+            "batch_size": len(ids),
+        }
+        return {prompt_id: dict(self._with_provider(answer, backend), usage=dict(share))
+                for prompt_id, answer in answers.items()}
+    
+    def batch_stats(self) -> Dict[str, Any]:
+        """Batch mode throughput (users per minute from first submit to last answer) and cost per user"""
+        stats = self._batch_stats
+        span = (stats["last_at"] - stats["first_at"]) if stats["last_at"] is not None else None
+        return {
+            "users": stats["users"],
+            "batches": stats["batches"],
+            "avg_batch_size": round(stats["batched_users"] / stats["batches"], 2) if stats["batches"] else None,
+            "pending": len(self._batch_pending),
+            "users_per_min": round(stats["users"] / span * 60, 1) if span else None,
+            "cost_usd": round(stats["cost_usd"], 6),
+            "cost_per_user_usd": round(stats["cost_usd"] / stats["users"], 8) if stats["users"] else None,
+            "max_users": self.batch_max_users,
+            "window_ms": round(self.batch_window * 1000),
+        }
+    
+    def generation_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "running": self._running,
+            "queued": self._queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.generation_timeout,
+        }
+    
+    def cache_key(
         self,
         metrics: Dict[str, Any],
         intelligence: Dict[str, Any],
@@ -159,90 +730,15 @@ class LLMService:
         external_signals: Dict[str, Any] = None,
         fusion_metrics: Dict[str, Any] = None
     ) -> str:
-        """Build enhanced prompt with PROCESSED ANALYTICS (not raw data)"""
-        
-        # Format category spending
-        top_categories = sorted(
-            [(k, v.get('expenses', 0)) for k, v in categories.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:3]
-        category_text = ", ".join([f"{cat}: Rupee {amt:.0f}" for cat, amt in top_categories if amt > 0])
-        
-        # Build enhanced prompt with analytics
-        prompt = f"""You are a financial advisor AI analyzing REAL-TIME PROCESSED FINANCIAL ANALYTICS.
-
-CURRENT FINANCIAL STATE:
-- Balance: Rupee {metrics.get('balance', 0):.2f}
-- Total Income: Rupee {metrics.get('total_income', 0):.2f}
-- Total Expenses: Rupee {metrics.get('total_expenses', 0):.2f}
-- Transactions: {metrics.get('transaction_count', 0)}
-- Financial Health Score: {metrics.get('financial_health_score', 0):.1f}/100
-
-RISK ASSESSMENT:
-- Risk Level: {intelligence.get('risk_level', 'UNKNOWN')}
-- Active Alerts: {len(intelligence.get('alerts', []))}
-- Active Warnings: {len(intelligence.get('warnings', []))}"""
-
-        # Add advanced analytics if available
-        if advanced_analytics:
-            prompt += f"""
-
-STREAMING ANALYTICS:
-- Spending Velocity: Rupee {advanced_analytics.get('spending_velocity', 0):.2f}/minute
-- Trend: {advanced_analytics.get('trend', 'stable').upper()}
-- Spending Pattern: {advanced_analytics.get('spending_pattern', 'normal')}
-- Anomaly Detected: {'YES' if advanced_analytics.get('anomaly_detected') else 'NO'}"""
-
-        # Add predictions if available
-        if predictions:
-            days_zero = predictions.get('days_until_zero_balance')
-            prompt += f"""
-
-PREDICTIVE INSIGHTS:
-- Balance Depletion: {f"In {days_zero} days" if days_zero else "Not at risk"}
-- Daily Burn Rate: Rupee {predictions.get('burn_rate_per_day', 0):.2f}
-- Projected Monthly Deficit: Rupee {predictions.get('projected_monthly_deficit', 0):.2f}
-- Recommended Daily Budget: Rupee {predictions.get('recommended_daily_budget', 0):.2f}"""
-
-        # Add external context if available
-        if external_signals:
-            prompt += f"""
-
-EXTERNAL MARKET CONDITIONS:
-- Market Sentiment: {external_signals.get('market_sentiment', 0.5):.2f} (0=bearish, 1=bullish)
-- Market Volatility: {external_signals.get('market_volatility', 0):.2f}
-- Interest Rate: {external_signals.get('interest_rate', 0):.1f}%
-- Inflation Rate: {external_signals.get('inflation_rate', 0):.1f}%"""
-
-        # Add fusion metrics if available
-        if fusion_metrics:
-            prompt += f"""
-
-MULTI-SOURCE RISK ANALYSIS:
-- Overall Financial Risk: {fusion_metrics.get('overall_financial_risk', 0):.0f}/100
-- Market-Adjusted Health: {fusion_metrics.get('market_adjusted_health', 0):.0f}/100
-- Recommended Action: {fusion_metrics.get('recommended_action', 'monitor').replace('_', ' ').title()}"""
-
-        prompt += f"""
-
-TOP SPENDING CATEGORIES:
-{category_text if category_text else "No spending data yet"}
-
-ALERTS & WARNINGS:
-{chr(10).join(['- ' + alert for alert in intelligence.get('alerts', [])[:3]])}
-{chr(10).join(['- ' + warning for warning in intelligence.get('warnings', [])[:2]])}
-
-TASK: Provide a concise financial analysis with:
-1. A brief summary (2-3 sentences) considering all analytics including trends and predictions
-2. Risk analysis explaining the current risk level using ALL available data sources
-3. 3-4 specific, actionable recommendations based on trends, predictions, and market conditions
-
-Be direct, practical, and data-driven. Use Indian Rupee (Rupee ) format."""
-        
-        return prompt
+        """Quantized fingerprint of the prompt inputs, scoped to the active provider/model"""
+        model = self._model_id()
+        return insight_fingerprint(
+            metrics, intelligence, categories,
+            advanced_analytics, predictions, external_signals, fusion_metrics,
+            scope=f"{self.provider if self.enabled else 'disabled'}:{model}"
+        )
     
-    async def _generate_gemini_insights(
+    def get_cached_insights(
         self,
         metrics: Dict[str, Any],
         intelligence: Dict[str, Any],
@@ -250,31 +746,19 @@ Be direct, practical, and data-driven. Use Indian Rupee (Rupee ) format."""
         advanced_analytics: Dict[str, Any] = None,
         predictions: Dict[str, Any] = None,
         external_signals: Dict[str, Any] = None,
-        fusion_metrics: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
-        """Generate insights using Google Gemini API with modern SDK"""
-        try:
-            prompt = self._build_context_prompt(
-                metrics, intelligence, categories,
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
-            
-            # Generate content with modern GenAI client (async)
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            
-            content = response.text
-            
-            # Parse response into structured format
-            return self._parse_llm_response(content, metrics, intelligence)
-            
-        except Exception as e:
-            print(f"? Gemini API error: {e}")
-            return self._mock_insights(metrics, intelligence)
+        fusion_metrics: Dict[str, Any] = None,
+        key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Cached insights for a materially identical state, or None (no provider call)"""
+        key = key or self.cache_key(
+            metrics, intelligence, categories,
+            advanced_analytics, predictions, external_signals, fusion_metrics
+        )
+        cached = self.cache.get(key)
+        (_CACHE_MISS if cached is None else _CACHE_HIT).inc()
+        return cached
     
-    async def _generate_openai_insights(
+    async def _generate_insights(
         self,
         metrics: Dict[str, Any],
         intelligence: Dict[str, Any],
@@ -282,41 +766,33 @@ Be direct, practical, and data-driven. Use Indian Rupee (Rupee ) format."""
         advanced_analytics: Dict[str, Any] = None,
         predictions: Dict[str, Any] = None,
         external_signals: Dict[str, Any] = None,
-        fusion_metrics: Dict[str, Any] = None
+        fusion_metrics: Dict[str, Any] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        """Generate insights using OpenAI API"""
-        try:
-            prompt = self._build_context_prompt(
-                metrics, intelligence, categories,
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
-            
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful financial advisor providing concise, actionable advice based on real-time transaction data."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.7,
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Parse response into structured format
-            return self._parse_llm_response(content, metrics, intelligence)
-            
-        except Exception as e:
-            print(f"? OpenAI API error: {e}")
+        """Answer from the provider chain; on_event receives streamed section events"""
+        if not self.enabled:
+            return self._mock_insights(metrics, intelligence)
+        # Normally loaded long before the first request; a cold call waits inside the generation timeout
+        await self.wait_until_loaded()
+        
+        inputs = (metrics, intelligence, categories, advanced_analytics, predictions, external_signals, fusion_metrics)
+        if not self.backends:
             return self._mock_insights(metrics, intelligence)
+        prompt = self._build_context_prompt(*inputs)
+        stream = _StreamOwner(on_event)
+        
+        def call(backend: ProviderBackend, usage: Dict[str, Any]):
+            # Streamed so the event loop only ever waits on the socket, never on inference
+            return self._parse_token_stream(
+                backend, backend.token_stream(prompt, usage), prompt, usage, stream.sink(backend.name))
+        
+        insights = await self._generate_with_failover(call, stream)
+        if insights is None:
+            print("INFO: No LLM provider answered, using rule-based insights")
+            return self._mock_insights(metrics, intelligence)
+        return insights
     
-    async def _generate_ollama_insights(
+    def _build_context_prompt(
         self,
         metrics: Dict[str, Any],
         intelligence: Dict[str, Any],
@@ -325,102 +801,198 @@ Be direct, practical, and data-driven. Use Indian Rupee (Rupee ) format."""
         predictions: Dict[str, Any] = None,
         external_signals: Dict[str, Any] = None,
         fusion_metrics: Dict[str, Any] = None
-    ) -> Dict[str, Any]:
-        """Generate insights using Ollama local LLM"""
+    ) -> str:
+        """Compact prompt of PROCESSED ANALYTICS (not raw data) under LLM_PROMPT_TOKEN_BUDGET"""
+        return self.prompt_builder.build(
+            metrics, intelligence, categories,
+            advanced_analytics, predictions, external_signals, fusion_metrics
+        )
+    
+    def _route(self) -> List[ProviderBackend]:
+        """Providers to try, in order: open circuits left out, much slower ones moved last (unless due a probe)"""
+        candidates = [backend for backend in self.backends if backend.breaker.available()]
+        known = [backend.latency.ewma for backend in candidates if backend.latency.ewma is not None]
+        fastest = min(known) if known else None
+        
+        def slow(backend):
+            ewma = backend.latency.ewma
+            if fastest is None or ewma is None or ewma <= fastest * self.routing_slack:
+                return False
+            # Its estimate is out of date: route one call as usual to re-measure it
+            return not backend.latency.claim_probe()
+        
+        return sorted(candidates, key=lambda backend: (slow(backend), self.backends.index(backend)))
+    
+    def _hedge_after(self, backend: ProviderBackend) -> float:
+        if len(backend.latency) >= LLM_HEDGE_MIN_SAMPLES:
+            return backend.latency.percentile(95)
+        return self.hedge_delay
+    
+    async def _generate_with_failover(
+        self,
+        call: Callable[[ProviderBackend, Dict[str, Any]], Awaitable[Any]],
+        stream: _StreamOwner,
+        batch: bool = False
+    ) -> Optional[Any]:
+        """
+        Run call(backend, usage) on the routed providers in turn until one answers; None if none does
+        
+        With hedging on, a second provider is started when the first runs past its hedge
+        delay; whichever answers first wins and the other is cancelled without counting
+        against its breaker. Batch calls are not hedged and not sampled for latency, since
+        their duration grows with the batch.
+        """
+        candidates = self._route()
+        loop = asyncio.get_running_loop()
+        pending: Dict[asyncio.Task, ProviderBackend] = {}
+        lost = set()
+        hedge_task = None
+        
+        def launch() -> Optional[asyncio.Task]:
+            while candidates:
+                backend = candidates.pop(0)
+                if backend.breaker.allow():
+                    task = loop.create_task(self._attempt(backend, call, stream, lost, batch))
+                    pending[task] = backend
+                    return task
+                LLM_PROVIDER_CALLS.inc(provider=backend.name, outcome="rejected")
+            return None
+        
+        timed_out = False
         try:
-            prompt = self._build_context_prompt(
-                metrics, intelligence, categories,
-                advanced_analytics, predictions, external_signals, fusion_metrics
-            )
-            
-            response = self.client.post(
-                "/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            
-            if response.status_code == 200:
-                content = response.json().get("response", "")
-                return self._parse_llm_response(content, metrics, intelligence)
+            launch()
+            while pending:
+                wait = None
+                if self.hedge and not batch and hedge_task is None and candidates and len(pending) == 1:
+                    wait = self._hedge_after(next(iter(pending.values())))
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_task = launch()
+                    if hedge_task is not None:
+                        LLM_HEDGES.inc(result="fired")
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            LLM_HEDGES.inc(result="won")
+                        return task.result()
+                if not pending:
+                    launch()
+        except asyncio.CancelledError:
+            timed_out = True
+            raise
+        finally:
+            for task, backend in pending.items():
+                if not timed_out:
+                    lost.add(backend.name)
+                task.cancel()
+        return None
+    
+    async def _attempt(
+        self,
+        backend: ProviderBackend,
+        call: Callable[[ProviderBackend, Dict[str, Any]], Awaitable[Any]],
+        stream: _StreamOwner,
+        lost: set,
+        batch: bool = False
+    ) -> Any:
+        """One provider call, recorded against its breaker and latency stats; raises on failure"""
+        start = time.perf_counter()
+        try:
+            if not await backend.available():
+                raise ConnectionError(f"{backend.label} is unavailable")
+            result = await call(backend, {})
+        except asyncio.CancelledError:
+            if backend.name in lost:
+                # Not a failure; the elapsed time is a lower bound on its latency, enough to rank
+                # it behind the provider that answered first
+                backend.breaker.release()
+                if not batch:
+                    backend.latency.observe(time.perf_counter() - start)
+                LLM_PROVIDER_CALLS.inc(provider=backend.name, outcome="cancelled")
             else:
-                raise Exception(f"Ollama returned status {response.status_code}")
-                
+                backend.breaker.record_failure()
+                LLM_PROVIDER_CALLS.inc(provider=backend.name, outcome="timeout")
+            raise
         except Exception as e:
-            print(f"? Ollama API error: {e}")
-            return self._mock_insights(metrics, intelligence)
+            backend.breaker.record_failure()
+            LLM_PROVIDER_CALLS.inc(provider=backend.name, outcome="error")
+            if isinstance(e, ValueError):
+                # The model answered but not in the insight schema; the server itself is fine
+                print(f"? {backend.label} returned malformed insights: {e}")
+            else:
+                print(f"? {backend.label} API error: {e}")
+                backend.on_error(e)
+            stream.failed(backend.name)
+            raise
+        backend.breaker.record_success()
+        if not batch:
+            backend.latency.observe(time.perf_counter() - start)
+        LLM_PROVIDER_CALLS.inc(provider=backend.name, outcome="ok")
+        return result
     
-    def _parse_llm_response(
+    async def _parse_token_stream(
         self,
-        content: str,
-        metrics: Dict[str, Any],
-        intelligence: Dict[str, Any]
+        backend: ProviderBackend,
+        tokens: AsyncIterator[str],
+        prompt: str,
+        usage: Dict[str, Any],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
-        """Parse LLM text response into structured format"""
-        
-        # Split by sections
-        lines = content.strip().split('\n')
-        summary_lines = []
-        risk_lines = []
-        rec_lines = []
-        
-        current_section = "summary"
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Detect section headers
-            lower_line = line.lower()
-            if "risk" in lower_line and ("analysis" in lower_line or "assessment" in lower_line):
-                current_section = "risk"
-                continue
-            elif "recommendation" in lower_line or "advice" in lower_line:
-                current_section = "recommendations"
-                continue
-            
-            # Add to appropriate section
-            if current_section == "summary":
-                summary_lines.append(line)
-            elif current_section == "risk":
-                risk_lines.append(line)
-            elif current_section == "recommendations":
-                # Extract bullet points or numbered lists
-                if line.startswith(('1.', '2.', '3.', '4.', '-', '*', '*')):
-                    # Clean up numbering/bullets
-                    rec_lines.append(line.lstrip('1234567890.-** '))
-        
-        # Combine sections
-        summary = ' '.join(summary_lines[:3]) if summary_lines else "Financial analysis in progress."
-        risk_analysis = ' '.join(risk_lines[:2]) if risk_lines else f"Risk level is {intelligence.get('risk_level', 'MEDIUM')}."
-        recommendations = rec_lines[:4] if rec_lines else ["Monitor your spending closely", "Track expenses by category"]
-        
+        """Read the provider's JSON as it arrives, passing partial-answer events to on_event"""
+        parser = InsightStreamParser()
+        chunks = []
+        start = time.perf_counter()
+        async for token in tokens:
+            if not chunks:
+                LLM_FIRST_TOKEN.observe(time.perf_counter() - start, provider=backend.name)
+            chunks.append(token)
+            events = parser.feed(token)
+            if on_event is not None:
+                for event in events:
+                    on_event(event)
+        content = "".join(chunks)
+        insights = self._parse_llm_response(content, backend)
+        insights["usage"] = self.usage.record(backend.name, backend.model, prompt, content, usage)
+        return insights
+    
+    def _parse_llm_response(self, content: str, backend: ProviderBackend) -> Dict[str, Any]:
+        """Structured insights from the provider's JSON answer; ValueError if it is malformed"""
+        return self._with_provider(parse_insights(content), backend)
+    
+    def _with_provider(self, answer: Dict[str, Any], backend: ProviderBackend) -> Dict[str, Any]:
         return {
-            "summary": summary,
-            "risk_analysis": risk_analysis,
-            "recommendations": recommendations,
+            **answer,
             "confidence": 0.92,  # High confidence for real LLM
             "generated_at": datetime.now().isoformat(),
-            "provider": self.provider,
-            "model": getattr(self, 'model', 'mock')
+            "provider": backend.name,
+            "model": backend.model
         }
     
+    def _model_id(self) -> str:
+        # Cache scope follows the primary provider; a failover answer is cached under it too
+        return self.backends[0].model if self.backends else "default"
+    
     def _mock_insights(
         self,
         metrics: Dict[str, Any],
         intelligence: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Intelligent mock insights when real LLM unavailable"""
-        
-        balance = metrics.get('balance', 0)
-        income = metrics.get('total_income', 0)
-        expenses = metrics.get('total_expenses', 0)
-        health_score = metrics.get('financial_health_score', 0)
-        risk_level = intelligence.get('risk_level', 'MEDIUM')
-        
+        """Intelligent mock insights when real LLM unavailable (re-rendered only when their inputs change)"""
+        insights, _ = self.fallback_view.render((
+            metrics.get('balance', 0),
+            metrics.get('total_income', 0),
+            metrics.get('total_expenses', 0),
+            intelligence.get('risk_level', 'MEDIUM'),
+        ))
+        # Callers and the cache may hold on to the result; the rendered view stays read-only.
+        # The timestamp is not part of the view: a memoized render can be hours old
+        return dict(insights, recommendations=list(insights["recommendations"]),
+                    generated_at=datetime.now().isoformat())
+    
+    @staticmethod
+    def _render_mock_insights(balance: float, income: float, expenses: float, risk_level: str) -> Dict[str, Any]:
         # Generate contextual summary
         abs_expenses = abs(expenses)
         if balance < 0:
@@ -467,7 +1039,6 @@ Be direct, practical, and data-driven. Use Indian Rupee (Rupee ) format."""
             "risk_analysis": risk_analysis,
             "recommendations": recommendations[:4],
             "confidence": 0.85,
-            "generated_at": datetime.now().isoformat(),
             "provider": "mock_intelligent",
             "model": "rule-based"
         }
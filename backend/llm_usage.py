@@ -0,0 +1,98 @@
+"""
+LLM Token and Cost Accounting for FinTwitch
+===========================================
+Per-call prompt/completion token counts and their cost, with running totals.
+
+Counts come from the provider's usage report (OpenAI stream usage chunk, Gemini
+usage_metadata, Ollama prompt_eval_count / eval_count). When a provider does not report
+them they are estimated from text length and the call is flagged "estimated".
+
+Prices are USD per million tokens, by model name prefix; LLM_PRICE_INPUT_PER_MTOK and
+LLM_PRICE_OUTPUT_PER_MTOK override them (e.g. for negotiated rates). Local models cost 0.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from insight_prompt import estimate_tokens
+from telemetry import REGISTRY
+
+# (input, output) USD per 1M tokens; longest matching prefix wins
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+PRICE_OVERRIDE = (os.getenv("LLM_PRICE_INPUT_PER_MTOK"), os.getenv("LLM_PRICE_OUTPUT_PER_MTOK"))
+
+LLM_TOKENS = REGISTRY.counter("fintwitch_llm_tokens_total", "LLM tokens by provider and kind", ("provider", "kind"))
+LLM_COST = REGISTRY.counter("fintwitch_llm_cost_usd_total", "Estimated LLM spend in USD", ("provider",))
+
+
+def model_price(provider: str, model: str) -> Tuple[float, float]:
+    if PRICE_OVERRIDE[0] is not None or PRICE_OVERRIDE[1] is not None:
+        return float(PRICE_OVERRIDE[0] or 0), float(PRICE_OVERRIDE[1] or 0)
+    if provider == "ollama":
+        return 0.0, 0.0
+    matches = [prefix for prefix in MODEL_PRICES if (model or "").startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else (0.0, 0.0)
+
+
+class UsageTracker:
+    """Records each provider call's tokens and cost; thread-safe totals for /status"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.estimated_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+
+    def record(self, provider: str, model: str, prompt: str, completion: str,
+               reported: Optional[Dict[str, Optional[int]]] = None) -> Dict[str, Any]:
+        """Usage of one call; reported holds the provider's prompt_tokens / completion_tokens if any"""
+        reported = reported or {}
+        prompt_tokens = reported.get("prompt_tokens")
+        completion_tokens = reported.get("completion_tokens")
+        estimated = prompt_tokens is None or completion_tokens is None
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(completion)
+        input_price, output_price = model_price(provider, model)
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider=provider, kind="completion")
+        LLM_COST.inc(cost, provider=provider)
+        with self._lock:
+            self.calls += 1
+            self.estimated_calls += estimated
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cost_usd += cost
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd": round(cost, 8),
+            "estimated": estimated,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "estimated_calls": self.estimated_calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cost_usd": round(self.cost_usd, 6),
+                "avg_prompt_tokens": round(self.prompt_tokens / self.calls, 1) if self.calls else None,
+                "avg_cost_usd": round(self.cost_usd / self.calls, 8) if self.calls else None,
+            }
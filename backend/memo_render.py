@@ -0,0 +1,68 @@
+"""
+Memoized Rendering for FinTwitch
+================================
+The rule-based views (real-time alerts, rules intelligence, fallback insights) are pure
+functions of a handful of input fields. A MemoizedRenderer remembers the inputs it last
+rendered: render() only runs the render function when one of them changed (the view is
+dirty), and each re-render bumps the view's version. json_bytes() serializes once per
+version, so a read endpoint whose inputs have not changed returns cached bytes.
+
+Inputs are compared by value, so callers pass exactly the fields the view reads as a
+tuple; anything outside the tuple must not affect the output. Rendered values are
+shared between callers and must be treated as read-only.
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from telemetry import REGISTRY
+
+VIEW_RENDERS = REGISTRY.counter(
+    "fintwitch_view_renders_total", "Memoized view lookups (render = inputs changed, hit = reused)",
+    ("view", "result"))
+
+_UNSET = object()
+
+
+class MemoizedRenderer:
+    """A derived view re-rendered only when its input fields change"""
+
+    def __init__(self, name: str, render_fn: Callable[..., Any]):
+        self.name = name
+        self._render_fn = render_fn
+        self._inputs: Any = _UNSET
+        self.value: Any = None
+        self.version = 0
+        self.hits = 0
+        self._json = b""
+        self._json_version = 0
+        self._lock = threading.Lock()
+        self._hit = VIEW_RENDERS.labels(view=name, result="hit")
+        self._render = VIEW_RENDERS.labels(view=name, result="render")
+
+    def render(self, inputs: Tuple) -> Tuple[Any, bool]:
+        """(value, changed) for these inputs; render_fn(*inputs) runs only if they changed"""
+        with self._lock:
+            if inputs == self._inputs:
+                self.hits += 1
+                self._hit.inc()
+                return self.value, False
+            self.value = self._render_fn(*inputs)
+            self._inputs = inputs
+            self.version += 1
+            self._render.inc()
+            return self.value, True
+
+    def json_bytes(self) -> bytes:
+        """The current value as JSON (as FastAPI would encode it), serialized once per version"""
+        with self._lock:
+            if self._json_version != self.version:
+                self._json = json.dumps(self.value, ensure_ascii=False, allow_nan=False,
+                                        separators=(",", ":")).encode("utf-8")
+                self._json_version = self.version
+            return self._json
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"version": self.version, "hits": self.hits}
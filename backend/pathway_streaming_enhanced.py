@@ -19,18 +19,23 @@ Architecture:
     [Economic Events]   --+
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+import time
+_import_started = time.perf_counter()   # import time of this module is reported on /status
+
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Literal, List, Dict, Any, Optional
 import uvicorn
 from datetime import datetime, timedelta
 import asyncio
+import functools
 from collections import defaultdict, deque
 import threading
-import time
 from pathlib import Path
 import json
+import os
 import queue as queue_module
 
 # Import real Pathway
@@ -56,6 +61,20 @@ PATHWAY_RUNNING = False
 # Import LLM service and external stream
 from llm_service import get_llm_service
 from external_data_stream import ExternalDataStreamGenerator
+from sim_clock import SimulatedClock, seed_from_env
+from telemetry import (
+    CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE,
+    REGISTRY as METRICS,
+    InstrumentedLock,
+    RequestMetricsMiddleware,
+    monitor_event_loop_lag,
+    render as render_prometheus,
+)
+from profiler import DEFAULT_INTERVAL as PROFILER_DEFAULT_INTERVAL, admin_denied_message, check_admin_token, sampler
+from tracing import TracingMiddleware, span, traced, tracer
+from ingest_latency import IngestLatencyTracker
+from memo_render import MemoizedRenderer
+from precompute_scheduler import PrecomputeScheduler
 
 # ==================== FASTAPI SETUP ====================
 
@@ -72,6 +91,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
+app.add_middleware(RequestMetricsMiddleware, service="engine")
 
 # ==================== DATA MODELS ====================
 
@@ -182,17 +203,65 @@ latest_intelligence = {
     "financial_health_score": 100.0,
     "risk_factors": {}
 }
-latest_llm_insights = None
 
 # Thread-safe lock
-state_lock = threading.RLock()  # RLock allows re-entry from same thread (fixes deadlock in update_fallback_state)
+state_lock = InstrumentedLock(threading.RLock(), "state_lock")  # RLock allows re-entry from same thread (fixes deadlock in update_fallback_state)
+
+# Hot-path telemetry, exported on GET /metrics/prometheus
+COMPUTE_DURATION = METRICS.histogram(
+    "fintwitch_engine_compute_duration_seconds", "Derived-state computation latency", ("function",))
+CALLBACK_DURATION = METRICS.histogram(
+    "fintwitch_engine_pathway_callback_duration_seconds", "Pathway subscribe callback latency", ("table",))
+INGESTED_EVENTS = METRICS.counter(
+    "fintwitch_engine_events_ingested_total", "Events ingested into the engine", ("source", "path"))
+
+INGEST_TO_VISIBLE = METRICS.histogram(
+    "fintwitch_engine_ingest_to_visible_seconds", "Time from ingest until an output table reflects the event",
+    ("table",))
+
+def _observe_visible_latency(table, seconds):
+    INGEST_TO_VISIBLE.observe(seconds, table=table)
+
+# Ingest-to-visible latency per output table (reported on /status). Fallback mode only
+# maintains the core metrics, synchronously, so only that table is tracked there.
+transaction_latency = IngestLatencyTracker(
+    ["metrics", "windowed_5min", "windowed_15min", "categories"] if PATHWAY_AVAILABLE else ["metrics"],
+    on_sample=_observe_visible_latency
+)
+external_latency = IngestLatencyTracker(
+    ["external_signals"] if PATHWAY_AVAILABLE else [],
+    on_sample=_observe_visible_latency
+)
 
-# External stream generator
+def _row_field(row, name, index):
+    """Output row column by name (dict rows) or position"""
+    try:
+        return row[name]
+    except (KeyError, TypeError, IndexError):
+        return row[index]
+
+def pathway_callback(table):
+    """Subscribe callback wrapper: latency histogram, and adopts traces handed off to Pathway"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.callback_context(table):
+                return fn(*args, **kwargs)
+        return CALLBACK_DURATION.timed(table=table)(wrapper)
+    return decorator
+
+# External stream generator (EXTERNAL_STREAM_FILE moves its output, e.g. to a temp file for checks)
+EXTERNAL_STREAM_FILE = Path(os.getenv(
+    "EXTERNAL_STREAM_FILE", str(Path(__file__).parent / "data_streams" / "external_events.jsonl")))
 external_stream_generator = None
 external_stream_task = None
 
 # Startup time
 start_time = time.time()
+# The API should serve /metrics this soon after the module starts importing; the LLM
+# provider client loads in the background and does not count against it
+STARTUP_BUDGET_SECONDS = float(os.getenv("ENGINE_STARTUP_BUDGET_SECONDS", "3"))
+startup_timings = {"import_seconds": None, "startup_seconds": None, "ready_seconds": None}
 
 # ==================== REAL PATHWAY STREAMING PIPELINE ====================
 
@@ -209,6 +278,7 @@ if PATHWAY_AVAILABLE:
         category: str
         timestamp: int  # Unix timestamp in milliseconds
         description: str
+        ingested_at: int  # ingest wall time in microseconds (latency tracking)
     
     class ExternalSignalSchema(_SchemaBase):
         event_id: str
@@ -218,6 +288,7 @@ if PATHWAY_AVAILABLE:
         value: float
         description: str
         timestamp: int
+        ingested_at: int
     
     # ===== STREAM INGESTION =====
 
@@ -288,7 +359,8 @@ if PATHWAY_AVAILABLE:
         balance=pw.reducers.sum(enriched_transactions.signed_amount),
         transaction_count=pw.reducers.count(),
         total_amount=pw.reducers.sum(enriched_transactions.amount),
-        largest_transaction=pw.reducers.max(enriched_transactions.amount)
+        largest_transaction=pw.reducers.max(enriched_transactions.amount),
+        last_ingested_at=pw.reducers.max(enriched_transactions.ingested_at)
     )
     
     metrics_enriched = metrics_table.with_columns(
@@ -324,7 +396,8 @@ if PATHWAY_AVAILABLE:
         ),
         recent_transactions=pw.reducers.count(),
         max_transaction=pw.reducers.max(pw.this.amount),
-        min_transaction=pw.reducers.min(pw.this.amount)
+        min_transaction=pw.reducers.min(pw.this.amount),
+        last_ingested_at=pw.reducers.max(pw.this.ingested_at)
     )
     
     # 15-minute window for trend detection
@@ -339,7 +412,8 @@ if PATHWAY_AVAILABLE:
         income_15min=pw.reducers.sum(
             pw.apply_with_type(lambda t, a: a if t == "income" else 0.0, float, pw.this.type, pw.this.amount)
         ),
-        count_15min=pw.reducers.count()
+        count_15min=pw.reducers.count(),
+        last_ingested_at=pw.reducers.max(pw.this.ingested_at)
     )
     
     # ===== CATEGORY AGGREGATIONS =====
@@ -353,7 +427,8 @@ if PATHWAY_AVAILABLE:
             pw.apply_with_type(lambda t, a: a if t == "expense" else 0.0, float, pw.this.type, pw.this.amount)
         ),
         count=pw.reducers.count(),
-        avg_amount=pw.reducers.avg(pw.this.amount)
+        avg_amount=pw.reducers.avg(pw.this.amount),
+        last_ingested_at=pw.reducers.max(pw.this.ingested_at)
     )
     
     category_enriched = category_groups.with_columns(
@@ -373,11 +448,13 @@ if PATHWAY_AVAILABLE:
                 pw.this.impact,
                 pw.this.value
             )
-        )
+        ),
+        last_ingested_at=pw.reducers.max(pw.this.ingested_at)
     )
     
     # ===== OUTPUT HANDLERS =====
     
+    @pathway_callback("metrics_enriched")
     def update_metrics_callback(key, row, time, is_addition):
         """Update core metrics"""
         with state_lock:
@@ -386,8 +463,8 @@ if PATHWAY_AVAILABLE:
                 "total_expenses": float(row[2]),
                 "balance": float(row[3]),
                 "transaction_count": int(row[4]),
-                "average_transaction": float(row[7]),
-                "financial_health_score": float(row[8])
+                "average_transaction": float(row[8]),
+                "financial_health_score": float(row[9])
             })
             latest_advanced_analytics["largest_transaction_amount"] = float(row[6])
             streaming_status["transactions_processed"] = int(row[4])
@@ -396,13 +473,18 @@ if PATHWAY_AVAILABLE:
             compute_predictions()
             compute_intelligence()
             check_real_time_alerts()
+        if is_addition:
+            transaction_latency.observe("metrics", _row_field(row, "last_ingested_at", 7))
     
+    @pathway_callback("windowed_5min")
     def update_windowed_5min_callback(key, row, time, is_addition):
         """Update 5-minute window metrics"""
         with state_lock:
             recent_income = float(row[2])
             recent_expenses = float(row[3])
             recent_count = int(row[4])
+            if is_addition:
+                transaction_latency.observe("windowed_5min", _row_field(row, "last_ingested_at", 7))
             
             # Compute velocity (per minute)
             spending_velocity = recent_expenses / 5.0
@@ -433,10 +515,13 @@ if PATHWAY_AVAILABLE:
                     # Keep only last 5 anomalies
                     latest_advanced_analytics["recent_anomalies"] = latest_advanced_analytics["recent_anomalies"][-5:]
     
+    @pathway_callback("windowed_15min")
     def update_windowed_15min_callback(key, row, time, is_addition):
         """Update 15-minute window for trend detection"""
         with state_lock:
             expenses_15min = float(row[2])
+            if is_addition:
+                transaction_latency.observe("windowed_15min", _row_field(row, "last_ingested_at", 5))
             latest_advanced_analytics["moving_avg_expense_15min"] = expenses_15min
             
             # Trend detection: compare 5min vs 15min averages
@@ -458,6 +543,7 @@ if PATHWAY_AVAILABLE:
             else:
                 latest_advanced_analytics["spending_pattern"] = "normal"
     
+    @pathway_callback("category_enriched")
     def update_categories_callback(key, row, time, is_addition):
         """Update category metrics"""
         category = row[1]
@@ -467,15 +553,20 @@ if PATHWAY_AVAILABLE:
                 "expenses": float(row[3]),
                 "count": int(row[4]),
                 "avg_amount": float(row[5]),
-                "net": float(row[6])
+                "net": float(row[7])
             }
+        if is_addition:
+            transaction_latency.observe("categories", _row_field(row, "last_ingested_at", 6))
     
+    @pathway_callback("external_aggregated")
     def update_external_signals_callback(key, row, time, is_addition):
         """Update external signals aggregation"""
         with state_lock:
             signal_category = row[1]
             event_count = int(row[2])
             total_impact = float(row[3])
+            if is_addition:
+                external_latency.observe("external_signals", _row_field(row, "last_ingested_at", 4))
             
             if signal_category == "market":
                 latest_external_signals["impact_on_spending"] = total_impact
@@ -508,7 +599,7 @@ if PATHWAY_AVAILABLE:
         finally:
             PATHWAY_RUNNING = False
     
-    pathway_thread = threading.Thread(target=run_pathway_computation, daemon=True)
+    pathway_thread = threading.Thread(target=run_pathway_computation, name="pathway", daemon=True)
     pathway_thread.start()
     print("OK Enhanced Pathway streaming pipeline started")
     
@@ -519,6 +610,8 @@ if PATHWAY_AVAILABLE:
 transaction_history = []
 external_signal_history = []
 
+@COMPUTE_DURATION.timed(function="update_fallback_state")
+@traced("recompute:update_fallback_state")
 def update_fallback_state():
     """Fallback in-memory computation"""
     with state_lock:
@@ -549,9 +642,13 @@ def update_fallback_state():
         compute_predictions()
         compute_intelligence()
         check_real_time_alerts()
+        
+        transaction_latency.observe("metrics", transaction_history[-1].get("ingested_at"))
 
 # ==================== PREDICTIVE ANALYTICS ====================
 
+@COMPUTE_DURATION.timed(function="compute_predictions")
+@traced("recompute:compute_predictions")
 def compute_predictions():
     """Compute forward-looking financial predictions"""
     with state_lock:
@@ -604,6 +701,8 @@ def compute_predictions():
 
 # ==================== MULTI-SOURCE DATA FUSION ====================
 
+@COMPUTE_DURATION.timed(function="compute_fusion_metrics")
+@traced("recompute:compute_fusion_metrics")
 def compute_fusion_metrics():
     """Fuse user data + external signals for overall risk assessment"""
     with state_lock:
@@ -656,20 +755,17 @@ def compute_fusion_metrics():
             latest_fusion_metrics["recommended_action"] = "monitor_closely"
         else:
             latest_fusion_metrics["recommended_action"] = "maintain_current_habits"
+    precompute_scheduler.notify()
 
 # ==================== REAL-TIME ALERT SYSTEM ====================
 
-def check_real_time_alerts():
-    """Generate immediate alerts based on live conditions"""
+def _render_alerts(balance, velocity, trend, days_until_zero, recommended_daily_budget,
+                   projected_monthly_deficit, market_sentiment):
+    """Alerts for one set of live conditions; triggered_at is when they last changed"""
     critical = []
     warnings = []
     opportunities = []
     
-    balance = latest_metrics["balance"]
-    velocity = latest_advanced_analytics.get("spending_velocity", 0)
-    trend = latest_advanced_analytics.get("trend", "stable")
-    days_until_zero = latest_predictions.get("days_until_zero_balance")
-    
     # CRITICAL ALERTS
     if balance < 0:
         critical.append({
@@ -684,7 +780,7 @@ def check_real_time_alerts():
             "level": "CRITICAL",
             "title": "Balance Depletion Warning",
             "message": f"Current spending will deplete your balance in {days_until_zero} days",
-            "action": "Reduce daily spending to Rupee " + str(latest_predictions.get("recommended_daily_budget", 0))
+            "action": "Reduce daily spending to Rupee " + str(recommended_daily_budget)
         })
     
     # WARNING ALERTS
@@ -704,11 +800,11 @@ def check_real_time_alerts():
             "action": "Review recent transactions and identify non-essentials"
         })
     
-    if latest_predictions.get("projected_monthly_deficit", 0) > 0:
+    if projected_monthly_deficit > 0:
         warnings.append({
             "level": "WARNING",
             "title": "Projected Monthly Deficit",
-            "message": f"Projected shortage: Rupee {latest_predictions['projected_monthly_deficit']:.2f}",
+            "message": f"Projected shortage: Rupee {projected_monthly_deficit:.2f}",
             "action": "Adjust spending plan for remainder of month"
         })
     
@@ -721,7 +817,6 @@ def check_real_time_alerts():
             "action": "Consider moving excess to savings or investments"
         })
     
-    market_sentiment = latest_external_signals.get("market_sentiment", 0.5)
     if market_sentiment > 0.7 and balance > 5000:
         opportunities.append({
             "level": "OPPORTUNITY",
@@ -730,20 +825,38 @@ def check_real_time_alerts():
             "action": "Good time to consider investment opportunities"
         })
     
+    return {
+        "critical": critical,
+        "warnings": warnings,
+        "opportunities": opportunities,
+        "triggered_at": datetime.now().isoformat()
+    }
+
+alerts_view = MemoizedRenderer("alerts", _render_alerts)
+
+@COMPUTE_DURATION.timed(function="check_real_time_alerts")
+@traced("recompute:check_real_time_alerts")
+def check_real_time_alerts():
+    """Generate immediate alerts based on live conditions (re-rendered only when they change)"""
     with state_lock:
-        latest_alerts.update({
-            "critical": critical,
-            "warnings": warnings,
-            "opportunities": opportunities,
-            "triggered_at": datetime.now().isoformat()
-        })
+        alerts, changed = alerts_view.render((
+            latest_metrics["balance"],
+            latest_advanced_analytics.get("spending_velocity", 0),
+            latest_advanced_analytics.get("trend", "stable"),
+            latest_predictions.get("days_until_zero_balance"),
+            latest_predictions.get("recommended_daily_budget", 0),
+            latest_predictions.get("projected_monthly_deficit", 0),
+            latest_external_signals.get("market_sentiment", 0.5),
+        ))
+        if changed:
+            latest_alerts.update(alerts)
+    # Runs after every intelligence / predictions recompute, so risk changes are seen here too
+    precompute_scheduler.notify()
 
 # ==================== INTELLIGENCE COMPUTATION ====================
 
-def compute_intelligence():
-    """Compute financial intelligence rules"""
-    metrics = latest_metrics.copy()
-    
+def _render_intelligence(balance, income, expenses, health_score):
+    """Rules intelligence for one set of core metrics"""
     alerts = []
     warnings = []
     insights = []
@@ -756,10 +869,6 @@ def compute_intelligence():
         "insufficient_emergency_fund": False
     }
     
-    balance = metrics['balance']
-    income = metrics['total_income']
-    expenses = metrics['total_expenses']
-    
     # Apply rules
     abs_expenses = abs(expenses)
     if abs_expenses > income and income > 0:
@@ -776,7 +885,6 @@ def compute_intelligence():
         risk_factors['low_balance'] = True
         recommendations.append("Build emergency fund to \u20b9 15,000 minimum")
     
-    health_score = metrics['financial_health_score']
     if health_score < 30:
         insights.append("\U0001f534 Financial health is in critical range")
     elif health_score < 60:
@@ -794,36 +902,50 @@ def compute_intelligence():
     else:
         risk_level = "LOW"
     
+    return {
+        "alerts": alerts,
+        "warnings": warnings,
+        "insights": insights,
+        "recommendations": recommendations,
+        "risk_level": risk_level,
+        "financial_health_score": health_score,
+        "risk_factors": risk_factors
+    }
+
+intelligence_view = MemoizedRenderer("intelligence", _render_intelligence)
+
+@COMPUTE_DURATION.timed(function="compute_intelligence")
+@traced("recompute:compute_intelligence")
+def compute_intelligence():
+    """Compute financial intelligence rules (re-rendered only when the core metrics change)"""
     with state_lock:
-        latest_intelligence.update({
-            "alerts": alerts,
-            "warnings": warnings,
-            "insights": insights,
-            "recommendations": recommendations,
-            "risk_level": risk_level,
-            "financial_health_score": health_score,
-            "risk_factors": risk_factors
-        })
+        intelligence, changed = intelligence_view.render((
+            latest_metrics["balance"],
+            latest_metrics["total_income"],
+            latest_metrics["total_expenses"],
+            latest_metrics["financial_health_score"],
+        ))
+        if changed:
+            latest_intelligence.update(intelligence)
 
 # ==================== LLM INTEGRATION (Using Processed Analytics) ====================
 
-async def generate_llm_insights_async():
-    """Generate LLM insights from PROCESSED ANALYTICS (not raw transactions)"""
-    llm = get_llm_service()
-    
-    # Gather processed analytics context (no lock needed for reads of dicts in CPython)
-    context = {
-        "core_metrics": dict(latest_metrics),
-        "advanced_analytics": dict(latest_advanced_analytics),
-        "predictions": dict(latest_predictions),
-        "external_signals": dict(latest_external_signals),
-        "fusion_metrics": dict(latest_fusion_metrics),
-        "categories": dict(latest_categories),
-        "intelligence": dict(latest_intelligence)
-    }
-    
-    # The LLM receives structured analytics, NOT raw transaction lists
-    insights = await llm.generate_financial_insights(
+def gather_llm_context():
+    """Snapshot of the processed analytics the LLM sees (never raw transactions)"""
+    with state_lock:
+        return {
+            "core_metrics": dict(latest_metrics),
+            "advanced_analytics": dict(latest_advanced_analytics),
+            "predictions": dict(latest_predictions),
+            "external_signals": dict(latest_external_signals),
+            "fusion_metrics": dict(latest_fusion_metrics),
+            "categories": dict(latest_categories),
+            "intelligence": dict(latest_intelligence)
+        }
+
+def llm_inputs(context):
+    """Positional arguments for LLMService generation / cache lookups"""
+    return (
         context["core_metrics"],
         context["intelligence"],
         context["categories"],
@@ -832,93 +954,135 @@ async def generate_llm_insights_async():
         context["external_signals"],
         context["fusion_metrics"]
     )
+
+def enhance_insights(insights, context):
+    """Add live analytics lines to (a copy of) insights; cached insights are never mutated"""
+    if not insights or "insights" not in insights:
+        return insights
+    insights = dict(insights, insights=list(insights["insights"]))
     
-    # Enhance with advanced context
-    if insights and "insights" in insights:
-        # Add context about advanced analytics
-        if context["advanced_analytics"].get("trend") == "rising":
-            insights["insights"].append(
-                f"\U0001f4c8 Trend Analysis: Spending is {context['advanced_analytics']['trend']} - "
-                f"velocity \u20b9{context['advanced_analytics']['spending_velocity']:.2f}/min"
-            )
+    # Add context about advanced analytics
+    if context["advanced_analytics"].get("trend") == "rising":
+        insights["insights"].append(
+            f"\U0001f4c8 Trend Analysis: Spending is {context['advanced_analytics']['trend']} - "
+            f"velocity \u20b9{context['advanced_analytics']['spending_velocity']:.2f}/min"
+        )
+    
+    if context["predictions"].get("days_until_zero_balance"):
+        insights["insights"].append(
+            f"\u23f1\ufe0f Projection: At current rate, balance depletes in "
+            f"{context['predictions']['days_until_zero_balance']} days"
+        )
+    
+    if context["fusion_metrics"].get("overall_financial_risk", 0) > 50:
+        insights["insights"].append(
+            f"\u26a1 Market-Adjusted Risk: {context['fusion_metrics']['overall_financial_risk']:.0f}/100 "
+            f"(including external factors)"
+        )
+    return insights
+
+def precompute_signature():
+    """The fields whose changes make insights worth regenerating before anyone asks"""
+    with state_lock:
+        return {
+            "risk_level": latest_intelligence.get("risk_level"),
+            "critical": frozenset(alert["title"] for alert in latest_alerts.get("critical", [])),
+            "action": latest_fusion_metrics.get("recommended_action"),
+        }
+
+def precompute_llm_insights():
+    """Warm the insight cache for the current analytics; False if it was already warm"""
+    return get_llm_service().precompute(*llm_inputs(gather_llm_context())) is not None
+
+def llm_pool_busy():
+    stats = get_llm_service().generation_stats()
+    return stats["running"] >= stats["max_concurrency"]
+
+# Material changes (risk level, critical alerts, fused action) refresh insights in the background
+precompute_scheduler = PrecomputeScheduler(precompute_signature, precompute_llm_insights, llm_pool_busy)
+
+async def generate_llm_insights_async(context=None, use_cache=True):
+    """Generate LLM insights from PROCESSED ANALYTICS (not raw transactions)"""
+    llm = get_llm_service()
+    context = context or gather_llm_context()
+    
+    # The LLM receives structured analytics, NOT raw transaction lists
+    insights = await llm.generate_financial_insights(*llm_inputs(context), use_cache=use_cache)
+    return enhance_insights(insights, context)
+
+# ==================== EXTERNAL STREAM INTEGRATION ====================
+
+def ingest_external_signal(event):
+    """Apply one external signal to the fused state and push it into the Pathway pipeline"""
+    # Update external signals state
+    with state_lock:
+        if "sentiment" in event:
+            latest_external_signals["market_sentiment"] = event["sentiment"]
+        if "volatility" in event:
+            latest_external_signals["market_volatility"] = event["volatility"]
+        if "interest_rate" in event:
+            latest_external_signals["interest_rate"] = event["interest_rate"]
+        if "inflation_rate" in event:
+            latest_external_signals["inflation_rate"] = event["inflation_rate"]
         
-        if context["predictions"].get("days_until_zero_balance"):
-            insights["insights"].append(
-                f"\u23f1\ufe0f Projection: At current rate, balance depletes in "
-                f"{context['predictions']['days_until_zero_balance']} days"
-            )
+        # Keep recent events (last 10)
+        latest_external_signals["recent_events"].append({
+            "time": event.get("timestamp"),
+            "category": event.get("category"),
+            "description": event.get("description", "")[:100]
+        })
+        latest_external_signals["recent_events"] = latest_external_signals["recent_events"][-10:]
+    
+    # Ingest into Pathway if available
+    if PATHWAY_AVAILABLE:
+        timestamp_ms = int(datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00')).timestamp() * 1000)
         
-        if context["fusion_metrics"].get("overall_financial_risk", 0) > 50:
-            insights["insights"].append(
-                f"\u26a1 Market-Adjusted Risk: {context['fusion_metrics']['overall_financial_risk']:.0f}/100 "
-                f"(including external factors)"
+        with span("external_signal_subject.put"):
+            external_signal_subject.put(
+                event_id=event.get('id', f"ext_{int(time.time()*1000)}"),
+                category=event.get('category', 'unknown'),
+                event_type=event.get('event_type', 'update'),
+                impact=event.get('impact', 'neutral'),
+                value=float(event.get('value', 0)),
+                description=event.get('description', ''),
+                timestamp=timestamp_ms,
+                ingested_at=external_latency.stamp()
             )
+        tracer.hand_off()
     
-    global latest_llm_insights
-    latest_llm_insights = insights
-    return insights
+    INGESTED_EXTERNAL.inc()
+    with state_lock:
+        streaming_status["events_processed"] += 1
 
-# ==================== EXTERNAL STREAM INTEGRATION ====================
+def poll_external_stream_once(stream_file, processed_lines):
+    """Ingest lines appended to the stream file since processed_lines; returns the new count"""
+    if not stream_file.exists():
+        return processed_lines
+    
+    with open(stream_file, 'r') as f:
+        lines = f.readlines()
+    
+    # Process new lines
+    for line in lines[processed_lines:]:
+        try:
+            ingest_external_signal(json.loads(line.strip()))
+            processed_lines += 1
+            
+        except Exception as e:
+            print(f"Error processing external event: {e}")
+            continue
+    
+    return processed_lines
 
 async def poll_external_stream():
     """Poll external event stream file and ingest into Pathway"""
-    stream_file = Path(__file__).parent / "data_streams" / "external_events.jsonl"
+    stream_file = EXTERNAL_STREAM_FILE
     processed_lines = 0
     
     while True:
         try:
             await asyncio.sleep(5)  # Poll every 5 seconds
-            
-            if not stream_file.exists():
-                continue
-            
-            with open(stream_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Process new lines
-            for line in lines[processed_lines:]:
-                try:
-                    event = json.loads(line.strip())
-                    
-                    # Update external signals state
-                    with state_lock:
-                        if "sentiment" in event:
-                            latest_external_signals["market_sentiment"] = event["sentiment"]
-                        if "volatility" in event:
-                            latest_external_signals["market_volatility"] = event["volatility"]
-                        if "interest_rate" in event:
-                            latest_external_signals["interest_rate"] = event["interest_rate"]
-                        if "inflation_rate" in event:
-                            latest_external_signals["inflation_rate"] = event["inflation_rate"]
-                        
-                        # Keep recent events (last 10)
-                        latest_external_signals["recent_events"].append({
-                            "time": event.get("timestamp"),
-                            "category": event.get("category"),
-                            "description": event.get("description", "")[:100]
-                        })
-                        latest_external_signals["recent_events"] = latest_external_signals["recent_events"][-10:]
-                    
-                    # Ingest into Pathway if available
-                    if PATHWAY_AVAILABLE:
-                        timestamp_ms = int(datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00')).timestamp() * 1000)
-                        
-                        external_signal_subject.put(
-                            event_id=event.get('id', f"ext_{int(time.time()*1000)}"),
-                            category=event.get('category', 'unknown'),
-                            event_type=event.get('event_type', 'update'),
-                            impact=event.get('impact', 'neutral'),
-                            value=float(event.get('value', 0)),
-                            description=event.get('description', ''),
-                            timestamp=timestamp_ms
-                        )
-                    
-                    processed_lines += 1
-                    streaming_status["events_processed"] += 1
-                    
-                except Exception as e:
-                    print(f"Error processing external event: {e}")
-                    continue
+            processed_lines = poll_external_stream_once(stream_file, processed_lines)
         
         except Exception as e:
             print(f"Error polling external stream: {e}")
@@ -926,43 +1090,68 @@ async def poll_external_stream():
 
 # ==================== API ENDPOINTS ====================
 
-@app.post("/ingest")
-async def ingest_transaction(event: TransactionEvent):
-    """Ingest user transaction into Pathway stream"""
-    
-    if event.timestamp:
+INGESTED_PATHWAY = INGESTED_EVENTS.labels(source="transaction", path="pathway")
+INGESTED_FALLBACK = INGESTED_EVENTS.labels(source="transaction", path="fallback")
+INGESTED_EXTERNAL = INGESTED_EVENTS.labels(source="external_signal", path="state")
+
+@traced("ingest")
+def ingest_transaction_record(event_type, amount, category, timestamp=None, description="", event_id=None, refresh=True):
+    """
+    Push one transaction into the Pathway pipeline (or fallback state). Returns the event id.
+    refresh=False skips the fallback recompute so a batch can run it once at the end.
+    """
+    if timestamp:
         try:
-            dt = datetime.fromisoformat(event.timestamp.replace('Z', '+00:00'))
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
             timestamp_ms = int(dt.timestamp() * 1000)
         except:
             timestamp_ms = int(datetime.now().timestamp() * 1000)
     else:
         timestamp_ms = int(datetime.now().timestamp() * 1000)
     
-    event_id = event.id or f"txn_{timestamp_ms}_{event.amount}"
+    event_id = event_id or f"txn_{timestamp_ms}_{amount}"
     
     transaction = {
         "event_id": event_id,
-        "type": event.type,
-        "amount": event.amount,
-        "category": event.category,
+        "type": event_type,
+        "amount": amount,
+        "category": category,
         "timestamp": timestamp_ms,
-        "description": event.description
+        "description": description,
+        "ingested_at": transaction_latency.stamp()
     }
     
     if PATHWAY_AVAILABLE and PATHWAY_RUNNING:
         try:
-            transaction_subject.put(**transaction)
+            with span("transaction_subject.put"):
+                transaction_subject.put(**transaction)
+            tracer.hand_off()
+            INGESTED_PATHWAY.inc()
         except Exception as e:
             # If Pathway put fails, fall through to in-memory fallback
             print(f"Pathway put failed, using fallback: {e}")
-            transaction_history.append(transaction)
-            update_fallback_state()
+            _ingest_fallback(transaction, refresh)
     else:
+        _ingest_fallback(transaction, refresh)
+    
+    with state_lock:
+        streaming_status["events_processed"] += 1
+    return event_id
+
+def _ingest_fallback(transaction, refresh):
+    INGESTED_FALLBACK.inc()
+    with span("fallback.append"):
         transaction_history.append(transaction)
+    if refresh:
         update_fallback_state()
-    
-    streaming_status["events_processed"] += 1
+
+@app.post("/ingest")
+async def ingest_transaction(event: TransactionEvent):
+    """Ingest user transaction into Pathway stream"""
+    event_id = ingest_transaction_record(
+        event.type, event.amount, event.category,
+        timestamp=event.timestamp, description=event.description, event_id=event.id
+    )
     
     return {
         "status": "success",
@@ -970,6 +1159,46 @@ async def ingest_transaction(event: TransactionEvent):
         "transaction_id": event_id
     }
 
+@app.post("/ingest/batch")
+async def ingest_transaction_batch(events: List[TransactionEvent]):
+    """Ingest a batch of transactions; fallback metrics are recomputed once per batch"""
+    history_before = len(transaction_history)
+    event_ids = [
+        ingest_transaction_record(
+            event.type, event.amount, event.category,
+            timestamp=event.timestamp, description=event.description, event_id=event.id,
+            refresh=False
+        )
+        for event in events
+    ]
+    if len(transaction_history) != history_before:
+        update_fallback_state()
+    
+    return {
+        "status": "success",
+        "message": f"{len(event_ids)} transactions ingested into multi-source Pathway pipeline",
+        "transaction_ids": event_ids
+    }
+
+@app.post("/ingest/external")
+async def ingest_external_batch(events: List[Dict[str, Any]]):
+    """Ingest external signals directly (same path as the external_events.jsonl poller)"""
+    errors = []
+    for index, event in enumerate(events):
+        try:
+            ingest_external_signal(event)
+        except Exception as e:
+            errors.append({"index": index, "error": str(e)})
+    
+    return JSONResponse(
+        status_code=207 if errors else 200,
+        content={
+            "status": "partial" if errors else "success",
+            "ingested": len(events) - len(errors),
+            "errors": errors
+        }
+    )
+
 @app.get("/metrics")
 def get_metrics():
     """Get real-time core financial metrics"""
@@ -1063,38 +1292,30 @@ def get_external_signals():
 
 @app.get("/alerts")
 def get_real_time_alerts():
-    """Get real-time decision assistance alerts (always refreshed)"""
+    """Get real-time decision assistance alerts (checked on every read, cached bytes if unchanged)"""
     check_real_time_alerts()
-    with state_lock:
-        return latest_alerts.copy()
+    return Response(content=alerts_view.json_bytes(), media_type="application/json")
 
 @app.get("/intelligence")
 def get_intelligence():
     """Get financial intelligence (rules-based)"""
+    if intelligence_view.version:
+        return Response(content=intelligence_view.json_bytes(), media_type="application/json")
     with state_lock:
         return latest_intelligence.copy()
 
 @app.get("/insights/llm")
 async def get_llm_insights():
     """Get LLM insights powered by processed analytics"""
-    global latest_llm_insights
-    
-    # Always return immediately with cached or mock data - NEVER block
-    if latest_llm_insights and 'generated_at' in latest_llm_insights:
-        try:
-            generated = datetime.fromisoformat(latest_llm_insights['generated_at'])
-            age = (datetime.now() - generated).total_seconds()
-            if age < 120:  # Cache for 2 minutes
-                return latest_llm_insights
-        except:
-            pass
+    context = gather_llm_context()
     
-    # Schedule LLM generation in background (fire-and-forget)
-    # Don't await it - let it complete on its own
-    try:
-        asyncio.ensure_future(_safe_llm_generation())
-    except Exception:
-        pass
+    # Materially identical analytics reuse cached insights without a provider call. Otherwise
+    # one coalesced background refresh runs while the last good insight is served (stale).
+    insights, freshness = get_llm_service().get_insights_swr(*llm_inputs(context))
+    if insights is not None:
+        insights = enhance_insights(insights, context)
+        insights["cache"] = freshness
+        return insights
     
     # Return mock/placeholder insights immediately
     return {
@@ -1113,17 +1334,26 @@ async def get_llm_insights():
         "provider": "initializing"
     }
 
-async def _safe_llm_generation():
-    """Safely generate LLM insights without blocking the event loop"""
-    global latest_llm_insights
-    try:
-        insights = await asyncio.wait_for(generate_llm_insights_async(), timeout=10.0)
-        if insights:
-            latest_llm_insights = insights
-    except asyncio.TimeoutError:
-        print("INFO: Background LLM generation timed out")
-    except Exception as e:
-        print(f"INFO: Background LLM generation failed: {e}")
+@app.get("/insights/llm/stream")
+async def stream_llm_insights():
+    """
+    Server-Sent Events stream of LLM insights as the provider writes them:
+    event: delta (summary / risk_analysis text), event: recommendation (one per bullet),
+    then event: done with the final insights (replaces anything rendered from the partials)
+    """
+    context = gather_llm_context()
+    
+    async def generate():
+        async for event in get_llm_service().stream_financial_insights(*llm_inputs(context)):
+            if event["type"] == "done":
+                event = dict(event, insights=enhance_insights(event["insights"], context))
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/status")
 def get_streaming_status():
@@ -1136,7 +1366,100 @@ def get_streaming_status():
         # PATHWAY_RUNNING is unreliable because pw.run() in Pathway 0.29+ uses AFC
         # (Adaptive Flow Control) and may not block the thread permanently.
         status["pipeline_health"] = "operational" if PATHWAY_AVAILABLE else "fallback"
-        return status
+    # Percentiles over recent events, per output table; backlog = ingested but not yet visible
+    status["ingest_latency"] = {**transaction_latency.stats(), **external_latency.stats()}
+    status["llm_cache"] = get_llm_service().cache.stats()
+    status["llm_generation"] = get_llm_service().generation_stats()
+    status["llm_usage"] = dict(get_llm_service().usage.stats(), last_prompt=get_llm_service().prompt_builder.last_stats)
+    status["llm_providers"] = get_llm_service().provider_stats()
+    status["llm_batch"] = get_llm_service().batch_stats()
+    status["llm_precompute"] = precompute_scheduler.stats()
+    # Memoized rule-based views: version = renders (inputs changed), hits = reused renders
+    status["rule_views"] = {
+        "alerts": alerts_view.stats(),
+        "intelligence": intelligence_view.stats(),
+        "fallback_insights": get_llm_service().fallback_view.stats(),
+    }
+    status["startup"] = dict(startup_timings, budget_seconds=STARTUP_BUDGET_SECONDS,
+                             llm=get_llm_service().loading_stats())
+    return status
+
+# streaming_status counters are read at scrape time; they only change under state_lock
+for _key in ("events_processed", "transactions_processed", "external_signals_processed"):
+    METRICS.counter(f"fintwitch_engine_{_key}_total", f"streaming_status {_key}").set_function(
+        lambda key=_key: streaming_status[key])
+METRICS.gauge("fintwitch_engine_fallback_history_size", "Transactions held in fallback state").set_function(
+    lambda: len(transaction_history))
+METRICS.gauge("fintwitch_engine_uptime_seconds", "Engine uptime").set_function(lambda: time.time() - start_time)
+_STARTUP_SECONDS = METRICS.gauge(
+    "fintwitch_engine_startup_seconds",
+    "Engine start phases: import (module load), startup (startup hook), ready (import start to serving)",
+    ("phase",))
+for _phase in ("import", "startup", "ready"):
+    _STARTUP_SECONDS.set_function(lambda phase=_phase: startup_timings[f"{phase}_seconds"] or 0, phase=_phase)
+METRICS.gauge("fintwitch_llm_load_seconds", "Time to import the LLM provider SDK and create its client").set_function(
+    lambda: get_llm_service().load_seconds or 0)
+
+@app.get("/metrics/prometheus")
+def get_prometheus_metrics():
+    """Prometheus metrics: hot-path latency histograms, lock wait, event-loop lag, counters"""
+    return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+# ==================== ADMIN: PROFILING AND TRACING ====================
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(default=None)):
+    if not check_admin_token(x_admin_token, request.client.host if request.client else None):
+        raise HTTPException(status_code=403, detail=admin_denied_message())
+
+class ProfilingSettings(BaseModel):
+    """Runtime profiling toggles; omitted fields keep their current state"""
+    sampling: Optional[bool] = None
+    tracing: Optional[bool] = None
+    interval_ms: float = PROFILER_DEFAULT_INTERVAL * 1000
+    duration_seconds: Optional[float] = None  # default and cap: PROFILER_MAX_DURATION_SECONDS
+    threads: Optional[List[str]] = None  # thread name substrings, e.g. ["MainThread", "pathway"]
+
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+def get_profiling_status():
+    """Sampling profiler and tracing status"""
+    return {"sampling": sampler.stats(), "tracing": tracer.stats()}
+
+@app.post("/admin/profiling", dependencies=[Depends(require_admin)])
+def set_profiling(settings: ProfilingSettings):
+    """Start/stop the stack sampler and per-request tracing at runtime"""
+    if settings.sampling is True:
+        try:
+            sampler.start(
+                interval=settings.interval_ms / 1000,
+                duration=settings.duration_seconds,
+                threads=settings.threads,
+            )
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid profiling settings: {e}")
+    elif settings.sampling is False:
+        sampler.stop()
+    if settings.tracing is True:
+        tracer.enable()
+    elif settings.tracing is False:
+        tracer.disable()
+    return get_profiling_status()
+
+@app.get("/admin/profiling/flamegraph", dependencies=[Depends(require_admin)])
+def get_flamegraph():
+    """Sampled stacks in folded format (flamegraph.pl, speedscope, inferno)"""
+    return Response(content=sampler.folded(), media_type="text/plain")
+
+@app.get("/admin/traces", dependencies=[Depends(require_admin)])
+def get_traces(limit: int = Query(default=50, ge=1, le=500)):
+    """Most recent request traces, newest first"""
+    return {"traces": tracer.recent(limit), **tracer.stats()}
+
+@app.get("/admin/traces/{trace_id}", dependencies=[Depends(require_admin)])
+def get_trace(trace_id: str):
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (expired or tracing disabled)")
+    return trace.to_dict()
 
 @app.get("/")
 def root():
@@ -1159,18 +1482,57 @@ def root():
         "events_processed": streaming_status["events_processed"]
     }
 
+# ==================== IN-PROCESS BUDGET API ====================
+# The budget API (budget_system) can be served from this process so budget changes
+# share state and the event loop with the engine instead of crossing to port 5001.
+
+MOUNT_BUDGET_API = os.getenv("MOUNT_BUDGET_API", "true").lower() == "true"
+# Off by default: the frontend already sends its own transactions to /ingest
+BUDGET_FEED_PIPELINE = os.getenv("BUDGET_FEED_PIPELINE", "false").lower() == "true"
+BUDGET_API_MOUNTED = False
+
+def feed_budget_transaction(user_id, transaction):
+    """budget_system listener: ingest a committed budget transaction into the pipeline"""
+    ingest_transaction_record(
+        transaction["type"],
+        transaction["amount"],
+        transaction.get("category") or "Income allocation",
+        timestamp=transaction.get("timestamp"),
+        description=transaction.get("description", ""),
+        event_id=transaction.get("id")
+    )
+
+if MOUNT_BUDGET_API:
+    try:
+        import budget_system
+        from budget_api import router as budget_router
+        app.include_router(budget_router)
+        BUDGET_API_MOUNTED = True
+        if BUDGET_FEED_PIPELINE:
+            budget_system.transaction_listeners.append(feed_budget_transaction)
+        streaming_status["active_data_sources"].append("budget_api")
+        print(f"OK Budget API mounted at /budget (feed pipeline: {BUDGET_FEED_PIPELINE})")
+    except ImportError as e:
+        print(f"INFO: Budget API not mounted ({e}) - run budget_system.py on port 5001 instead")
+
 # ==================== STARTUP ====================
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize enhanced streaming engine"""
+    startup_started = time.perf_counter()
+    # Provider SDK import and client setup run on a background thread
+    llm = get_llm_service()
+    llm.start_loading().add_done_callback(
+        lambda _: print(f"OK LLM provider ready: {llm.provider} (loaded in {llm.load_seconds:.2f}s)"))
     print("\n" + "="*80)
     print("? FINTWITCH ENHANCED PATHWAY INTELLIGENCE ENGINE - HACKATHON EDITION")
     print("="*80)
     print(f"+ Engine: {'REAL Pathway Streaming' if PATHWAY_AVAILABLE else 'Fallback Mode'}")
     if PATHWAY_AVAILABLE:
         print(f"+ Pathway Version: {pw.__version__}")
-    print(f"+ LLM Provider: {get_llm_service().provider}")
+    print(f"+ LLM Provider: {' -> '.join(llm.loading_stats()['chain']) or llm.provider} "
+          f"({llm.loading_stats()['state']})")
     print(f"+ Multi-source ingestion: ENABLED")
     print(f"+ Advanced analytics: ENABLED")
     print(f"+ Predictive insights: ENABLED")
@@ -1179,6 +1541,7 @@ async def startup_event():
         print(f"   * {source}")
     print("\n? Enhanced Endpoints:")
     print("  ? POST /ingest                - Ingest transactions")
+    print("  ? POST /ingest/batch          - Ingest a batch of transactions")
     print("  ? GET  /metrics               - Core metrics")
     print("  ? GET  /metrics/advanced      - Advanced analytics")
     print("  ? GET  /metrics/predictions   - Predictive insights")
@@ -1186,12 +1549,19 @@ async def startup_event():
     print("  ? GET  /external-signals      - External data state")
     print("  ? GET  /alerts                - Real-time alerts")
     print("  ? GET  /insights/llm          - LLM insights")
+    print("  ? GET  /insights/llm/stream   - LLM insights as they stream (SSE)")
     print("  ? GET  /status                - Streaming status")
+    print("  ? GET  /metrics/prometheus    - Prometheus metrics")
+    print("  ? POST /admin/profiling       - Toggle stack sampling / request tracing")
+    if BUDGET_API_MOUNTED:
+        print("  ? *    /budget/...            - Budget API (in-process)")
     print("="*80)
     
     # Start external stream generator
     global external_stream_generator, external_stream_task
-    external_stream_generator = ExternalDataStreamGenerator()
+    # SIM_CLOCK_SPEED / SIM_CLOCK_START / SIM_SEED accelerate and seed the signal stream
+    external_stream_generator = ExternalDataStreamGenerator(
+        stream_file=str(EXTERNAL_STREAM_FILE), clock=SimulatedClock.from_env(), seed=seed_from_env())
     
     # Start generator in background
     async def run_generator():
@@ -1204,6 +1574,9 @@ async def startup_event():
 
     # Bootstrap alert state immediately so triggered_at is never None
     check_real_time_alerts()
+    
+    # Background insight refreshes on material state changes (baseline = the state right now)
+    precompute_scheduler.start()
 
     # Periodic alert refresh every 10 seconds
     async def periodic_alert_refresh():
@@ -1213,6 +1586,9 @@ async def startup_event():
 
     asyncio.create_task(periodic_alert_refresh())
 
+    # Event-loop lag shows when sync work (lock waits, recomputes) blocks the loop
+    asyncio.create_task(monitor_event_loop_lag("engine"))
+
     # Always mark engine as active (fallback mode still serves all endpoints)
     streaming_status["engine_active"] = True
     if not PATHWAY_AVAILABLE:
@@ -1224,13 +1600,30 @@ async def startup_event():
         streaming_status["pipeline_health"] = "operational"
         print("[Pathway] Pipeline is running (started at module load)")
     
-    print("\nOK HACKATHON-READY PATHWAY SYSTEM OPERATIONAL\n")
+    ready = time.perf_counter()
+    startup_timings["startup_seconds"] = round(ready - startup_started, 4)
+    startup_timings["ready_seconds"] = round(ready - _import_started, 4)
+    print(f"\nOK HACKATHON-READY PATHWAY SYSTEM OPERATIONAL "
+          f"(import {startup_timings['import_seconds']:.2f}s, startup {startup_timings['startup_seconds']:.2f}s)\n")
+    if startup_timings["ready_seconds"] > STARTUP_BUDGET_SECONDS:
+        print(f"WARN: engine took {startup_timings['ready_seconds']:.2f}s to become ready "
+              f"(budget {STARTUP_BUDGET_SECONDS:g}s)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background insight refreshes and close pooled LLM provider connections"""
+    precompute_scheduler.stop()
+    await get_llm_service().aclose()
+
+startup_timings["import_seconds"] = round(time.perf_counter() - _import_started, 4)
 
 # ==================== RUN ====================
 
 if __name__ == "__main__":
+    # The app object, not "pathway_streaming_enhanced:app": an import string would load
+    # (and time, and start the pipeline of) this module a second time
     uvicorn.run(
-        "pathway_streaming_enhanced:app",
+        app,
         host="0.0.0.0",
         port=8000,
         reload=False
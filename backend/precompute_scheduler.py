@@ -0,0 +1,188 @@
+"""
+Insight Precompute Scheduler for FinTwitch
+==========================================
+LLM insights are generated on demand, so the first read after the analytics change
+materially waits on (or is served stale while) a provider call. The PrecomputeScheduler
+watches the few fields that make a change material and starts that generation in the
+background as soon as the state settles, so the next read is a cache hit.
+
+The engine calls notify() after every recompute (from any thread). It compares a
+signature of the live state (risk level, titles of critical alerts, fused recommended
+action) with the last one it saw and ranks the change:
+
+    high      risk level rose, or a new critical alert appeared
+    medium    the fused recommended action changed
+    low       risk level fell, or critical alerts cleared
+
+Refreshes are debounced (trailing): while one is pending, every recompute (material or
+not, the state has not settled) pushes it back, by less the more material the pending
+change is (LLM_PRECOMPUTE_DEBOUNCE_SECONDS x 1/4, 1/2, 1), but never past
+LLM_PRECOMPUTE_MAX_DELAY_SECONDS after the first material change. Medium and low refreshes
+also wait while every generation slot is busy serving reads. When the refresh fires,
+refresh_fn warms the cache for the current state (a no-op if it is already cached or
+being generated). LLM_PRECOMPUTE=false turns the scheduler off.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from telemetry import REGISTRY
+
+LLM_PRECOMPUTE = os.getenv("LLM_PRECOMPUTE", "true").lower() == "true"
+LLM_PRECOMPUTE_DEBOUNCE_SECONDS = float(os.getenv("LLM_PRECOMPUTE_DEBOUNCE_SECONDS", "2.0"))
+LLM_PRECOMPUTE_MAX_DELAY_SECONDS = float(os.getenv("LLM_PRECOMPUTE_MAX_DELAY_SECONDS", "10"))
+
+NONE, LOW, MEDIUM, HIGH = 0, 1, 2, 3
+MATERIALITY_NAMES = {NONE: "none", LOW: "low", MEDIUM: "medium", HIGH: "high"}
+DEBOUNCE_FACTORS = {LOW: 1.0, MEDIUM: 0.5, HIGH: 0.25}
+RISK_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+PRECOMPUTE_CHANGES = REGISTRY.counter(
+    "fintwitch_llm_precompute_changes_total", "Material state changes seen by the precompute scheduler",
+    ("materiality", "reason"))
+PRECOMPUTE_RUNS = REGISTRY.counter(
+    "fintwitch_llm_precompute_runs_total",
+    "Precompute refreshes (refreshed = generation started, warm = already cached or generating)",
+    ("materiality", "result"))
+
+
+def classify(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Tuple[int, Optional[str]]:
+    """(materiality, reason) of the change from previous to current signature"""
+    if previous is None:
+        return NONE, None
+    changes = []
+    old_risk = RISK_ORDER.get(previous.get("risk_level"), 0)
+    new_risk = RISK_ORDER.get(current.get("risk_level"), 0)
+    if new_risk > old_risk:
+        changes.append((HIGH, "risk_escalation"))
+    elif new_risk < old_risk:
+        changes.append((LOW, "risk_deescalation"))
+    old_critical, new_critical = previous.get("critical", frozenset()), current.get("critical", frozenset())
+    if new_critical - old_critical:
+        changes.append((HIGH, "new_critical_alert"))
+    elif old_critical - new_critical:
+        changes.append((LOW, "critical_cleared"))
+    if current.get("action") != previous.get("action"):
+        changes.append((MEDIUM, "fusion_action"))
+    return max(changes, default=(NONE, None), key=lambda change: change[0])
+
+
+class PrecomputeScheduler:
+    """Debounced, materiality-prioritized background refresh of the insight cache"""
+
+    def __init__(self, signature_fn: Callable[[], Dict[str, Any]], refresh_fn: Callable[[], bool],
+                 busy_fn: Callable[[], bool] = lambda: False, enabled: bool = LLM_PRECOMPUTE,
+                 debounce_seconds: float = LLM_PRECOMPUTE_DEBOUNCE_SECONDS,
+                 max_delay_seconds: float = LLM_PRECOMPUTE_MAX_DELAY_SECONDS, clock=time.monotonic):
+        self._signature_fn = signature_fn
+        self._refresh_fn = refresh_fn
+        self._busy_fn = busy_fn
+        self.enabled = enabled
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last: Optional[Dict[str, Any]] = None
+        self._pending = NONE
+        self._reason: Optional[str] = None
+        self._first_at = 0.0
+        self._due_at = 0.0
+        self.changes = 0
+        self.deferred = 0
+        self.runs = {"refreshed": 0, "warm": 0, "error": 0}
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Take the current state as the baseline and fire refreshes on loop (default: running loop)"""
+        self._loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            self._last = self._signature_fn()
+
+    def stop(self):
+        with self._lock:
+            self._loop = None
+            self._pending = NONE
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def notify(self):
+        """Compare the live state with the last one seen; schedule (or push back) a refresh"""
+        if not self.enabled or self._loop is None:
+            return
+        signature = self._signature_fn()
+        with self._lock:
+            materiality, reason = classify(self._last, signature)
+            self._last = signature
+            if self._loop is None or (materiality == NONE and self._pending == NONE):
+                return
+            now = self._clock()
+            if self._pending == NONE:
+                self._first_at = now
+            if materiality != NONE and materiality >= self._pending:
+                self._pending, self._reason = materiality, reason
+            self._due_at = self._next_due(now)
+            loop = self._loop
+            if materiality != NONE:
+                self.changes += 1
+        if materiality != NONE:
+            PRECOMPUTE_CHANGES.inc(materiality=MATERIALITY_NAMES[materiality], reason=reason)
+        loop.call_soon_threadsafe(self._arm)
+
+    def _next_due(self, now: float) -> float:
+        # Caller holds the lock
+        delay = self.debounce_seconds * DEBOUNCE_FACTORS[self._pending]
+        return min(now + delay, self._first_at + self.max_delay_seconds)
+
+    def _arm(self):
+        # On the loop: (re)start the timer for the current due time
+        with self._lock:
+            if self._loop is None or self._pending == NONE:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = self._loop.call_later(max(0.0, self._due_at - self._clock()), self._fire)
+
+    def _fire(self):
+        with self._lock:
+            self._timer = None
+            materiality, reason = self._pending, self._reason
+            if materiality == NONE:
+                return
+            now = self._clock()
+            overdue = now - self._first_at >= self.max_delay_seconds
+            if materiality < HIGH and not overdue and self._busy_fn():
+                # Reads hold every generation slot; try again after another debounce
+                self.deferred += 1
+                self._due_at = self._next_due(now)
+                self._timer = self._loop.call_later(max(0.0, self._due_at - now), self._fire)
+                return
+            self._pending, self._reason = NONE, None
+            waited = now - self._first_at
+        try:
+            result = "refreshed" if self._refresh_fn() else "warm"
+        except Exception as e:
+            print(f"INFO: LLM insight precompute failed: {e}")
+            result = "error"
+        self.runs[result] += 1
+        self.last_run = {"materiality": MATERIALITY_NAMES[materiality], "reason": reason,
+                         "result": result, "waited_seconds": round(waited, 3)}
+        PRECOMPUTE_RUNS.inc(materiality=MATERIALITY_NAMES[materiality], result=result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "debounce_seconds": self.debounce_seconds,
+                "max_delay_seconds": self.max_delay_seconds,
+                "pending": MATERIALITY_NAMES[self._pending],
+                "changes": self.changes,
+                "deferred": self.deferred,
+                "runs": dict(self.runs),
+                "last_run": self.last_run,
+            }
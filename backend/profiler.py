@@ -0,0 +1,219 @@
+"""
+Sampling Profiler for FinTwitch
+===============================
+Opt-in, low-overhead stack sampler for the backend processes. While running, a daemon
+thread snapshots every Python thread's stack (sys._current_frames) at a fixed interval
+and aggregates identical stacks, so the cost is one walk per thread per sample and
+nothing at all while it is stopped.
+
+Output is the folded-stack format ("thread;outer;inner count" per line) read by
+flamegraph.pl, speedscope and inferno, rooted at the thread name so the uvicorn event
+loop, threadpool workers, the Pathway thread and the generator threads separate cleanly.
+
+Admin endpoints toggle it at runtime. Set FINTWITCH_ADMIN_TOKEN to require a matching
+X-Admin-Token header on them; without a token they only answer loopback clients. A
+sampling session stops by itself after at most MAX_DURATION seconds.
+"""
+
+import hmac
+import ipaddress
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+ADMIN_TOKEN = os.getenv("FINTWITCH_ADMIN_TOKEN", "")
+DEFAULT_INTERVAL = 0.01    # 100 samples/sec per thread
+MIN_INTERVAL = 0.001
+# Longest sampling session (also the duration when none is given)
+MAX_DURATION = float(os.getenv("PROFILER_MAX_DURATION_SECONDS", "300"))
+MAX_STACK_DEPTH = 128
+# Distinct stacks kept per session; further new stacks are counted as truncated
+MAX_STACKS = 50000
+
+
+def check_admin_token(token: Optional[str], client_host: Optional[str] = None) -> bool:
+    """
+    True when the given token matches FINTWITCH_ADMIN_TOKEN or, with no token configured,
+    when the client is on the loopback interface (the servers bind to 0.0.0.0)
+    """
+    if ADMIN_TOKEN:
+        return token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+    try:
+        return client_host is not None and ipaddress.ip_address(client_host).is_loopback
+    except ValueError:
+        return client_host == "localhost"
+
+
+def admin_denied_message() -> str:
+    if ADMIN_TOKEN:
+        return "Invalid admin token"
+    return "Admin endpoints are loopback-only unless FINTWITCH_ADMIN_TOKEN is set"
+
+
+def _number(value: Any, name: str) -> float:
+    # JSON numbers only: strings, booleans, NaN and infinities are rejected
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise TypeError(f"{name} must be a number")
+    return float(value)
+
+
+def _frame_label(code) -> str:
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Periodic all-thread stack sampler producing folded stacks"""
+
+    def __init__(self, max_stacks: int = MAX_STACKS):
+        self.max_stacks = max_stacks
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._interval = DEFAULT_INTERVAL
+        self._thread_filter: tuple = ()
+        self._deadline: Optional[float] = None
+        self._started_at: Optional[float] = None
+        self.samples = 0
+        self.truncated = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = DEFAULT_INTERVAL, duration: Optional[float] = None,
+              threads: Optional[Iterable[str]] = None, reset: bool = True) -> Dict[str, Any]:
+        """
+        Begin sampling (restarting if already running). duration (default and at most
+        MAX_DURATION seconds) stops it automatically; threads keeps only threads whose name
+        contains one of the given substrings. Raises TypeError / ValueError on bad settings.
+        """
+        interval = _number(interval, "interval")
+        duration = MAX_DURATION if duration is None else _number(duration, "duration_seconds")
+        if not 0 < duration <= MAX_DURATION:
+            raise ValueError(f"duration_seconds must be more than 0 and at most {MAX_DURATION:g}")
+        self.stop()
+        if reset:
+            self.reset()
+        self._interval = max(MIN_INTERVAL, interval)
+        self._thread_filter = tuple(threads or ())
+        self._started_at = time.monotonic()
+        self._deadline = self._started_at + duration
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self.stats()
+
+    def stop(self) -> Dict[str, Any]:
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join(timeout=1.0)
+            self._thread = None
+        return self.stats()
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.truncated = 0
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self._interval):
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                break
+            self._sample(own_ident)
+        self._stop.set()
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        frames = sys._current_frames()
+        folded = []
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            name = names.get(ident, f"thread-{ident}")
+            if self._thread_filter and not any(part in name for part in self._thread_filter):
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(name.replace(";", ":").replace(" ", "_"))
+            folded.append(";".join(reversed(labels)))
+        with self._lock:
+            self.samples += 1
+            for stack in folded:
+                if stack in self._stacks or len(self._stacks) < self.max_stacks:
+                    self._stacks[stack] += 1
+                else:
+                    self.truncated += 1
+
+    def folded(self) -> str:
+        """Folded stacks, most frequent first"""
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            distinct = len(self._stacks)
+            samples = self.samples
+            truncated = self.truncated
+        return {
+            "running": self.running,
+            "interval_ms": round(self._interval * 1000, 3),
+            "threads": list(self._thread_filter),
+            "samples": samples,
+            "distinct_stacks": distinct,
+            "truncated_stacks": truncated,
+            "seconds_remaining": (
+                max(0.0, round(self._deadline - time.monotonic(), 1))
+                if self.running and self._deadline is not None else None
+            ),
+        }
+
+
+sampler = StackSampler()
+
+
+def register_flask_profiling(app):
+    """Add the profiling admin endpoints to a Flask app"""
+    from flask import Response, jsonify, request
+
+    def _authorized():
+        return check_admin_token(request.headers.get("X-Admin-Token"), request.remote_addr)
+
+    @app.route('/admin/profiling', methods=['GET', 'POST'])
+    def admin_profiling():
+        """Sampling profiler status, or start/stop it with {"sampling": bool, ...}"""
+        if not _authorized():
+            return jsonify({"error": admin_denied_message()}), 403
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            try:
+                if data.get("sampling", True):
+                    sampler.start(
+                        interval=_number(data.get("interval_ms", DEFAULT_INTERVAL * 1000), "interval_ms") / 1000,
+                        duration=data.get("duration_seconds"),
+                        threads=data.get("threads"),
+                    )
+                else:
+                    sampler.stop()
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Invalid profiling settings: {e}"}), 400
+        return jsonify({"sampling": sampler.stats()})
+
+    @app.route('/admin/profiling/flamegraph', methods=['GET'])
+    def admin_flamegraph():
+        """Folded stacks for flamegraph.pl / speedscope"""
+        if not _authorized():
+            return jsonify({"error": admin_denied_message()}), 403
+        return Response(sampler.folded(), mimetype="text/plain")
@@ -0,0 +1,398 @@
+"""
+Trace Replay Tool for FinTwitch
+===============================
+Replays recorded transaction logs (JSONL, /ingest or GET /events schema) and external
+signal logs (external_events.jsonl format) into pathway_streaming_enhanced, merged in
+timestamp order, so production incidents can be reproduced offline.
+
+Modes:
+- http       async httpx client with a keep-alive pool, batched into POST /ingest/batch
+             and POST /ingest/external, with up to --concurrency requests in flight
+- inprocess  imports the engine and calls ingest_transaction_record /
+             ingest_external_signal directly (no server needed)
+
+Pacing: --rate N events/sec, --speed X (recorded gaps divided by X), or neither for
+maximum speed.
+
+Reports achieved events/sec, ingest-to-visible latency (time from sending a batch until
+/metrics transaction_count includes it) and error counts.
+
+Usage (from the backend folder):
+    python simulate_traffic.py --days 1 --seed 7
+    python replay_trace.py data_streams/simulated/transactions.jsonl \\
+        --external data_streams/simulated/external_events.jsonl --rate 2000
+    python replay_trace.py data_streams/simulated/transactions.jsonl --mode inprocess
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_ENGINE_URL = "http://localhost:8000"
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+# How often the prober reads transaction_count, and how long to wait for stragglers at the end
+PROBE_INTERVAL = 0.005
+VISIBILITY_TIMEOUT = 10.0
+
+TRANSACTION = "transaction"
+EXTERNAL_SIGNAL = "external_signal"
+
+
+# ---------- trace loading ----------
+
+def _epoch(timestamp: str) -> float:
+    dt = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def normalize_transaction(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map a recorded transaction (ingest or generator schema) to the /ingest schema.
+    Expenses are sent negative, the convention the engine's fallback totals expect
+    (the frontend's sendToBackend does the same).
+    """
+    event_type = str(record["type"]).lower()
+    if event_type not in ("income", "expense"):
+        raise ValueError(f"unknown transaction type {record['type']!r}")
+    amount = abs(float(record["amount"]))
+    category = record.get("category", "Other")
+    return {
+        "type": event_type,
+        "amount": -amount if event_type == "expense" else amount,
+        "category": category,
+        "timestamp": record["timestamp"],
+        "description": record.get("description") or f"{event_type.title()} - {category}",
+        "id": record.get("id"),
+    }
+
+
+def load_trace(transaction_files: Iterable[str], external_files: Iterable[str], limit: Optional[int] = None):
+    """
+    Read all records, merged by timestamp (stable, so same-instant records keep file order).
+    Returns (records, parse_errors) where records are (epoch_seconds, kind, payload).
+    """
+    records: List[Tuple[float, str, Dict[str, Any]]] = []
+    parse_errors = 0
+    sources = [(path, TRANSACTION) for path in transaction_files] + [(path, EXTERNAL_SIGNAL) for path in external_files]
+    for path, kind in sources:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    payload = normalize_transaction(record) if kind == TRANSACTION else record
+                    records.append((_epoch(record["timestamp"]), kind, payload))
+                except (KeyError, TypeError, ValueError):
+                    parse_errors += 1
+    records.sort(key=lambda item: item[0])
+    if limit is not None:
+        records = records[:limit]
+    return records, parse_errors
+
+
+def plan_batches(records, batch_size: int, rate: Optional[float], speed: Optional[float]):
+    """
+    Group consecutive records into batches of up to batch_size, each with a send offset
+    (seconds after replay start): by event count for --rate, by recorded time for --speed,
+    else 0. A batch is (offset, transactions, external_signals); the two kinds go to their
+    own endpoints, so interleaved signals don't fragment transaction batches.
+    """
+    batches = []
+    first_time = records[0][0] if records else 0.0
+    for start in range(0, len(records), batch_size):
+        chunk = records[start:start + batch_size]
+        if rate:
+            offset = start / rate
+        elif speed:
+            offset = (chunk[0][0] - first_time) / speed
+        else:
+            offset = 0.0
+        batches.append((
+            offset,
+            [payload for _, kind, payload in chunk if kind == TRANSACTION],
+            [payload for _, kind, payload in chunk if kind == EXTERNAL_SIGNAL],
+        ))
+    return batches
+
+
+# ---------- visibility probing ----------
+
+class VisibilityProber:
+    """Matches 'transaction_count reached N' observations to the batches that produced N"""
+
+    def __init__(self):
+        self._pending: List[Tuple[int, float]] = []  # (expected count, sent at), ascending count
+        self._lock = threading.Lock()
+        self._lost = 0  # events that failed after their successors' expected counts were fixed
+        self.latencies_ms: List[float] = []
+
+    def expect(self, expected_count: int, sent_at: float):
+        with self._lock:
+            self._pending.append((expected_count, sent_at))
+            self._pending.sort()
+
+    def discount(self, failed: int):
+        """Account for events that will never become visible"""
+        with self._lock:
+            self._lost += failed
+
+    def observe(self, count: int, now: float):
+        with self._lock:
+            count += self._lost
+            while self._pending and self._pending[0][0] <= count:
+                _, sent_at = self._pending.pop(0)
+                self.latencies_ms.append((now - sent_at) * 1000)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(q):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))], 2) if latencies else None
+
+        return {
+            "samples": len(latencies),
+            "not_visible": self.pending,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(latencies[-1], 2) if latencies else None,
+        }
+
+
+# ---------- http mode ----------
+
+async def replay_http(batches, base_url: str, concurrency: int, timeout: float) -> Dict[str, Any]:
+    import httpx
+
+    errors = {TRANSACTION: 0, EXTERNAL_SIGNAL: 0}
+    error_samples: List[str] = []
+    prober = VisibilityProber()
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        try:
+            baseline = (await client.get("/metrics")).json().get("transaction_count", 0)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"engine not reachable at {base_url}: {e}") from e
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set() or prober.pending:
+                try:
+                    count = (await client.get("/metrics")).json().get("transaction_count", 0)
+                    prober.observe(count, time.perf_counter())
+                except (httpx.HTTPError, ValueError):
+                    pass
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        async def post(kind, batch, expected_count):
+            sent_at = time.perf_counter()
+            path = "/ingest/batch" if kind == TRANSACTION else "/ingest/external"
+            try:
+                response = await client.post(path, json=batch)
+                if response.status_code == 207:
+                    failed = len(response.json().get("errors", []))
+                    errors[kind] += failed
+                    if len(error_samples) < 10:
+                        error_samples.append(f"{path}: {failed} of {len(batch)} rejected")
+                elif response.status_code != 200:
+                    raise httpx.HTTPStatusError(
+                        f"{response.status_code} {response.text[:200]}", request=response.request, response=response
+                    )
+                elif kind == TRANSACTION:
+                    prober.expect(expected_count, sent_at)
+            except httpx.HTTPError as e:
+                errors[kind] += len(batch)
+                if kind == TRANSACTION:
+                    prober.discount(len(batch))
+                if len(error_samples) < 10:
+                    error_samples.append(f"{path}: {e}")
+
+        async def send(transactions, signals, expected_count):
+            async with semaphore:
+                if signals:
+                    await post(EXTERNAL_SIGNAL, signals, expected_count)
+                if transactions:
+                    await post(TRANSACTION, transactions, expected_count)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        tasks = []
+        expected = baseline
+        for offset, transactions, signals in batches:
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            expected += len(transactions)
+            tasks.append(asyncio.create_task(send(transactions, signals, expected)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        done.set()
+        try:
+            await asyncio.wait_for(probe_task, VISIBILITY_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+    return {"seconds": elapsed, "errors": errors, "error_samples": error_samples, "latency_ms": prober.summary()}
+
+
+# ---------- in-process mode ----------
+
+def replay_inprocess(batches) -> Dict[str, Any]:
+    import pathway_streaming_enhanced as engine
+
+    def read_count() -> int:
+        with engine.state_lock:
+            return int(engine.latest_metrics.get("transaction_count", 0))
+
+    errors = {TRANSACTION: 0, EXTERNAL_SIGNAL: 0}
+    error_samples: List[str] = []
+    prober = VisibilityProber()
+    done = threading.Event()
+
+    def probe():
+        # With Pathway running, metrics update asynchronously from the pipeline's callbacks
+        while not done.is_set() or prober.pending:
+            prober.observe(read_count(), time.perf_counter())
+            time.sleep(PROBE_INTERVAL)
+
+    baseline = read_count()
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    probe_thread.start()
+
+    started = time.perf_counter()
+    expected = baseline
+    for offset, transactions, signals in batches:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent_at = time.perf_counter()
+        for event in signals:
+            try:
+                engine.ingest_external_signal(event)
+            except Exception as e:
+                errors[EXTERNAL_SIGNAL] += 1
+                if len(error_samples) < 10:
+                    error_samples.append(f"{EXTERNAL_SIGNAL}: {e}")
+        ok = 0
+        for event in transactions:
+            try:
+                engine.ingest_transaction_record(
+                    event["type"], event["amount"], event["category"],
+                    timestamp=event["timestamp"], description=event["description"],
+                    event_id=event["id"], refresh=False
+                )
+                ok += 1
+            except Exception as e:
+                errors[TRANSACTION] += 1
+                if len(error_samples) < 10:
+                    error_samples.append(f"{TRANSACTION}: {e}")
+        if ok:
+            # Same once-per-batch recompute as POST /ingest/batch
+            engine.update_fallback_state()
+            expected += ok
+            prober.expect(expected, sent_at)
+            prober.observe(read_count(), time.perf_counter())
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    probe_thread.join(VISIBILITY_TIMEOUT)
+    return {"seconds": elapsed, "errors": errors, "error_samples": error_samples, "latency_ms": prober.summary()}
+
+
+# ---------- entry point ----------
+
+def replay(
+    transaction_files: Iterable[str] = (),
+    external_files: Iterable[str] = (),
+    mode: str = "http",
+    base_url: str = DEFAULT_ENGINE_URL,
+    rate: Optional[float] = None,
+    speed: Optional[float] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = 10.0,
+    limit: Optional[int] = None,
+    log: Callable[[str], None] = lambda message: print(message, file=sys.stderr),
+) -> Dict[str, Any]:
+    """Load, pace and replay a trace; returns the report dict"""
+    records, parse_errors = load_trace(transaction_files, external_files, limit)
+    batches = plan_batches(records, batch_size, rate, speed)
+    counts = {
+        TRANSACTION: sum(1 for _, kind, _ in records if kind == TRANSACTION),
+        EXTERNAL_SIGNAL: sum(1 for _, kind, _ in records if kind == EXTERNAL_SIGNAL),
+    }
+    log(f"Replaying {len(records):,} records ({counts[TRANSACTION]:,} transactions, "
+        f"{counts[EXTERNAL_SIGNAL]:,} external signals) in {len(batches):,} batches, mode={mode}")
+
+    if mode == "http":
+        result = asyncio.run(replay_http(batches, base_url, concurrency, timeout))
+    elif mode == "inprocess":
+        result = replay_inprocess(batches)
+    else:
+        raise ValueError("mode must be 'http' or 'inprocess'")
+
+    seconds = result["seconds"]
+    return {
+        "mode": mode,
+        "records": counts,
+        "batches": len(batches),
+        "target_rate": rate,
+        "speed": speed,
+        "seconds": round(seconds, 3),
+        "events_per_sec": round(len(records) / seconds, 1) if seconds > 0 else None,
+        "parse_errors": parse_errors,
+        "errors": result["errors"],
+        "error_samples": result["error_samples"],
+        "ingest_to_visible_ms": result["latency_ms"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("transactions", nargs="*", help="transaction JSONL files")
+    parser.add_argument("--external", action="append", default=[], help="external signal JSONL file (repeatable)")
+    parser.add_argument("--mode", choices=["http", "inprocess"], default="http")
+    parser.add_argument("--url", default=DEFAULT_ENGINE_URL, help="engine base URL (http mode)")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=float, default=None, help="target events per second")
+    pacing.add_argument("--speed", type=float, default=None, help="replay recorded timing this many times faster")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="requests in flight (http mode)")
+    parser.add_argument("--limit", type=int, default=None, help="replay only the first N records")
+    parser.add_argument("--report", default=None, help="also write the report JSON to this file")
+    args = parser.parse_args()
+
+    if not args.transactions and not args.external:
+        parser.error("give at least one transaction file or --external file")
+
+    try:
+        report = replay(
+            args.transactions, args.external, mode=args.mode, base_url=args.url, rate=args.rate,
+            speed=args.speed, batch_size=args.batch_size, concurrency=args.concurrency, limit=args.limit
+        )
+    except RuntimeError as e:
+        print(f"Replay failed: {e}", file=sys.stderr)
+        sys.exit(2)
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    total_errors = report["parse_errors"] + sum(report["errors"].values())
+    sys.exit(1 if total_errors else 0)
@@ -0,0 +1,81 @@
+"""
+Per-Session State Store for FinTwitch
+=====================================
+Bounded, TTL-evicted map of per-session (or per-user) state, safe under Flask's
+threaded server. Entries are kept in least-recently-used order so expiry and
+capacity eviction are both O(1) amortized.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class SessionStateStore:
+    """Thread-safe LRU map of session_id -> state dict with idle-time expiry"""
+
+    def __init__(
+        self,
+        factory: Callable[[], Dict[str, Any]],
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # id -> [last_seen, state]
+        self._lock = threading.Lock()
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+
+    def _evict(self, now: float):
+        entries = self._entries
+        # Oldest-seen entries are at the front, so expiry stops at the first live one
+        while entries:
+            session_id, (last_seen, _) = next(iter(entries.items()))
+            if now - last_seen < self.ttl_seconds:
+                break
+            entries.popitem(last=False)
+            self.evicted_expired += 1
+        while len(entries) > self.max_sessions:
+            entries.popitem(last=False)
+            self.evicted_capacity += 1
+
+    @contextmanager
+    def session(self, session_id: str):
+        """
+        Yield the state dict for session_id, creating it if needed. The store lock is held
+        for the duration, so read-modify-write of one session's state is atomic.
+        """
+        with self._lock:
+            now = self.clock()
+            entry = self._entries.get(session_id)
+            if entry is None or now - entry[0] >= self.ttl_seconds:
+                entry = [now, self.factory()]
+                self._entries[session_id] = entry
+            else:
+                entry[0] = now
+                self._entries.move_to_end(session_id)
+            self._evict(now)
+            yield entry[1]
+
+    def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of a session's state without refreshing its TTL"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            return dict(entry[1]) if entry is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict(self.clock())
+            return {
+                "active_sessions": len(self._entries),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "evicted_expired": self.evicted_expired,
+                "evicted_capacity": self.evicted_capacity,
+            }
@@ -0,0 +1,125 @@
+"""
+Simulated Clock for FinTwitch
+=============================
+Shared time source for the event generators, so traffic can run faster than real time
+and be replayed deterministically.
+
+- SimulatedClock: live clock that runs `speed` times faster than the wall clock from a
+  start point. sleep()/asleep() take simulated seconds and wait the scaled wall time, so
+  every producer sharing one clock stays consistent (SIM_CLOCK_SPEED=60 turns a
+  15-minute window into 15 wall seconds).
+- VirtualClock: time moves only when advanced (discrete-event simulation). Timestamps
+  do not depend on wall-clock jitter, so output is identical every run; an optional
+  speed paces advances against the wall clock.
+
+Environment (read by from_env / seed_from_env):
+    SIM_CLOCK_SPEED   speed multiplier for the live clock (default 1)
+    SIM_CLOCK_START   ISO start time of simulated time (default: now)
+    SIM_SEED          seed for the generators' RNGs (default: unseeded)
+"""
+
+import asyncio
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+def make_rng(seed: Optional[int] = None, stream: str = "") -> random.Random:
+    """
+    Independent RNG per producer. With a seed, each named stream gets its own deterministic
+    sequence, so adding draws in one producer never shifts another's output.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(f"{seed}-{stream}")
+
+
+def seed_from_env() -> Optional[int]:
+    value = os.getenv("SIM_SEED")
+    return int(value) if value not in (None, "") else None
+
+
+class SimulatedClock:
+    """Wall-clock-driven simulated time running `speed` times faster than real time"""
+
+    def __init__(self, start: Optional[datetime] = None, speed: float = 1.0):
+        if not (speed > 0 and math.isfinite(speed)):
+            raise ValueError("speed must be a positive finite number")
+        self.start = start or datetime.now()
+        self.speed = speed
+        self._wall_start = time.monotonic()
+
+    @classmethod
+    def from_env(cls) -> "SimulatedClock":
+        start = os.getenv("SIM_CLOCK_START")
+        return cls(
+            start=datetime.fromisoformat(start) if start else None,
+            speed=float(os.getenv("SIM_CLOCK_SPEED", "1")),
+        )
+
+    def elapsed(self) -> float:
+        """Simulated seconds since start"""
+        return (time.monotonic() - self._wall_start) * self.speed
+
+    def now(self) -> datetime:
+        return self.start + timedelta(seconds=self.elapsed())
+
+    def timestamp_ms(self) -> int:
+        return int(self.now().timestamp() * 1000)
+
+    def sleep(self, seconds: float):
+        """Block for `seconds` of simulated time"""
+        time.sleep(max(0.0, seconds) / self.speed)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(max(0.0, seconds) / self.speed)
+
+
+class VirtualClock(SimulatedClock):
+    """
+    Deterministic simulated time that only moves through sleep()/advance_to().
+    speed=None never waits; a number paces simulated time against the wall clock.
+    Meant for a single driver (one thread or task), not as a shared live clock.
+    """
+
+    def __init__(self, start: datetime, speed: Optional[float] = None):
+        if speed is not None and not (speed > 0 and math.isfinite(speed)):
+            raise ValueError("speed must be a positive finite number or None")
+        self.start = start
+        self.speed = speed
+        self._elapsed = 0.0
+        self._wall_start = time.monotonic()
+
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    def timestamp_ms(self) -> int:
+        now = self.now()
+        if now.tzinfo is None:
+            # Naive simulated time is read as UTC so output doesn't depend on the host timezone
+            now = now.replace(tzinfo=timezone.utc)
+        return int(now.timestamp() * 1000)
+
+    def _wall_delay(self) -> float:
+        if self.speed is None:
+            return 0.0
+        return self._wall_start + self._elapsed / self.speed - time.monotonic()
+
+    def advance_to(self, when: datetime):
+        """Move to an absolute simulated time (never backwards)"""
+        self.sleep((when - self.start).total_seconds() - self._elapsed)
+
+    def sleep(self, seconds: float):
+        self._elapsed += max(0.0, seconds)
+        delay = self._wall_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def asleep(self, seconds: float):
+        self._elapsed += max(0.0, seconds)
+        delay = self._wall_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,155 @@
+"""
+Deterministic Traffic Simulator for FinTwitch
+=============================================
+Generates combined transaction and external-signal traffic on a VirtualClock: both
+producers (financial_event_generator.generate_event with its balance-adaptive economy,
+and ExternalDataStreamGenerator) are scheduled as a discrete-event simulation, so a
+month of traffic takes seconds and the same seed always produces byte-identical files.
+
+Output (in --out-dir):
+    transactions.jsonl     Pathway /ingest schema, replayable through the engine
+    external_events.jsonl  same format as data_streams/external_events.jsonl
+
+Usage (from the backend folder):
+    python simulate_traffic.py --days 30 --seed 7
+    python simulate_traffic.py --days 1 --speed 3600   # paced: one simulated hour per second
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Per-event regime logging would dominate a month-long run
+os.environ.setdefault("EVENT_GENERATOR_VERBOSE", "false")
+
+from external_data_stream import ExternalDataStreamGenerator  # noqa: E402
+from financial_event_generator import (  # noqa: E402
+    SIMULATED_INTERVAL_RANGE,
+    generate_event,
+    to_ingest_event,
+)
+from sim_clock import VirtualClock, make_rng  # noqa: E402
+
+DEFAULT_START = datetime(2026, 1, 1)
+DEFAULT_START_BALANCE = 5000.0
+# Same cadence the engine uses for its live external stream
+DEFAULT_SIGNAL_INTERVAL = 20.0
+DEFAULT_OUT_DIR = Path(__file__).parent / "data_streams" / "simulated"
+
+
+def simulate_traffic(
+    days: float,
+    seed: int = 0,
+    start: datetime = DEFAULT_START,
+    balance: Optional[float] = DEFAULT_START_BALANCE,
+    transaction_interval: Tuple[float, float] = SIMULATED_INTERVAL_RANGE,
+    signal_interval: float = DEFAULT_SIGNAL_INTERVAL,
+    speed: Optional[float] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (kind, event) in simulated-time order, kind being "transaction" (ingest schema,
+    plus balance_after when a balance is simulated) or "external_signal".
+    balance=None uses the normal (non-adaptive) economy.
+    """
+    clock = VirtualClock(start, speed)
+    transaction_rng = make_rng(seed, "transactions")
+    # Signals are yielded rather than appended, so the generator's stream file is unused
+    external = ExternalDataStreamGenerator(stream_file=os.devnull, clock=clock, seed=seed)
+    # Fresh economy session per run, so recovery state never leaks between runs
+    session_id = f"simulate-{uuid.uuid4().hex}"
+    end = start + timedelta(days=days)
+
+    # (next fire time, tie-break order, producer): ties always resolve the same way
+    schedule = [
+        (start + timedelta(seconds=transaction_rng.uniform(*transaction_interval)), 0, "transaction"),
+        (start + timedelta(seconds=signal_interval), 1, "external_signal"),
+    ]
+    while schedule:
+        when, order, kind = heapq.heappop(schedule)
+        if when > end:
+            break
+        clock.advance_to(when)
+        if kind == "transaction":
+            event = to_ingest_event(generate_event(balance, session_id=session_id, rng=transaction_rng, clock=clock))
+            if balance is not None:
+                balance += event["amount"] if event["type"] == "income" else -event["amount"]
+                event["balance_after"] = round(balance, 2)
+            next_time = when + timedelta(seconds=transaction_rng.uniform(*transaction_interval))
+        else:
+            event = external.next_signal()
+            next_time = when + timedelta(seconds=signal_interval)
+        yield kind, event
+        heapq.heappush(schedule, (next_time, order, kind))
+
+
+def write_traffic(out_dir: Path, **kwargs) -> Dict[str, Any]:
+    """Run simulate_traffic into out_dir; returns counts, throughput and a digest of the output"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        "transaction": out_dir / "transactions.jsonl",
+        "external_signal": out_dir / "external_events.jsonl",
+    }
+    counts = {kind: 0 for kind in files}
+    digest = hashlib.sha256()
+
+    started = time.perf_counter()
+    handles = {kind: open(path, "w") for kind, path in files.items()}
+    try:
+        for kind, event in simulate_traffic(**kwargs):
+            line = json.dumps(event) + "\n"
+            handles[kind].write(line)
+            digest.update(line.encode())
+            counts[kind] += 1
+    finally:
+        for handle in handles.values():
+            handle.close()
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    return {
+        "files": {kind: str(path) for kind, path in files.items()},
+        "counts": counts,
+        "seconds": elapsed,
+        "events_per_sec": total / elapsed if elapsed > 0 else float("inf"),
+        "sha256": digest.hexdigest(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default=DEFAULT_START.isoformat(), help="ISO start of simulated time")
+    parser.add_argument("--balance", type=float, default=DEFAULT_START_BALANCE,
+                        help="starting balance for the adaptive economy (negative: normal mode)")
+    parser.add_argument("--signal-interval", type=float, default=DEFAULT_SIGNAL_INTERVAL,
+                        help="simulated seconds between external signals")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="pace simulated time at this multiple of real time (default: as fast as possible)")
+    parser.add_argument("--out-dir", default=str(DEFAULT_OUT_DIR))
+    args = parser.parse_args()
+
+    result = write_traffic(
+        Path(args.out_dir),
+        days=args.days,
+        seed=args.seed,
+        start=datetime.fromisoformat(args.start),
+        balance=args.balance if args.balance >= 0 else None,
+        signal_interval=args.signal_interval,
+        speed=args.speed,
+    )
+    counts = result["counts"]
+    print(f"Simulated {args.days:g} days: {counts['transaction']:,} transactions, "
+          f"{counts['external_signal']:,} external signals in {result['seconds']:.2f}s "
+          f"({result['events_per_sec']:,.0f} events/sec)", file=sys.stderr)
+    for path in result["files"].values():
+        print(f"  {path}", file=sys.stderr)
+    print(f"  sha256 {result['sha256']}", file=sys.stderr)
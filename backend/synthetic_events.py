@@ -0,0 +1,189 @@
+"""
+Vectorized Synthetic Event Generator for FinTwitch
+==================================================
+NumPy version of financial_event_generator.generate_event() for load testing.
+
+Produces millions of transactions in one call with the same category mix, amount
+ranges and balance-adaptive regimes, either as columnar arrays or as NDJSON ready
+to POST to the streaming engine's /ingest. Output is fully determined by the seed
+and start time, so every run with the same arguments is identical.
+
+Usage (from the backend folder):
+    python synthetic_events.py -n 1000000 --seed 7 --out events.ndjson --schema ingest
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from event_constants import (
+    CRITICAL_BALANCE_THRESHOLD,
+    EXPENSE_AMOUNT_RANGES,
+    EXPENSE_CATEGORIES,
+    HIGH_BALANCE_THRESHOLD,
+    INCOME_AMOUNT_RANGES,
+    INCOME_CATEGORIES,
+    LOW_BALANCE_THRESHOLD,
+    MAX_BALANCE_THRESHOLD,
+    RECOVERY_BALANCE_THRESHOLD,
+    RECOVERY_THRESHOLD,
+)
+
+# 2026-01-01T00:00:00 UTC; a fixed default keeps output reproducible
+DEFAULT_START_MS = 1767225600000
+# Mean gap between synthetic events (the live generator sleeps 5-10s)
+DEFAULT_MEAN_INTERVAL_MS = 7500.0
+
+CATEGORY_NAMES = INCOME_CATEGORIES + EXPENSE_CATEGORIES
+_INCOME_LOW = np.array([INCOME_AMOUNT_RANGES[c][0] for c in INCOME_CATEGORIES], dtype=np.float64)
+_INCOME_HIGH = np.array([INCOME_AMOUNT_RANGES[c][1] for c in INCOME_CATEGORIES], dtype=np.float64)
+_EXPENSE_LOW = np.array([EXPENSE_AMOUNT_RANGES[c][0] for c in EXPENSE_CATEGORIES], dtype=np.float64)
+_EXPENSE_HIGH = np.array([EXPENSE_AMOUNT_RANGES[c][1] for c in EXPENSE_CATEGORIES], dtype=np.float64)
+
+
+def regime_parameters(balances: Optional[np.ndarray], n: int, recovery_active: bool = False):
+    """
+    Per-event (income_probability, expense_multiplier) matching generate_event()'s regimes.
+    balances is a per-event balance trajectory (or None for normal mode). Recovery mode
+    is stateful: it starts at a balance <= CRITICAL_BALANCE_THRESHOLD and lasts until a
+    balance >= RECOVERY_THRESHOLD is seen, which is resolved here with running maxima.
+    """
+    if balances is None:
+        return np.full(n, 0.45), np.ones(n)
+
+    balances = np.asarray(balances, dtype=np.float64)
+    idx = np.arange(n)
+    critical = balances <= CRITICAL_BALANCE_THRESHOLD
+    recovered = balances >= RECOVERY_THRESHOLD
+    last_critical = np.maximum.accumulate(np.where(critical, idx, -1))
+    last_recovered = np.maximum.accumulate(np.where(recovered, idx, -1))
+    in_recovery = last_critical > last_recovered
+    if recovery_active:
+        # Carried-over recovery lasts until the first recovered balance
+        in_recovery |= last_recovered < 0
+
+    conditions = [
+        critical | in_recovery,
+        balances >= MAX_BALANCE_THRESHOLD,
+        balances >= HIGH_BALANCE_THRESHOLD,
+        balances < LOW_BALANCE_THRESHOLD,
+        balances < RECOVERY_BALANCE_THRESHOLD,
+    ]
+    income_probability = np.select(conditions, [1.0, 0.0, 0.05, 0.80, 0.50], default=0.45)
+    expense_multiplier = np.select(conditions, [0.0, 4.0, 3.0, 0.4, 0.7], default=1.0)
+    return income_probability, expense_multiplier
+
+
+def generate_columns(
+    n: int,
+    seed: int = 0,
+    balance: Optional[float] = None,
+    balances: Optional[np.ndarray] = None,
+    recovery_active: bool = False,
+    start_ms: int = DEFAULT_START_MS,
+    mean_interval_ms: float = DEFAULT_MEAN_INTERVAL_MS,
+) -> Dict[str, np.ndarray]:
+    """
+    Generate n events as columnar arrays.
+    balance applies one regime to every event; balances gives a per-event trajectory.
+    Returns seq (int64), is_income (bool), category (index into CATEGORY_NAMES),
+    amount (float64, 2dp, positive) and timestamp_ms (int64).
+    """
+    rng = np.random.default_rng(seed)
+    if balances is None and balance is not None:
+        balances = np.full(n, float(balance))
+    income_probability, expense_multiplier = regime_parameters(balances, n, recovery_active)
+
+    is_income = rng.random(n) < income_probability
+    income_cat = rng.integers(0, len(INCOME_CATEGORIES), n)
+    expense_cat = rng.integers(0, len(EXPENSE_CATEGORIES), n)
+    u = rng.random(n)
+
+    income_amount = _INCOME_LOW[income_cat] + u * (_INCOME_HIGH[income_cat] - _INCOME_LOW[income_cat])
+    expense_amount = (_EXPENSE_LOW[expense_cat] + u * (_EXPENSE_HIGH[expense_cat] - _EXPENSE_LOW[expense_cat])) * expense_multiplier
+
+    gaps = rng.exponential(mean_interval_ms, n)
+    return {
+        "seq": np.arange(n, dtype=np.int64),
+        "is_income": is_income,
+        "category": np.where(is_income, income_cat, len(INCOME_CATEGORIES) + expense_cat),
+        "amount": np.round(np.where(is_income, income_amount, expense_amount), 2),
+        "timestamp_ms": start_ms + np.cumsum(gaps).astype(np.int64),
+    }
+
+
+def iter_ndjson(columns: Dict[str, np.ndarray], schema: str = "generator", run_id: str = "synthetic", chunk_size: int = 100_000):
+    """
+    Yield NDJSON chunks (str). schema="generator" matches GET /events items;
+    schema="ingest" matches the engine's POST /ingest body (as forwarded by forward_to_pathway),
+    with expenses negative as the engine's fallback totals expect.
+    """
+    names = np.array(CATEGORY_NAMES)
+    n = len(columns["seq"])
+    for start in range(0, n, chunk_size):
+        end = min(n, start + chunk_size)
+        is_income = columns["is_income"][start:end]
+        categories = names[columns["category"][start:end]].tolist()
+        amounts = columns["amount"][start:end]
+        timestamps = np.datetime_as_string(columns["timestamp_ms"][start:end].astype("datetime64[ms]"), unit="ms").tolist()
+        seqs = columns["seq"][start:end].tolist()
+        lines = []
+        if schema == "ingest":
+            amounts = np.where(is_income, amounts, -amounts).tolist()
+            types = np.where(is_income, "income", "expense").tolist()
+            labels = np.where(is_income, "Income", "Expense").tolist()
+            for seq, t, label, cat, amt, ts in zip(seqs, types, labels, categories, amounts, timestamps):
+                lines.append(
+                    f'{{"id":"{run_id}-{seq}","type":"{t}","amount":{amt},"category":{json.dumps(cat)},'
+                    f'"timestamp":"{ts}Z","description":"{label} - {cat}"}}\n'
+                )
+        else:
+            amounts = amounts.tolist()
+            types = np.where(is_income, "Income", "Expense").tolist()
+            for seq, t, cat, amt, ts in zip(seqs, types, categories, amounts, timestamps):
+                lines.append(
+                    f'{{"id":"{run_id}-{seq}","type":"{t}","category":{json.dumps(cat)},'
+                    f'"amount":{amt},"timestamp":"{ts}Z"}}\n'
+                )
+        yield "".join(lines)
+
+
+def generate_events(n: int, seed: int = 0, **kwargs) -> Dict[str, Any]:
+    """Generate columns and report throughput"""
+    started = time.perf_counter()
+    columns = generate_columns(n, seed=seed, **kwargs)
+    elapsed = time.perf_counter() - started
+    return {
+        "columns": columns,
+        "events": n,
+        "seconds": elapsed,
+        "events_per_sec": n / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--events", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--balance", type=float, default=None, help="apply one balance regime to all events")
+    parser.add_argument("--start-ms", type=int, default=DEFAULT_START_MS)
+    parser.add_argument("--schema", choices=["generator", "ingest"], default="ingest")
+    parser.add_argument("--out", default=None, help="NDJSON output file (omit to only report throughput)")
+    args = parser.parse_args()
+
+    result = generate_events(args.events, seed=args.seed, balance=args.balance, start_ms=args.start_ms)
+    print(f"Generated {result['events']:,} events in {result['seconds']:.3f}s "
+          f"({result['events_per_sec']:,.0f} events/sec)", file=sys.stderr)
+
+    if args.out:
+        started = time.perf_counter()
+        with open(args.out, "w") as f:
+            for chunk in iter_ndjson(result["columns"], schema=args.schema, run_id=f"syn{args.seed}"):
+                f.write(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"Wrote NDJSON to {args.out} in {elapsed:.3f}s "
+              f"({result['events'] / elapsed:,.0f} events/sec)", file=sys.stderr)
@@ -0,0 +1,418 @@
+"""
+Telemetry for FinTwitch
+=======================
+Dependency-free, Prometheus-compatible metrics shared by the backend services
+(engine, budget API, event generator). Every process exports its own registry in the
+Prometheus text format on GET /metrics/prometheus.
+
+- Counter / Gauge / Histogram with labels; hot paths bind a labelled series once
+  (`labels(...)`) and update it under a tiny per-series lock, so concurrent updates
+  from worker threads and Pathway callbacks are never lost
+- Histogram.time() / timed() for latency of functions and blocks
+- InstrumentedLock: drop-in wrapper around Lock/RLock that records how long callers
+  waited; the uncontended path only bumps a counter
+- RequestMetricsMiddleware (ASGI) and instrument_flask() for per-route request latency
+- monitor_event_loop_lag(): how late the asyncio loop wakes up a sleeping task
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a sub-millisecond callback up to a slow LLM call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Lock waits are usually microseconds when they happen at all
+LOCK_WAIT_BUCKETS = (0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[Any]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterSeries:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeSeries(_CounterSeries):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramSeries:
+    __slots__ = ("_lock", "_buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class _Timer:
+    """Context manager observing the elapsed wall time of a block into a histogram series"""
+
+    __slots__ = ("_series", "_start")
+
+    def __init__(self, series: _HistogramSeries):
+        self._series = series
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, **labels):
+        """Series for these label values (created on first use); bind it once on hot paths"""
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """Read the value from fn() at export time instead of tracking it here"""
+        self._functions[self._key(labels)] = fn
+
+    def _samples(self) -> List[Tuple[Tuple[str, ...], float]]:
+        with self._lock:
+            series = list(self._series.items())
+        samples = [(key, s.value) for key, s in series]
+        for key, fn in list(self._functions.items()):
+            try:
+                samples.append((key, float(fn())))
+            except Exception:
+                continue
+        return samples
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self._samples():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1.0, **labels):
+        self.labels(**labels).inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries()
+
+    def set(self, value: float, **labels):
+        self.labels(**labels).set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float, **labels):
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels) -> _Timer:
+        return _Timer(self.labels(**labels))
+
+    def timed(self, **labels):
+        """Decorator recording each call's duration (sync or async functions)"""
+        series = self.labels(**labels)
+
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        series.observe(time.perf_counter() - start)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    series.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = list(self._series.items())
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        names = self.labelnames + ("le",)
+        for key, s in series:
+            counts, total, count = s.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {cumulative}")
+            label_text = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process; registering an existing name returns the same metric"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Tuple[str, ...], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, tuple(labelnames), **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def render() -> str:
+    """Prometheus text exposition of the process-wide registry"""
+    return REGISTRY.render()
+
+
+# ==================== SHARED METRICS ====================
+
+LOCK_ACQUISITIONS = REGISTRY.counter(
+    "fintwitch_lock_acquisitions_total", "Lock acquisitions", ("lock",))
+LOCK_CONTENDED = REGISTRY.counter(
+    "fintwitch_lock_contended_total", "Lock acquisitions that had to wait", ("lock",))
+LOCK_WAIT = REGISTRY.histogram(
+    "fintwitch_lock_wait_seconds", "Time spent waiting for a contended lock", ("lock",),
+    buckets=LOCK_WAIT_BUCKETS)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "fintwitch_http_request_duration_seconds", "HTTP request latency by route",
+    ("service", "method", "route", "status"))
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "fintwitch_event_loop_lag_seconds", "How late the asyncio event loop resumed a sleeping task",
+    ("service",))
+
+
+class InstrumentedLock:
+    """
+    Lock/RLock wrapper recording acquisitions and contended wait time.
+    Tries a non-blocking acquire first, so only callers that actually wait pay for timing.
+    """
+
+    def __init__(self, lock, name: str):
+        self._lock = lock
+        self.name = name
+        self._acquisitions = LOCK_ACQUISITIONS.labels(lock=name)
+        self._contended = LOCK_CONTENDED.labels(lock=name)
+        self._wait = LOCK_WAIT.labels(lock=name)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(False):
+            self._acquisitions.inc()
+            return True
+        if not blocking:
+            return False
+        self._contended.inc()
+        start = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        self._wait.observe(time.perf_counter() - start)
+        if acquired:
+            self._acquisitions.inc()
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request latency labelled by the matched route template"""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; templates keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                service=self.service, method=scope["method"], route=route, status=status_code,
+            )
+
+
+def instrument_flask(app, service: str):
+    """Record Flask request latency by URL rule and add GET /metrics/prometheus"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is not None:
+            rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                service=service, method=request.method, route=rule, status=response.status_code,
+            )
+        return response
+
+    @app.route('/metrics/prometheus', methods=['GET'])
+    def metrics_prometheus():
+        """Prometheus metrics"""
+        return Response(render(), content_type=CONTENT_TYPE)
+
+
+async def monitor_event_loop_lag(service: str, interval: float = 0.5):
+    """Sleep for interval and record how much later than requested the loop woke us up"""
+    lag = EVENT_LOOP_LAG.labels(service=service)
+    current = REGISTRY.gauge(
+        "fintwitch_event_loop_lag_last_seconds", "Most recent event loop lag sample", ("service",)
+    ).labels(service=service)
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        delay = max(0.0, time.perf_counter() - start - interval)
+        lag.observe(delay)
+        current.set(delay)
@@ -0,0 +1,226 @@
+"""
+Request Tracing for FinTwitch
+=============================
+Opt-in per-request trace spans (ingest -> subject.put -> Pathway callback -> recompute).
+
+- A trace is started per HTTP request by TracingMiddleware while tracing is enabled;
+  its id comes from the X-Trace-Id request header or is generated, and is echoed back
+  in the X-Trace-Id response header.
+- span() / traced() record timed spans into the traces active in the current context
+  (contextvars, so they follow the request into awaited code and threadpool handlers).
+- Pathway subscribe callbacks run on the Pathway thread, outside any request. Code that
+  hands an event to Pathway calls hand_off(); each callback then adopts, via
+  callback_context(table), every trace handed off since that table's callback last
+  fired, so its span and the recomputes it triggers land in those traces.
+
+Disabled (the default), span() and traced() cost one attribute check.
+"""
+
+import contextvars
+import functools
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+MAX_TRACES = 200            # completed/in-flight traces kept for /admin/traces
+MAX_SPANS_PER_TRACE = 256
+MAX_PENDING = 10000         # traces waiting for Pathway callbacks
+TRACE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_active: contextvars.ContextVar[Tuple["Trace", ...]] = contextvars.ContextVar("fintwitch_traces", default=())
+
+
+class Trace:
+    """Spans of one request, including ones recorded later on other threads"""
+
+    __slots__ = ("trace_id", "name", "started_at", "_origin", "spans", "dropped_spans", "_lock")
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, end: float):
+        span = {
+            "name": name,
+            "start_ms": round((start - self._origin) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+            dropped = self.dropped_spans
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "spans": spans,
+            "dropped_spans": dropped,
+        }
+
+
+class Tracer:
+    """Process-wide trace store; enable() / disable() toggle tracing at runtime"""
+
+    def __init__(self, max_traces: int = MAX_TRACES, max_pending: int = MAX_PENDING):
+        self.enabled = False
+        self._recent: Deque[Trace] = deque(maxlen=max_traces)
+        self._pending: Deque[Tuple[int, Trace]] = deque(maxlen=max_pending)
+        self._next_seq = 0
+        self._callback_cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.traces_started = 0
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        with self._lock:
+            self._pending.clear()
+
+    def start(self, name: str, trace_id: Optional[str] = None) -> Trace:
+        if not trace_id or not TRACE_ID_PATTERN.match(trace_id):
+            trace_id = uuid.uuid4().hex
+        trace = Trace(trace_id, name)
+        with self._lock:
+            self._recent.append(trace)
+            self.traces_started += 1
+        return trace
+
+    @contextmanager
+    def activate(self, *traces: Trace):
+        token = _active.set(traces)
+        try:
+            yield traces
+        finally:
+            _active.reset(token)
+
+    def hand_off(self):
+        """Mark the current traces as waiting for the Pathway callbacks"""
+        traces = _active.get()
+        if not traces or not self.enabled:
+            return
+        with self._lock:
+            for trace in traces:
+                self._pending.append((self._next_seq, trace))
+                self._next_seq += 1
+
+    def _claim(self, table: str) -> Tuple[Trace, ...]:
+        with self._lock:
+            cursor = self._callback_cursors.get(table, 0)
+            self._callback_cursors[table] = self._next_seq
+            return tuple(trace for seq, trace in self._pending if seq >= cursor)
+
+    @contextmanager
+    def callback_context(self, table: str):
+        """Run a Pathway callback inside the traces handed off since its last run"""
+        if not self.enabled:
+            yield
+            return
+        traces = self._claim(table)
+        if not traces:
+            yield
+            return
+        with self.activate(*traces):
+            with span(f"callback:{table}"):
+                yield
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for trace in self._recent:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._recent)[-limit:] if limit > 0 else []
+        return [trace.to_dict() for trace in reversed(traces)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "traces_started": self.traces_started,
+                "traces_kept": len(self._recent),
+                "pending_handoffs": len(self._pending),
+            }
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str):
+    """Record a span into every trace active in this context (no-op when none are)"""
+    traces = _active.get() if tracer.enabled else ()
+    if not traces:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        for trace in traces:
+            trace.add_span(name, start, end)
+
+
+def traced(name: str):
+    """Decorator recording each call as a span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled or not _active.get():
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace_ids() -> List[str]:
+    return [trace.trace_id for trace in _active.get()]
+
+
+class TracingMiddleware:
+    """ASGI middleware starting a trace per HTTP request while tracing is enabled"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        requested = headers.get(b"x-trace-id", b"").decode("latin-1")
+        trace = tracer.start(f"{scope['method']} {scope['path']}", requested)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or []) + [
+                    (b"x-trace-id", trace.trace_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        with tracer.activate(trace):
+            with span("http"):
+                await self.app(scope, receive, send_with_trace_id)
@@ -4,6 +4,11 @@
 const EVENT_BACKEND_URL = 'http://localhost:5000';
 const POLL_INTERVAL = 3000; // Check every 3 seconds
 
+// Per-tab session id so the backend keeps separate economy state for each player
+const SESSION_ID = (typeof crypto !== 'undefined' && crypto.randomUUID)
+  ? crypto.randomUUID()
+  : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
 let pollingInterval = null;
 
 export const startEventListener = (getBalance, onEventReceived) => {
@@ -18,7 +23,7 @@ export const startEventListener = (getBalance, onEventReceived) => {
     try {
       // Always get the latest balance (supports both function and static value)
       const balance = typeof getBalance === 'function' ? getBalance() : getBalance;
-      const response = await fetch(`${EVENT_BACKEND_URL}/events?balance=${balance}`, {
+      const response = await fetch(`${EVENT_BACKEND_URL}/events?balance=${balance}&session=${SESSION_ID}`, {
         method: 'GET',
       });
 